@@ -6,6 +6,7 @@ from . import prompt
 from .sub_agents.get_weather.agent import get_weather_agent
 from .sub_agents.search_hotels.agent import search_hotels_agent
 from .sub_agents.travel_advice.agent import travel_advice_agent
+from .tools.quota import record_model_usage
 
 MODEL = load_model()
 GOOGLE_API_KEY = load_google_api_key()
@@ -24,4 +25,5 @@ root_agent = Agent(
     # COMBINED QUERY LOGIC path (see prompt.py) where root needs both
     # results back to synthesize one reply.
     tools=[AgentTool(get_weather_agent), AgentTool(search_hotels_agent)],
+    after_model_callback=record_model_usage,
 )
@@ -1,14 +1,38 @@
+import re
 from typing import Any, Optional
 
 from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from opentelemetry import trace
 
 from ....utils.load_env_data import load_model
 from ...tools.get_current_weather import get_current_weather
 from ...tools.get_forecast import get_forecast
 from ...tools.get_history_weather import get_history_weather
+from ...tools.quota import record_model_usage
+from ...tools.weather_json import (
+    KIND_BY_TOOL,
+    build_weather_payload,
+    render_fence,
+    template_summary,
+)
 from . import prompt
 
+tracer = trace.get_tracer(__name__)
+
+# Session-state slot for the payload built from this invocation's last
+# successful weather tool call. Tagged with the invocation id so a payload
+# left over from an earlier turn is never attached to a later reply.
+PAYLOAD_STATE_KEY = "get_weather_agent_payload"
+
+# Any weather-json fence the model writes despite the prompt — the built
+# payload is authoritative, so it replaces rather than duplicates it.
+_MODEL_FENCE_PATTERN = re.compile(r"```\s*(?:weather-json|json)\b[\s\S]*?(?:```|$)")
 
+
+@tracer.start_as_current_span("get_weather_agent.after_tool_callback")
 def _after_tool_callback(
     tool: Any,
     args: dict[str, Any],
@@ -21,13 +45,63 @@ def _after_tool_callback(
     Tools return {"error": "..."} on failure. This callback ensures the format
     is always consistent before the response reaches the LLM, regardless of
     what the tool returned.
+
+    Successful responses are also turned into the weather-json payload here
+    (see tools/weather_json.py) and stashed for _after_model_callback, so the
+    model only has to write the human text.
     """
     if isinstance(tool_response, dict) and "error" in tool_response:
+        tool_context.state[PAYLOAD_STATE_KEY] = None
         error_msg = str(tool_response.get("error") or "Tool returned an unknown error.")
         return {"error": error_msg}
+
+    kind = KIND_BY_TOOL.get(getattr(tool, "name", ""))
+    payload = (
+        build_weather_payload(
+            tool_response, kind, args.get("city", ""), args.get("language", "en")
+        )
+        if kind
+        else None
+    )
+    tool_context.state[PAYLOAD_STATE_KEY] = (
+        {"invocation_id": tool_context.invocation_id, "payload": payload}
+        if payload
+        else None
+    )
     return None  # Successful responses are passed through unchanged
 
 
+def _after_model_callback(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """Attach the server-built weather-json fence to the model's final text."""
+    record_model_usage(callback_context, llm_response)
+    stash = callback_context.state.get(PAYLOAD_STATE_KEY)
+    if not stash or stash.get("invocation_id") != callback_context.invocation_id:
+        return None
+
+    content = llm_response.content
+    parts = (content.parts if content else None) or []
+    if llm_response.partial or any(part.function_call for part in parts):
+        return None
+
+    text = "\n".join(part.text for part in parts if part.text)
+    human_text = _MODEL_FENCE_PATTERN.sub("", text).strip()
+    payload = stash["payload"]
+    if not human_text:
+        human_text = template_summary(payload)
+
+    callback_context.state[PAYLOAD_STATE_KEY] = None
+    return llm_response.model_copy(
+        update={
+            "content": types.Content(
+                role="model",
+                parts=[types.Part(text=f"{human_text}\n\n{render_fence(payload)}")],
+            )
+        }
+    )
+
+
 get_weather_agent = Agent(
     model=load_model(),
     name=prompt.GET_WEATHER_AGENT_NAME,
@@ -35,4 +109,5 @@ get_weather_agent = Agent(
     tools=[get_current_weather, get_forecast, get_history_weather],
     output_key="get_weather_agent_prompt",
     after_tool_callback=_after_tool_callback,
+    after_model_callback=_after_model_callback,
 )
@@ -1,13 +1,18 @@
 from typing import Any, Optional
 
 from google.adk.agents import Agent
+from opentelemetry import trace
 
 from ....utils.load_env_data import load_model
 from ...tools.build_hotel_booking_link import build_hotel_booking_link
+from ...tools.quota import record_model_usage
 from ...tools.search_hotels import search_hotels
 from . import prompt
 
+tracer = trace.get_tracer(__name__)
 
+
+@tracer.start_as_current_span("search_hotels_agent.after_tool_callback")
 def _after_tool_callback(
     tool: Any,
     args: dict[str, Any],
@@ -30,4 +35,5 @@ search_hotels_agent = Agent(
     tools=[search_hotels, build_hotel_booking_link],
     output_key="search_hotels_agent_output",
     after_tool_callback=_after_tool_callback,
+    after_model_callback=record_model_usage,
 )
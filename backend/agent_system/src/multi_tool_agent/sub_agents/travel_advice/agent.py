@@ -1,6 +1,7 @@
 from google.adk.agents import Agent
 
 from ....utils.load_env_data import load_model
+from ...tools.quota import record_model_usage
 from . import prompt
 
 travel_advice_agent = Agent(
@@ -8,4 +9,5 @@ travel_advice_agent = Agent(
     name=prompt.TRAVEL_ADVICE_AGENT_NAME,
     instruction=prompt.TRAVEL_ADVICE_AGENT_INSTRUCTION,
     output_key="travel_advice_agent_output",
+    after_model_callback=record_model_usage,
 )
@@ -38,4 +38,6 @@ context_template_instructions = """
         - uv index
         - sunrise/sunset times
         - and other information that you can get from the weather information!
+    - Older turns of a long conversation are removed from your history. What they established is kept as JSON under EARLIER CONVERSATION below (empty when nothing was removed). Use it to fill your CONTEXT TEMPLATE when the remaining messages do not say otherwise; the messages always take precedence.
+        EARLIER CONVERSATION: {conversation_summary?}
 """
@@ -0,0 +1,218 @@
+"""In-process TTL cache for upstream API responses.
+
+Upstream weather data changes slowly compared to how often the same city is
+asked about, so a short-lived cache in front of the timeline fetch saves both
+latency and paid API quota. Entries expire by age and the least recently used
+ones are evicted once the cache is full.
+
+StaleWhileRevalidate builds on it for slower-moving, expensive results
+(hotel searches): past its freshness window an entry is still served at
+once while a background task fetches its replacement.
+"""
+
+import asyncio
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def normalize_city(city: str) -> str:
+    """Fold case, diacritics and whitespace: " Kraków " -> "krakow".
+
+    "ł" has no Unicode decomposition, so it is mapped explicitly — otherwise
+    "Łódź" and "Lodz" would land on different keys.
+    """
+    decomposed = unicodedata.normalize("NFKD", city.replace("ł", "l").replace("Ł", "L"))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries each carry their own TTL.
+
+    Cached values are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        """Return the cached value, or None on a miss.
+
+        With allow_stale an expired entry is still returned (and kept);
+        callers use it when going upstream is not an option.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock() and not allow_stale:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class StaleWhileRevalidate:
+    """Serve cached results instantly, refreshing stale ones in the background.
+
+    An entry is fresh for `fresh_for` seconds and then stale for another
+    `stale_for`: a stale hit returns the old value and starts (at most one
+    per key) a background fetch that replaces it. Past both windows the
+    entry is gone and the caller waits for a fetch, as on a first miss.
+    """
+
+    def __init__(
+        self,
+        fresh_for: float,
+        stale_for: float,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self._clock = clock
+        self._cache = TTLCache(max_entries=max_entries, clock=clock)
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        # Strong references: the event loop only keeps weak ones to tasks.
+        self._tasks: Set[asyncio.Task] = set()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """The cached value at any age, without refreshing it."""
+        entry = self._cache.get(key, allow_stale=True)
+        return None if entry is None else entry[1]
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """Store `value` as fetched `age` seconds ago; past both windows, drop it."""
+        ttl = self.fresh_for + self.stale_for - age
+        if ttl > 0:
+            self._cache.set(key, (self._clock() - age, value), ttl)
+
+    async def get(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[T]],
+        keep: Callable[[T], bool] = lambda _: True,
+    ) -> T:
+        """The cached value for `key`, or the result of awaiting fetch().
+
+        Only results for which keep(result) is true are cached, so an
+        upstream error is returned to this caller but never stored, and a
+        failed refresh leaves the stale value in place.
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            fetched_at, value = entry
+            if self._clock() - fetched_at < self.fresh_for:
+                self.fresh_hits += 1
+            else:
+                self.stale_hits += 1
+                self._revalidate(key, fetch, keep)
+            return value
+
+        value = await fetch()
+        if keep(value):
+            self.set(key, value)
+        return value
+
+    def _revalidate(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[T]],
+        keep: Callable[[T], bool],
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                value = await fetch()
+            except Exception:
+                logger.exception("Background refresh of %r failed", key)
+                value = None
+            if value is not None and keep(value):
+                self.set(key, value)
+            else:
+                self.refresh_failures += 1
+
+        self.refreshes += 1
+        task = asyncio.ensure_future(refresh())
+        self._refreshing[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._release(key, done))
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self._cache.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refreshing": len(self._refreshing),
+        }
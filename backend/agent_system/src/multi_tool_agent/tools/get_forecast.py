@@ -1,21 +1,26 @@
-import json
-import os
 from typing import Any, Dict
 
-import requests
+from .single_flight import coalesce
+from .visual_crossing import fetch_timeline
 
-from .utils import normalize_sunrise_sunset
 
-API_HTTP = "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/"
-
-
-def get_forecast(city: str) -> Dict[str, Any]:
+@coalesce(ignore=("language",))
+async def get_forecast(
+    city: str, start_date: str = "", end_date: str = "", language: str = "en"
+) -> Dict[str, Any]:
     """
     Fetch weather forecast data for a given city using the Visual Crossing API.
     Returns a dictionary with weather data, or {"error": "message"} on failure.
 
     Args:
         city: The city name
+        start_date: First future day wanted, in YYYY-MM-DD format (optional).
+            Leave empty for the full 15-day forecast.
+        end_date: Last future day wanted, in YYYY-MM-DD format (optional,
+            defaults to start_date).
+        language: ISO 639-1 language code of the chat (from the CONTEXT
+            TEMPLATE), used for meta.language of the weather-json block the
+            backend builds from this response.
 
     Returns:
         Dict containing weather data from API, or {"error": "..."} if the call failed.
@@ -23,23 +28,6 @@ def get_forecast(city: str) -> Dict[str, Any]:
     if not city:
         return {"error": "No city provided."}
 
-    api_key = os.getenv("VISUAL_CROSSING_API_KEY")
-    if not api_key:
-        return {"error": "Weather service API key is not configured."}
-
-    url = f"{API_HTTP}{city}?unitGroup=metric&key={api_key}&contentType=json"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        weather_data = response.json()
-        return normalize_sunrise_sunset(weather_data)
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 400:
-            return {"error": f"City '{city}' not found or invalid."}
-        return {"error": f"Weather service error ({e.response.status_code})."}
-    except requests.exceptions.Timeout:
-        return {"error": "Weather service request timed out."}
-    except requests.exceptions.RequestException:
-        return {"error": "Weather service is temporarily unavailable."}
-    except json.JSONDecodeError:
-        return {"error": "Weather service returned invalid data."}
+    if start_date and not end_date:
+        end_date = start_date
+    return await fetch_timeline(city, "forecast", start_date, end_date)
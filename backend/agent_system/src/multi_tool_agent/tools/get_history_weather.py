@@ -1,15 +1,49 @@
-import json
-import os
-from typing import Any, Dict
+import asyncio
+import logging
+import sqlite3
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from .cache import normalize_city
+from .history_store import get_history_store, missing_ranges
+from .single_flight import coalesce
+from .visual_crossing import fetch_timeline, is_settled
 
-from .utils import normalize_sunrise_sunset
+logger = logging.getLogger(__name__)
 
-API_HTTP = "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/"
+# Past this many gaps, one request spanning all of them is cheaper than
+# a request per gap (Visual Crossing bills per day either way).
+_MAX_GAP_FETCHES = 3
 
 
-def get_history_weather(city: str, start_date: str, end_date: str) -> Dict[str, Any]:
+async def _load_stored(
+    location: str, start_date: str, end_date: str
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    try:
+        store = get_history_store()
+        return await asyncio.to_thread(store.get, location, start_date, end_date)
+    except (OSError, sqlite3.Error):
+        logger.warning("History store unavailable, fetching upstream", exc_info=True)
+        return None, {}
+
+
+async def _save_settled(
+    location: str, meta: Dict[str, Any], days: List[Dict[str, Any]]
+) -> None:
+    settled = [day for day in days if is_settled(str(day.get("datetime", "")))]
+    if not settled:
+        return
+    try:
+        store = get_history_store()
+        await asyncio.to_thread(store.put, location, meta, settled)
+    except (OSError, sqlite3.Error):
+        logger.warning("Failed to persist history days", exc_info=True)
+
+
+@coalesce(ignore=("language",))
+async def get_history_weather(
+    city: str, start_date: str, end_date: str, language: str = "en"
+) -> Dict[str, Any]:
     """
     Fetch historical weather data for a given city and date range using the
     Visual Crossing API.
@@ -19,6 +53,9 @@ def get_history_weather(city: str, start_date: str, end_date: str) -> Dict[str,
         city: The city name
         start_date: Start date in YYYY-MM-DD format
         end_date: End date in YYYY-MM-DD format
+        language: ISO 639-1 language code of the chat (from the CONTEXT
+            TEMPLATE), used for meta.language of the weather-json block the
+            backend builds from this response.
 
     Returns:
         Dict containing weather data from API, or {"error": "..."} if the call failed.
@@ -28,26 +65,44 @@ def get_history_weather(city: str, start_date: str, end_date: str) -> Dict[str,
     if not start_date or not end_date:
         return {"error": "Both start_date and end_date are required."}
 
-    api_key = os.getenv("VISUAL_CROSSING_API_KEY")
-    if not api_key:
-        return {"error": "Weather service API key is not configured."}
+    not_found_error = f"City '{city}' not found or invalid date range."
+    try:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    except ValueError:
+        start = end = None
+    if start is None or end is None or start > end:
+        # Not a range the store can index — let the API produce the error.
+        return await fetch_timeline(
+            city, "history", start_date, end_date, not_found_error=not_found_error
+        )
+
+    location = normalize_city(city)
+    meta, stored = await _load_stored(location, start_date, end_date)
+    gaps = missing_ranges(start, end, stored) if meta is not None else [(start, end)]
+    if not gaps:
+        return {**meta, "days": [stored[d] for d in sorted(stored)]}
+    if len(gaps) > _MAX_GAP_FETCHES:
+        gaps = [(gaps[0][0], gaps[-1][1])]
 
-    url = (
-        f"{API_HTTP}{city}/{start_date}/{end_date}"
-        f"?unitGroup=metric&key={api_key}&contentType=json"
+    responses = await asyncio.gather(
+        *(
+            fetch_timeline(
+                city,
+                "history",
+                gap_start.isoformat(),
+                gap_end.isoformat(),
+                not_found_error=not_found_error,
+            )
+            for gap_start, gap_end in gaps
+        )
     )
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        weather_data = response.json()
-        return normalize_sunrise_sunset(weather_data)
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 400:
-            return {"error": f"City '{city}' not found or invalid date range."}
-        return {"error": f"Weather service error ({e.response.status_code})."}
-    except requests.exceptions.Timeout:
-        return {"error": "Weather service request timed out."}
-    except requests.exceptions.RequestException:
-        return {"error": "Weather service is temporarily unavailable."}
-    except json.JSONDecodeError:
-        return {"error": "Weather service returned invalid data."}
+    for response in responses:
+        if "error" in response:
+            return response
+
+    fetched = [day for response in responses for day in response.get("days", [])]
+    meta = {key: value for key, value in responses[-1].items() if key != "days"}
+    await _save_settled(location, meta, fetched)
+
+    merged = {**stored, **{d["datetime"]: d for d in fetched if "datetime" in d}}
+    return {**meta, "days": [merged[d] for d in sorted(merged)]}
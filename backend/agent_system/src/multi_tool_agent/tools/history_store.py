@@ -0,0 +1,127 @@
+"""Permanent on-disk store for past weather days.
+
+A day that is over never changes, so once get_history_weather has fetched it
+there is no reason to pay for it again. Days are kept in SQLite, indexed by
+(normalized location, date), together with the location-level fields of the
+last timeline response (resolvedAddress, timezone, ...) so a fully stored
+range can be answered without calling Visual Crossing at all.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    location TEXT PRIMARY KEY,
+    meta TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS days (
+    location TEXT NOT NULL,
+    date TEXT NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (location, date)
+) WITHOUT ROWID;
+"""
+
+
+def default_store_path() -> str:
+    return os.getenv("HISTORY_STORE_PATH") or os.path.join(
+        os.path.expanduser("~"), ".cache", "weather-center", "history.sqlite3"
+    )
+
+
+def missing_ranges(
+    start: date, end: date, present: Iterable[str]
+) -> List[Tuple[date, date]]:
+    """Collapse the dates in [start, end] not in `present` into contiguous runs."""
+    have = set(present)
+    ranges: List[Tuple[date, date]] = []
+    run_start: Optional[date] = None
+    day = start
+    while day <= end:
+        if day.isoformat() in have:
+            if run_start is not None:
+                ranges.append((run_start, day - timedelta(days=1)))
+                run_start = None
+        elif run_start is None:
+            run_start = day
+        day += timedelta(days=1)
+    if run_start is not None:
+        ranges.append((run_start, end))
+    return ranges
+
+
+class HistoryStore:
+    """SQLite-backed (location, date) -> day dict store.
+
+    Calls are blocking; async callers run them via asyncio.to_thread. One
+    connection is shared across threads and serialized with a lock, which is
+    plenty for a handful of small point reads per chat turn.
+    """
+
+    def __init__(self, path: str) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def get(
+        self, location: str, start: str, end: str
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Return (location meta or None, {date: day}) for dates in [start, end]."""
+        with self._lock:
+            meta_row = self._conn.execute(
+                "SELECT meta FROM locations WHERE location = ?", (location,)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT date, day FROM days"
+                " WHERE location = ? AND date BETWEEN ? AND ?",
+                (location, start, end),
+            ).fetchall()
+        meta = json.loads(meta_row[0]) if meta_row else None
+        return meta, {d: json.loads(day) for d, day in rows}
+
+    def put(
+        self,
+        location: str,
+        meta: Dict[str, Any],
+        days: Iterable[Dict[str, Any]],
+    ) -> None:
+        rows = [
+            (location, day["datetime"], json.dumps(day, ensure_ascii=False))
+            for day in days
+            if isinstance(day.get("datetime"), str)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO locations (location, meta) VALUES (?, ?)",
+                (location, json.dumps(meta, ensure_ascii=False)),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO days (location, date, day) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide store, opening it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore(default_store_path())
+        return _store
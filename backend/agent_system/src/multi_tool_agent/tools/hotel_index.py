@@ -0,0 +1,172 @@
+"""Permanent on-disk index of hotel searches and the hotels found in them.
+
+The in-memory hotel cache dies with the worker, so every restart, deploy
+and extra worker paid for Tavily again — the slowest upstream of any turn.
+This index keeps, per (normalized city, currency):
+
+- the last raw search_hotels result list, with the time it was fetched, so
+  a popular city is answered at once (and refreshed in the background) even
+  by a worker that never searched it;
+- the hotels of every validated hotel-json / combined-json reply for that
+  city, with the time each was last seen, so a city can still be answered
+  when Tavily is shed or down.
+
+Lookups are always by exact (city, currency), so both are plain keyed
+tables rather than a full-text index.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    city TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    results TEXT NOT NULL,
+    PRIMARY KEY (city, currency)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hotels (
+    city TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    name TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    hotel TEXT NOT NULL,
+    PRIMARY KEY (city, currency, name)
+) WITHOUT ROWID;
+"""
+
+# Hotels not seen in a validated reply for this long are dropped: names and
+# links outlive prices, but not indefinitely.
+KNOWN_HOTEL_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+
+def default_index_path() -> str:
+    return os.getenv("HOTEL_INDEX_PATH") or os.path.join(
+        os.path.expanduser("~"), ".cache", "weather-center", "hotels.sqlite3"
+    )
+
+
+class HotelIndex:
+    """SQLite-backed (city, currency) -> searches and known hotels.
+
+    Calls are blocking; async callers run them via asyncio.to_thread. Like
+    HistoryStore, one connection is shared across threads and serialized
+    with a lock. Timestamps are wall-clock seconds, so they stay meaningful
+    across restarts.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.search_hits = 0
+        self.search_misses = 0
+        self.known_hotel_answers = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def get_search(
+        self, city: str, currency: str
+    ) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        """Return (age in seconds, results) of the last search, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, results FROM searches"
+                " WHERE city = ? AND currency = ?",
+                (city, currency),
+            ).fetchone()
+        if row is None:
+            self.search_misses += 1
+            return None
+        self.search_hits += 1
+        return max(self._clock() - row[0], 0.0), json.loads(row[1])
+
+    def put_search(
+        self, city: str, currency: str, results: List[Dict[str, Any]]
+    ) -> None:
+        body = json.dumps(results, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (city, currency, fetched_at, results)"
+                " VALUES (?, ?, ?, ?)",
+                (city, currency, self._clock(), body),
+            )
+
+    def get_hotels(
+        self, city: str, currency: str, limit: int = 8
+    ) -> List[Dict[str, Any]]:
+        """The most recently seen hotels for (city, currency), newest first."""
+        oldest = self._clock() - KNOWN_HOTEL_MAX_AGE_SECONDS
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hotel FROM hotels"
+                " WHERE city = ? AND currency = ? AND seen_at >= ?"
+                " ORDER BY seen_at DESC LIMIT ?",
+                (city, currency, oldest, limit),
+            ).fetchall()
+        if rows:
+            self.known_hotel_answers += 1
+        return [json.loads(hotel) for (hotel,) in rows]
+
+    def put_hotels(
+        self, city: str, currency: str, hotels: Iterable[Dict[str, Any]]
+    ) -> None:
+        """Record validated hotels, replacing earlier sightings of the same name."""
+        now = self._clock()
+        rows = [
+            (
+                city,
+                currency,
+                hotel["name"].strip().casefold(),
+                now,
+                json.dumps(hotel, ensure_ascii=False),
+            )
+            for hotel in hotels
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hotels (city, currency, name, seen_at, hotel)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "DELETE FROM hotels WHERE city = ? AND currency = ? AND seen_at < ?",
+                (city, currency, now - KNOWN_HOTEL_MAX_AGE_SECONDS),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (searches,) = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()
+            (hotels,) = self._conn.execute("SELECT COUNT(*) FROM hotels").fetchone()
+        return {
+            "searches": searches,
+            "hotels": hotels,
+            "search_hits": self.search_hits,
+            "search_misses": self.search_misses,
+            "known_hotel_answers": self.known_hotel_answers,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[HotelIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_hotel_index() -> HotelIndex:
+    """Return the process-wide index, opening it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = HotelIndex(default_index_path())
+        return _index
@@ -0,0 +1,82 @@
+"""Process-wide async HTTP client shared by the upstream-API tools.
+
+Every tool call used to open its own blocking connection, which stalled the
+event loop for the whole request and paid a fresh TCP+TLS handshake each
+time. One keep-alive client per event loop fixes both: connections to the
+same upstream are reused, and concurrent chats only wait on each other once
+the pool (or the per-host cap) is actually full.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Shared by every upstream call. The connect timeout is shorter than the read
+# timeout so an unreachable host fails fast instead of eating the ADK budget.
+TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+LIMITS = httpx.Limits(
+    max_connections=50,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+# httpx only caps the pool as a whole; this keeps one slow upstream from
+# taking every connection and starving the others.
+PER_HOST_LIMIT = 10
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it for the running event loop.
+
+    Pooled connections belong to the loop that opened them, so a new loop
+    (uvicorn reload, a test case) gets a new client rather than reusing
+    sockets from a loop that no longer runs.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(timeout=TIMEOUT, limits=LIMITS)
+        _client_loop = loop
+        _host_semaphores.clear()
+    return _client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = _host_semaphores[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+    return semaphore
+
+
+async def get(url: str, **kwargs: Any) -> httpx.Response:
+    """GET through the shared pool, bounded by the per-host limit."""
+    client = get_http_client()
+    async with _host_semaphore(url):
+        return await client.get(url, **kwargs)
+
+
+async def post(url: str, **kwargs: Any) -> httpx.Response:
+    """POST through the shared pool, bounded by the per-host limit."""
+    client = get_http_client()
+    async with _host_semaphore(url):
+        return await client.post(url, **kwargs)
+
+
+async def aclose_http_client() -> None:
+    """Close the shared client; called from the FastAPI lifespan on shutdown."""
+    global _client, _client_loop
+
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    _host_semaphores.clear()
@@ -0,0 +1,218 @@
+"""Rolling-window budgets for the paid upstream APIs.
+
+The chat rate limits cap each client, not the monthly bills: enough
+well-behaved clients still drain the Gemini, Visual Crossing and Tavily
+quotas. Every upstream call is recorded here with its cost in the unit the
+provider bills — tokens for Gemini, returned days ("records") for Visual
+Crossing, credits for Tavily — and callers ask before spending:
+
+* ok: under SHED_FRACTION of the budget, everything runs normally.
+* shed: close to the budget. Weather tools answer from cache only (stale
+  entries included) and hotel search is switched off.
+* exhausted: the budget is spent. Additionally, new chats are refused once
+  the Gemini budget runs out.
+
+Budgets come from the environment and default to unlimited. Counters are
+per process, so with several workers each one should get its share of the
+provider quota.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GEMINI = "gemini"
+VISUAL_CROSSING = "visual_crossing"
+TAVILY = "tavily"
+
+OK = "ok"
+SHED = "shed"
+EXHAUSTED = "exhausted"
+
+# Fraction of a budget after which optional work is shed.
+SHED_FRACTION = 0.9
+# Tavily bills an advanced-depth search as two credits.
+TAVILY_ADVANCED_SEARCH_CREDITS = 2
+
+_DAY = 24 * 60 * 60
+_BUCKETS_PER_WINDOW = 96
+# Burn rate is measured over the last hour, in one-minute buckets.
+_BURN_SECONDS = 60 * 60
+_BURN_BUCKETS = 60
+
+
+@dataclass(frozen=True)
+class Budget:
+    unit: str
+    window_seconds: int
+    limit: Optional[float] = None
+
+
+class RollingCounter:
+    """Calls and cost over a rolling window, kept in fixed-size buckets.
+
+    Memory stays bounded by the bucket count however busy the upstream is;
+    the window edge is only as precise as one bucket.
+    """
+
+    def __init__(
+        self, window_seconds: float, buckets: int, clock: Callable[[], float]
+    ) -> None:
+        self.window_seconds = window_seconds
+        self._bucket_seconds = window_seconds / buckets
+        self._clock = clock
+        # (bucket index, calls, cost), oldest first.
+        self._buckets: Deque[List[float]] = deque()
+
+    def _expire(self, now: float) -> int:
+        current = int(now // self._bucket_seconds)
+        oldest = current - int(self.window_seconds // self._bucket_seconds) + 1
+        while self._buckets and self._buckets[0][0] < oldest:
+            self._buckets.popleft()
+        return current
+
+    def add(self, cost: float) -> None:
+        current = self._expire(self._clock())
+        if self._buckets and self._buckets[-1][0] == current:
+            self._buckets[-1][1] += 1
+            self._buckets[-1][2] += cost
+        else:
+            self._buckets.append([current, 1, cost])
+
+    def totals(self) -> Tuple[int, float]:
+        """(calls, cost) inside the window."""
+        self._expire(self._clock())
+        return (
+            int(sum(bucket[1] for bucket in self._buckets)),
+            sum(bucket[2] for bucket in self._buckets),
+        )
+
+
+class QuotaBudgeter:
+    def __init__(
+        self,
+        budgets: Dict[str, Budget],
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.budgets = budgets
+        self._clock = clock
+        self._windows = {
+            name: RollingCounter(budget.window_seconds, _BUCKETS_PER_WINDOW, clock)
+            for name, budget in budgets.items()
+        }
+        self._recent = {
+            name: RollingCounter(_BURN_SECONDS, _BURN_BUCKETS, clock)
+            for name in budgets
+        }
+        self.shed: Dict[str, int] = {name: 0 for name in budgets}
+
+    def record(self, upstream: str, cost: float = 1.0) -> None:
+        """Count one call to `upstream` costing `cost` budget units."""
+        self._windows[upstream].add(cost)
+        self._recent[upstream].add(cost)
+
+    def mode(self, upstream: str) -> str:
+        limit = self.budgets[upstream].limit
+        if limit is None:
+            return OK
+        _, used = self._windows[upstream].totals()
+        if used >= limit:
+            return EXHAUSTED
+        if used >= limit * SHED_FRACTION:
+            return SHED
+        return OK
+
+    def allows(self, upstream: str) -> bool:
+        """True when optional calls to `upstream` may go ahead.
+
+        A refusal is counted in the stats, so callers should ask once per
+        call they are about to make.
+        """
+        if self.mode(upstream) == OK:
+            return True
+        self.shed[upstream] += 1
+        return False
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Usage, burn rate and projection per upstream.
+
+        burn_per_hour is the cost over the last hour. projected_window_cost
+        extrapolates it to the budget window, and hours_to_exhaustion is how
+        long the remaining budget lasts at that rate.
+        """
+        stats = {}
+        for name, budget in self.budgets.items():
+            calls, used = self._windows[name].totals()
+            _, burn = self._recent[name].totals()
+            window_hours = budget.window_seconds / _BURN_SECONDS
+            hours_left = None
+            if budget.limit is not None and burn > 0:
+                hours_left = round(max(budget.limit - used, 0) / burn, 2)
+            stats[name] = {
+                "mode": self.mode(name),
+                "unit": budget.unit,
+                "window_hours": window_hours,
+                "calls": calls,
+                "used": round(used, 2),
+                "budget": budget.limit,
+                "burn_per_hour": round(burn, 2),
+                "projected_window_cost": round(burn * window_hours, 2),
+                "hours_to_exhaustion": hours_left,
+                "shed": self.shed[name],
+            }
+        return stats
+
+
+def _env_limit(name: str) -> Optional[float]:
+    value = (os.getenv(name) or "").strip()
+    if not value:
+        return None
+    try:
+        limit = float(value)
+    except ValueError:
+        logger.warning("Ignoring non-numeric %s=%r; budget is unlimited", name, value)
+        return None
+    return limit if limit > 0 else None
+
+
+def budgets_from_env() -> Dict[str, Budget]:
+    """Budgets from QUOTA_* environment variables; unset means unlimited."""
+    return {
+        GEMINI: Budget("tokens", _DAY, _env_limit("QUOTA_GEMINI_TOKENS_PER_DAY")),
+        VISUAL_CROSSING: Budget(
+            "records", _DAY, _env_limit("QUOTA_VISUAL_CROSSING_RECORDS_PER_DAY")
+        ),
+        TAVILY: Budget(
+            "credits", 30 * _DAY, _env_limit("QUOTA_TAVILY_CREDITS_PER_MONTH")
+        ),
+    }
+
+
+quota = QuotaBudgeter(budgets_from_env())
+
+# Model calls made by the chat turn in progress. The chat service sets a
+# fresh [count] per turn; AgentTool sub-runs share the turn's context, so
+# their calls are included.
+model_calls: ContextVar[Optional[List[int]]] = ContextVar("model_calls", default=None)
+
+
+def record_model_usage(callback_context: Any, llm_response: Any) -> None:
+    """after_model_callback that charges each model turn to the Gemini budget.
+
+    Streamed partial chunks are skipped; the final response of a turn
+    carries the token counts for the whole call.
+    """
+    if llm_response.partial:
+        return None
+    usage = llm_response.usage_metadata
+    quota.record(GEMINI, (usage.total_token_count or 0) if usage else 0)
+    calls = model_calls.get()
+    if calls is not None:
+        calls[0] += 1
+    return None
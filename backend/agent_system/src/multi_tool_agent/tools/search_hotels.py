@@ -1,9 +1,43 @@
+import asyncio
+import logging
 import os
-from typing import Any, Dict
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+import httpx
+from opentelemetry import trace
+
+from . import http_client
+from .cache import StaleWhileRevalidate, normalize_city
+from .hotel_index import get_hotel_index
 from .hotel_locale import LOCALE_BY_CURRENCY
 from .hotel_locale import target_currency as _target_currency
+from .quota import GEMINI, TAVILY, TAVILY_ADVANCED_SEARCH_CREDITS, quota
+from .single_flight import coalesce
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+TAVILY_API_URL = "https://api.tavily.com"
+# Advanced search routinely takes several seconds — longer than the shared
+# client's read timeout, which is sized for the weather API.
+SEARCH_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+_BOOKING_DOMAINS = ["booking.com", "hotels.com", "tripadvisor.com"]
+
+# Hotel listings and prices move over hours, not minutes, and a search
+# costs Tavily credits plus seconds of latency. A result is fresh for 3 h;
+# for the rest of the day it is still served at once while a background
+# search replaces it. Every search is also written to the on-disk hotel
+# index, which seeds this cache at the search's real age after a restart
+# or in another worker.
+HOTEL_FRESH_SECONDS = 3 * 60 * 60
+HOTEL_STALE_SECONDS = 21 * 60 * 60
+hotel_cache = StaleWhileRevalidate(
+    HOTEL_FRESH_SECONDS, HOTEL_STALE_SECONDS, max_entries=256
+)
+
+_UNAVAILABLE = "Hotel search is temporarily unavailable. Please try later."
 
 
 def _force_currency(url: str, currency: str) -> str:
@@ -28,7 +62,10 @@ def _is_direct_hotel_url(url: str) -> bool:
     return "/hotel/" in path and "/reviews/" not in path
 
 
-def search_hotels(
+# Outside @coalesce so calls that join an in-flight search get a span too.
+@tracer.start_as_current_span("tavily.search_hotels")
+@coalesce
+async def search_hotels(
     city: str, check_in: str = "", check_out: str = "", language: str = "en"
 ) -> Dict[str, Any]:
     """
@@ -58,15 +95,139 @@ def search_hotels(
     if not api_key:
         return {"error": "Hotel search API key (TAVILY_API_KEY) is not configured."}
 
-    try:
-        from tavily import TavilyClient
-    except ImportError:
-        return {
-            "error": "Hotel search library is not installed. "
-            "Run: pip install tavily-python"
-        }
+    # Hotel search is the first thing shed near a budget: it spends Tavily
+    # credits and the extra model turns of the hotel agent. Near the Tavily
+    # budget alone, earlier searches are still served from the cache.
+    if not quota.allows(GEMINI):
+        return {"error": _UNAVAILABLE}
 
     currency = _target_currency(language)
+    cache_key = (normalize_city(city), check_in, check_out, currency)
+    if hotel_cache.peek(cache_key) is None:
+        await _load_indexed(cache_key, city, check_in, check_out)
+    if not quota.allows(TAVILY):
+        cached = hotel_cache.peek(cache_key)
+        if cached is None:
+            cached = await _known_hotels(cache_key, city, check_in, check_out)
+        return cached if cached is not None else {"error": _UNAVAILABLE}
+
+    result = await hotel_cache.get(
+        cache_key,
+        lambda: _search_and_index(api_key, city, check_in, check_out, currency),
+        keep=lambda result: "error" not in result,
+    )
+    if "error" in result:
+        # Hotels from earlier validated replies beat an error; they are
+        # never cached, so the next turn tries Tavily again.
+        known = await _known_hotels(cache_key, city, check_in, check_out)
+        return known if known is not None else result
+    return result
+
+
+def _search_result(
+    city: str,
+    check_in: str,
+    check_out: str,
+    currency: str,
+    results: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "city": city,
+        "check_in": check_in,
+        "check_out": check_out,
+        "target_currency": currency,
+        "results": results,
+    }
+
+
+async def _load_indexed(
+    cache_key: Tuple[str, str, str, str], city: str, check_in: str, check_out: str
+) -> None:
+    """Seed hotel_cache with the indexed search for the city, at its real age.
+
+    The index is keyed by city and currency only: the dates merely bias the
+    Tavily query, and the pages it returns are the same hotel listings.
+    """
+    location, currency = cache_key[0], cache_key[3]
+    try:
+        indexed = await asyncio.to_thread(
+            get_hotel_index().get_search, location, currency
+        )
+    except (OSError, sqlite3.Error):
+        logger.warning("Hotel index unavailable, searching upstream", exc_info=True)
+        return
+    if indexed is not None:
+        age, results = indexed
+        hotel_cache.set(
+            cache_key,
+            _search_result(city, check_in, check_out, currency, results),
+            age=age,
+        )
+
+
+def _known_hotel_result(hotel: Dict[str, Any]) -> Dict[str, Any]:
+    """Render a hotel from an earlier validated reply as a search result."""
+    details = []
+    if hotel.get("price_per_night"):
+        details.append(
+            f"Price per night: {hotel['price_per_night']} {hotel.get('currency', '')}"
+        )
+    if hotel.get("rating") is not None:
+        rating = f"Rating: {hotel['rating']}/10"
+        if hotel.get("reviews_count"):
+            rating += f" ({hotel['reviews_count']} reviews)"
+        details.append(rating)
+    details.extend(hotel.get("highlights") or [])
+    url = hotel.get("url", "")
+    return {
+        "url": url,
+        "title": hotel["name"],
+        "content": ". ".join(d.strip() for d in details),
+        "score": 0.0,
+        "is_direct": _is_direct_hotel_url(url),
+    }
+
+
+async def _known_hotels(
+    cache_key: Tuple[str, str, str, str], city: str, check_in: str, check_out: str
+) -> Optional[Dict[str, Any]]:
+    """Hotels earlier replies found for the city, as a search result, or None."""
+    location, currency = cache_key[0], cache_key[3]
+    try:
+        hotels = await asyncio.to_thread(
+            get_hotel_index().get_hotels, location, currency
+        )
+    except (OSError, sqlite3.Error):
+        logger.warning("Hotel index unavailable", exc_info=True)
+        return None
+    if not hotels:
+        return None
+    results = [_known_hotel_result(hotel) for hotel in hotels]
+    return _search_result(city, check_in, check_out, currency, results)
+
+
+async def _search_and_index(
+    api_key: str, city: str, check_in: str, check_out: str, currency: str
+) -> Dict[str, Any]:
+    result = await _search_tavily(api_key, city, check_in, check_out, currency)
+    if "error" not in result:
+        try:
+            await asyncio.to_thread(
+                get_hotel_index().put_search,
+                normalize_city(city),
+                currency,
+                result["results"],
+            )
+        except (OSError, sqlite3.Error):
+            logger.warning("Failed to index hotel search", exc_info=True)
+    return result
+
+
+@tracer.start_as_current_span("tavily.search")
+async def _search_tavily(
+    api_key: str, city: str, check_in: str, check_out: str, currency: str
+) -> Dict[str, Any]:
+    """One Tavily advanced search, simplified for the hotel agent."""
     locale = LOCALE_BY_CURRENCY[currency]
 
     date_hint = ""
@@ -82,41 +243,50 @@ def search_hotels(
             f"hotels in {city}{date_hint} price per night USD rating reviews booking"
         )
 
+    # TAVILY_API_URL points the search elsewhere, e.g. at the load-test
+    # stand-in in benchmarks/.
+    base_url = (os.getenv("TAVILY_API_URL") or TAVILY_API_URL).rstrip("/")
     try:
-        client = TavilyClient(api_key=api_key)
-        response = client.search(
-            query=query,
-            search_depth="advanced",
-            max_results=8,
-            include_domains=["booking.com", "hotels.com", "tripadvisor.com"],
-            country=locale["country"],
+        response = await http_client.post(
+            f"{base_url}/search",
+            json={
+                "query": query,
+                "search_depth": "advanced",
+                "max_results": 8,
+                "include_domains": _BOOKING_DOMAINS,
+                "country": locale["country"],
+            },
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=SEARCH_TIMEOUT,
         )
+        response.raise_for_status()
+        quota.record(TAVILY, TAVILY_ADVANCED_SEARCH_CREDITS)
+        results = response.json().get("results", [])
+    except httpx.HTTPStatusError as e:
+        trace.get_current_span().set_attribute(
+            "http.response.status_code", e.response.status_code
+        )
+        return {"error": f"Hotel search failed ({e.response.status_code})."}
+    except httpx.TimeoutException:
+        return {"error": "Hotel search timed out."}
+    except (httpx.HTTPError, ValueError):
+        return {"error": "Hotel search is temporarily unavailable."}
+
+    if not results:
+        return {"error": f"No hotel results found for '{city}'."}
 
-        results = response.get("results", [])
-        if not results:
-            return {"error": f"No hotel results found for '{city}'."}
-
-        simplified = [
-            {
-                "url": _force_currency(r.get("url", ""), currency),
-                "title": r.get("title", ""),
-                "content": r.get("content", ""),
-                "score": r.get("score", 0.0),
-                "is_direct": _is_direct_hotel_url(r.get("url", "")),
-            }
-            for r in results
-        ]
-        # Direct single-property pages first — they're more useful to the
-        # user than generic city/category overview pages.
-        simplified.sort(key=lambda r: not r["is_direct"])
-
-        return {
-            "city": city,
-            "check_in": check_in,
-            "check_out": check_out,
-            "target_currency": currency,
-            "results": simplified,
+    simplified = [
+        {
+            "url": _force_currency(r.get("url", ""), currency),
+            "title": r.get("title", ""),
+            "content": r.get("content", ""),
+            "score": r.get("score", 0.0),
+            "is_direct": _is_direct_hotel_url(r.get("url", "")),
         }
+        for r in results
+    ]
+    # Direct single-property pages first — they're more useful to the
+    # user than generic city/category overview pages.
+    simplified.sort(key=lambda r: not r["is_direct"])
 
-    except Exception as exc:
-        return {"error": f"Hotel search failed: {str(exc)}"}
+    return _search_result(city, check_in, check_out, currency, simplified)
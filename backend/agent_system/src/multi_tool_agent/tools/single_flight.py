@@ -0,0 +1,94 @@
+"""Single-flight coalescing for concurrent identical tool calls.
+
+When a burst of chats asks about the same city at once, the response cache
+cannot help yet — nothing has come back to cache. Instead of each call
+going upstream on its own, the first caller runs the request and every
+identical call that arrives while it is in flight awaits the same result.
+"""
+
+import asyncio
+import functools
+import inspect
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from .cache import normalize_city
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight awaitable between callers using the same key."""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+
+    async def do(self, name: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn() unless an identical call is in flight; await its result.
+
+        Callers await the shared task through asyncio.shield, so one chat
+        timing out does not cancel the upstream request the others wait on.
+        """
+        self.calls[name] += 1
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced[name] += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": sum(self.calls.values()),
+            "coalesced": sum(self.coalesced.values()),
+            "in_flight": len(self._inflight),
+            "by_function": {
+                name: {"calls": count, "coalesced": self.coalesced[name]}
+                for name, count in self.calls.items()
+            },
+        }
+
+
+single_flight = SingleFlight()
+
+
+def coalesce(
+    fn: Optional[Callable[..., Awaitable[T]]] = None,
+    *,
+    ignore: Tuple[str, ...] = (),
+) -> Any:
+    """Decorate an async tool so identical concurrent calls share one run.
+
+    Arguments are bound against the signature (so positional and keyword
+    spellings match) and a "city" argument is normalized the same way the
+    response cache keys it. Arguments named in `ignore` do not affect the
+    result and are left out of the key. functools.wraps keeps the signature
+    and docstring ADK builds the tool declaration from.
+    """
+
+    def decorate(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        signature = inspect.signature(fn)
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in ignore}
+            if isinstance(arguments.get("city"), str):
+                arguments["city"] = normalize_city(arguments["city"])
+            key = (name, tuple(sorted(arguments.items())))
+            return await single_flight.do(name, key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
@@ -1,5 +1,32 @@
 """Shared utilities for weather tools."""
 
+from typing import Any, Dict, Iterable, Optional
+
+# Fields of CurrentWeather / DayWeather in api/weather_payload.py — the only
+# ones the agent copies into weather-json. Everything else in a timeline
+# response is LLM input tokens that never reach the user.
+DAY_FIELDS = (
+    "datetime",
+    "temp",
+    "tempmax",
+    "tempmin",
+    "windspeed",
+    "winddir",
+    "pressure",
+    "humidity",
+    "sunrise",
+    "sunset",
+    "conditions",
+)
+# tempmax/tempmin are not part of currentConditions; they are filled in from
+# today's day entry instead. Its datetime is a bare time the schema never uses.
+CURRENT_FIELDS = tuple(
+    f for f in DAY_FIELDS if f not in ("datetime", "tempmax", "tempmin")
+)
+LOCATION_FIELDS = ("resolvedAddress", "timezone")
+
+MAX_FORECAST_DAYS = 15
+
 
 def _time_to_hhmm(value: str | None) -> str | None:
     """Truncate HH:MM:SS to HH:MM."""
@@ -11,21 +38,39 @@ def _time_to_hhmm(value: str | None) -> str | None:
     return value
 
 
-def normalize_sunrise_sunset(data: dict) -> dict:
-    """Convert sunrise/sunset from HH:MM:SS to HH:MM in API response."""
-    result = dict(data)
-    if "currentConditions" in result and isinstance(result["currentConditions"], dict):
-        current = dict(result["currentConditions"])
-        current["sunrise"] = _time_to_hhmm(current.get("sunrise"))
-        current["sunset"] = _time_to_hhmm(current.get("sunset"))
-        result["currentConditions"] = current
-    if "days" in result:
-        result["days"] = [
-            {
-                **day,
-                "sunrise": _time_to_hhmm(day.get("sunrise")),
-                "sunset": _time_to_hhmm(day.get("sunset")),
-            }
-            for day in result["days"]
-        ]
+def _project(source: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Copy only `fields` out of source, normalizing sunrise/sunset to HH:MM."""
+    projected = {field: source[field] for field in fields if field in source}
+    for field in ("sunrise", "sunset"):
+        if field in projected:
+            projected[field] = _time_to_hhmm(projected[field])
+    return projected
+
+
+def project_timeline(data: dict, kind: str, max_days: Optional[int] = None) -> dict:
+    """
+    Reduce a timeline response to what the weather-json schema uses.
+
+    One pass builds fresh, minimal dicts — the location fields, the schema
+    fields of each day (at most max_days of them) and, for kind "current",
+    the current conditions completed with today's tempmax/tempmin.
+    """
+    result = _project(data, LOCATION_FIELDS)
+
+    days = data.get("days")
+    if isinstance(days, list):
+        if max_days is not None:
+            days = days[:max_days]
+        result["days"] = [_project(day, DAY_FIELDS) for day in days]
+
+    current = data.get("currentConditions")
+    if kind == "current" and isinstance(current, dict):
+        projected = _project(current, CURRENT_FIELDS)
+        if result.get("days"):
+            today = result["days"][0]
+            for field in ("tempmax", "tempmin"):
+                if field in today:
+                    projected[field] = today[field]
+        result["currentConditions"] = projected
+
     return result
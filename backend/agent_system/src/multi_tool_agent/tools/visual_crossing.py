@@ -0,0 +1,173 @@
+"""Visual Crossing timeline fetch shared by the three weather tools."""
+
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Literal, Optional
+from urllib.parse import quote
+
+import httpx
+from opentelemetry import trace
+
+from . import http_client
+from .cache import TTLCache, normalize_city
+from .quota import VISUAL_CROSSING, quota
+from .utils import DAY_FIELDS, MAX_FORECAST_DAYS, project_timeline
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+API_HTTP = "https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services/timeline/"
+# Overrides API_HTTP, e.g. to point at the load-test stand-in (benchmarks/).
+API_URL_ENV = "VISUAL_CROSSING_API_URL"
+
+TimelineKind = Literal["current", "forecast", "history"]
+
+# How long a successful response stays cached, per kind. Fully past history
+# never changes, so it is kept until LRU eviction pushes it out.
+CACHE_TTL_SECONDS: Dict[str, float] = {
+    "current": 10 * 60,
+    "forecast": 60 * 60,
+    "history": 30 * 24 * 60 * 60,
+}
+
+timeline_cache = TTLCache(max_entries=512)
+
+# Ask the API for the schema fields only, and skip hourly data, alerts and
+# station metadata entirely. DAY_FIELDS also covers every currentConditions
+# field the schema uses.
+_ELEMENTS = ",".join(DAY_FIELDS)
+_INCLUDE = {"current": "days,current", "forecast": "days", "history": "days"}
+_MAX_DAYS = {"current": 1, "forecast": MAX_FORECAST_DAYS, "history": None}
+
+# Running totals of what projection removed before responses reach the LLM.
+projection_stats: Dict[str, int] = {"calls": 0, "raw_bytes": 0, "projected_bytes": 0}
+
+
+def _record_projection(kind: str, city: str, raw_bytes: int, projected: dict) -> None:
+    projected_bytes = len(json.dumps(projected, ensure_ascii=False).encode())
+    projection_stats["calls"] += 1
+    projection_stats["raw_bytes"] += raw_bytes
+    projection_stats["projected_bytes"] += projected_bytes
+    # ~4 bytes per token is the usual rule of thumb for JSON-ish text.
+    saved = max(raw_bytes - projected_bytes, 0)
+    logger.info(
+        "Projected %s timeline for %r: %d -> %d bytes (~%d tokens saved)",
+        kind,
+        city,
+        raw_bytes,
+        projected_bytes,
+        saved // 4,
+    )
+
+
+def is_settled(end_date: str, today: Optional[date] = None) -> bool:
+    """True when every day up to end_date is over in every timezone.
+
+    A date one day before UTC today can still be "today" west of UTC, so
+    only dates at least two days back are treated as final.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    try:
+        return date.fromisoformat(end_date) < today - timedelta(days=1)
+    except ValueError:
+        return False
+
+
+def cache_ttl(kind: TimelineKind, end_date: str = "") -> float:
+    """TTL for a response; history reaching into recent days ages like a forecast."""
+    if kind == "history" and not is_settled(end_date):
+        return CACHE_TTL_SECONDS["forecast"]
+    return CACHE_TTL_SECONDS[kind]
+
+
+def timeline_url(city: str, start_date: str = "", end_date: str = "") -> str:
+    """Build the timeline URL (without query string) for a city and date range."""
+    base = os.getenv(API_URL_ENV) or API_HTTP
+    url = f"{base}{quote(city.strip(), safe='')}"
+    if start_date:
+        url += f"/{start_date}"
+        if end_date:
+            url += f"/{end_date}"
+    return url
+
+
+@tracer.start_as_current_span("visual_crossing.fetch_timeline")
+async def fetch_timeline(
+    city: str,
+    kind: TimelineKind,
+    start_date: str = "",
+    end_date: str = "",
+    not_found_error: str = "",
+) -> Dict[str, Any]:
+    """
+    Fetch a Visual Crossing timeline through the shared HTTP client.
+
+    Successful responses are cached per (kind, normalized city, date range),
+    so "Kraków", "krakow " and "KRAKOW" share one upstream call. Close to
+    the Visual Crossing budget (see quota.py) only the cache answers,
+    expired entries included.
+
+    Args:
+        city: The city name.
+        kind: Which tool is asking; selects the cache TTL.
+        start_date: Optional start date (YYYY-MM-DD, or a dynamic period
+            such as "today"); omitted means the API's default 15-day
+            forecast window.
+        end_date: Optional end date (YYYY-MM-DD).
+        not_found_error: Message returned when the API answers 400, which it
+            does for unknown cities and invalid date ranges alike.
+
+    Returns:
+        The response projected down to the weather-json schema fields (see
+        utils.project_timeline), or {"error": "..."} if the call failed.
+    """
+    api_key = os.getenv("VISUAL_CROSSING_API_KEY")
+    if not api_key:
+        return {"error": "Weather service API key is not configured."}
+
+    span = trace.get_current_span()
+    span.set_attribute("weather.kind", kind)
+    cache_key = (kind, normalize_city(city), start_date, end_date)
+    shedding = not quota.allows(VISUAL_CROSSING)
+    cached = timeline_cache.get(cache_key, allow_stale=shedding)
+    span.set_attribute("cache.hit", cached is not None)
+    if cached is not None:
+        return cached
+    if shedding:
+        return {
+            "error": "Weather lookups are limited to recently requested places "
+            "right now. Please try again later."
+        }
+
+    params = {
+        "unitGroup": "metric",
+        "key": api_key,
+        "contentType": "json",
+        "elements": _ELEMENTS,
+        "include": _INCLUDE[kind],
+    }
+    try:
+        response = await http_client.get(
+            timeline_url(city, start_date, end_date), params=params
+        )
+        response.raise_for_status()
+        weather_data = project_timeline(response.json(), kind, _MAX_DAYS[kind])
+        _record_projection(kind, city, len(response.content), weather_data)
+        # Visual Crossing bills one record per returned day.
+        quota.record(VISUAL_CROSSING, max(len(weather_data.get("days", [])), 1))
+        timeline_cache.set(cache_key, weather_data, cache_ttl(kind, end_date))
+        return weather_data
+    except httpx.HTTPStatusError as e:
+        span.set_attribute("http.response.status_code", e.response.status_code)
+        if e.response.status_code == 400:
+            return {"error": not_found_error or f"City '{city}' not found or invalid."}
+        return {"error": f"Weather service error ({e.response.status_code})."}
+    except httpx.TimeoutException:
+        return {"error": "Weather service request timed out."}
+    except httpx.HTTPError:
+        return {"error": "Weather service is temporarily unavailable."}
+    except ValueError:
+        # response.json() raises json.JSONDecodeError, a ValueError subclass.
+        return {"error": "Weather service returned invalid data."}
@@ -0,0 +1,108 @@
+"""Build weather-json payloads straight from projected timeline responses.
+
+Copying numbers from a tool response into the weather-json fence is pure
+transcription, yet it used to cost a whole LLM generation on the hottest
+path. The get_weather agent now builds the payload here and only asks the
+model for the short human sentence; the payload matches
+WeatherCurrentPayload / WeatherDaysPayload in api/weather_payload.py.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from .utils import CURRENT_FIELDS, DAY_FIELDS
+
+# The schema requires every one of these; a day missing any of them would
+# fail validation, so it is left out rather than shipped half-filled.
+_REQUIRED_CURRENT = CURRENT_FIELDS + ("tempmax", "tempmin")
+
+KIND_BY_TOOL = {
+    "get_current_weather": "current",
+    "get_forecast": "forecast",
+    "get_history_weather": "history",
+}
+
+
+def _complete(source: Any, fields: tuple) -> Optional[Dict[str, Any]]:
+    if not isinstance(source, dict):
+        return None
+    if any(source.get(field) is None for field in fields):
+        return None
+    return {field: source[field] for field in fields}
+
+
+def build_weather_payload(
+    tool_response: Dict[str, Any], kind: str, city: str, language: str = "en"
+) -> Optional[Dict[str, Any]]:
+    """
+    Turn a weather tool's response into a weather-json payload.
+
+    Args:
+        tool_response: The projected timeline returned by a weather tool.
+        kind: "current", "forecast" or "history".
+        city: The city the tool was called with (used for meta.city).
+        language: ISO 639-1 code of the reply (meta.language).
+
+    Returns:
+        The payload dict, or None when the response lacks data the schema
+        requires — the caller then leaves the reply without a fence.
+    """
+    city = (city or "").strip()
+    if not city or not isinstance(tool_response, dict) or "error" in tool_response:
+        return None
+    meta: Dict[str, Any] = {
+        "city": city,
+        "kind": kind,
+        "date": None,
+        "date_range": None,
+        "language": (language or "en").strip().lower() or "en",
+    }
+
+    raw_days = tool_response.get("days") or []
+    days: List[Dict[str, Any]] = [
+        day for day in (_complete(d, DAY_FIELDS) for d in raw_days) if day
+    ]
+
+    if kind == "current":
+        current = _complete(tool_response.get("currentConditions"), _REQUIRED_CURRENT)
+        if current is None or not days:
+            return None
+        meta["date"] = days[0]["datetime"]
+        return {"meta": meta, "current": current}
+
+    if kind in ("forecast", "history") and days:
+        meta["date_range"] = f"{days[0]['datetime']}..{days[-1]['datetime']}"
+        return {"meta": meta, "days": days}
+
+    return None
+
+
+def render_fence(payload: Dict[str, Any]) -> str:
+    """Serialize a payload as the fenced block the frontend parses."""
+    body = json.dumps(payload, ensure_ascii=False, indent=2)
+    return f"```weather-json\n{body}\n```"
+
+
+_TEMPLATES = {
+    "en": {
+        "current": "Current weather in {city}: {conditions}.",
+        "forecast": "Here is the forecast for {city} ({date_range}).",
+        "history": "Here is the weather history for {city} ({date_range}).",
+    },
+    "pl": {
+        "current": "Aktualna pogoda – {city}: {conditions}.",
+        "forecast": "Prognoza pogody – {city} ({date_range}).",
+        "history": "Historia pogody – {city} ({date_range}).",
+    },
+}
+
+
+def template_summary(payload: Dict[str, Any]) -> str:
+    """One-line human text for when the model returned no text of its own."""
+    meta = payload["meta"]
+    templates = _TEMPLATES.get(meta["language"], _TEMPLATES["en"])
+    conditions = payload.get("current", {}).get("conditions", "")
+    date_range = (meta.get("date_range") or "").replace("..", " – ")
+    return templates[meta["kind"]].format(
+        city=meta["city"], conditions=conditions, date_range=date_range
+    )
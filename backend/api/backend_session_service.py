@@ -0,0 +1,228 @@
+"""ADK session service persisting conversations in a SessionBackend.
+
+Each ADK session is stored as one JSON document (the Session model, events
+included) under its own key, refreshed with the session TTL on every
+appended event. Any worker can then load the conversation a previous turn
+was served by another worker. Events are appended with the backend's atomic
+update, so two workers (or a double-submitted turn) appending to one
+session never drop each other's events. The stored history is compacted on
+append (see history_compaction), which keeps the document bounded.
+
+With a process-local backend nothing else can write a session, so the
+service keeps the live Session objects instead and appends to them in
+place; parsing and re-serializing the whole document on every event would
+buy nothing there.
+"""
+
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+from google.adk.sessions.state import State
+
+from .history_compaction import KEEP_TURNS, MAX_SESSION_BYTES, compact_session
+from .session_backend import KEY_PREFIX, SessionBackend
+
+
+def _apply_event(session: Session, event: Event) -> None:
+    """What BaseSessionService.append_event does, as a plain function.
+
+    The atomic update runs it between a backend read and write (in a worker
+    thread for SQLite), where the base class's coroutine cannot be awaited.
+    """
+    if event.actions and event.actions.state_delta:
+        for key, value in event.actions.state_delta.items():
+            if not key.startswith(State.TEMP_PREFIX):
+                session.state[key] = value
+    session.events.append(event)
+    session.last_update_time = event.timestamp
+
+
+class BackendSessionService(BaseSessionService):
+    """BaseSessionService over a SessionBackend.
+
+    app:/user: prefixed state is kept on the session itself rather than in
+    shared app/user records; this app issues one user id per session and
+    sets no app-scoped state, so the two are equivalent here.
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        ttl_seconds: float,
+        keep_turns: int = KEEP_TURNS,
+        max_bytes: int = MAX_SESSION_BYTES,
+    ) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.keep_turns = keep_turns
+        self.max_bytes = max_bytes
+        # Size of each session document this process last wrote, for the
+        # session manager's memory accounting.
+        self.stored_bytes: Dict[str, int] = {}
+        self.total_bytes = 0
+        # key -> (session, expiry), used instead of documents when the
+        # backend is not shared.
+        self._live: Optional[Dict[str, Tuple[Session, float]]] = (
+            None if backend.shared else backend.live
+        )
+
+    @staticmethod
+    def _key(app_name: str, user_id: str, session_id: str) -> str:
+        return f"{KEY_PREFIX}adk:{app_name}:{user_id}:{session_id}"
+
+    def _live_session(self, key: str) -> Optional[Session]:
+        entry = self._live.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._live[key]
+            return None
+        return entry[0]
+
+    async def _load(
+        self, app_name: str, user_id: str, session_id: str
+    ) -> Optional[Session]:
+        key = self._key(app_name, user_id, session_id)
+        if self._live is not None:
+            # A copy, like a parsed document: callers may trim its events.
+            session = self._live_session(key)
+            return session.model_copy(deep=True) if session else None
+        raw = await self.backend.get(key)
+        return Session.model_validate_json(raw) if raw else None
+
+    def _document(self, session: Session) -> str:
+        """Serialize `session`, compacting its history first if it is over."""
+        document = session.model_dump_json()
+        if compact_session(
+            session, self.keep_turns, self.max_bytes, len(document.encode())
+        ):
+            document = session.model_dump_json()
+        return document
+
+    def _account(self, session_id: str, document: str) -> None:
+        size = len(document.encode())
+        self.total_bytes += size - self.stored_bytes.get(session_id, 0)
+        self.stored_bytes[session_id] = size
+
+    async def _store(self, session: Session) -> None:
+        key = self._key(session.app_name, session.user_id, session.id)
+        document = self._document(session)
+        self._account(session.id, document)
+        if self._live is not None:
+            stored = session.model_copy(deep=True)
+            self._live[key] = (stored, time.time() + self.ttl_seconds)
+            return
+        await self.backend.set(key, document, self.ttl_seconds)
+
+    def _append_live(self, key: str, stored: Session, event: Event) -> None:
+        """Append to a live session, serializing only the new event.
+
+        The size is kept as a running total, so the whole session is only
+        serialized again when compaction folded or truncated something.
+        """
+        _apply_event(stored, event)
+        size = self.stored_bytes.get(stored.id, 0)
+        size += len(event.model_dump_json().encode())
+        if compact_session(stored, self.keep_turns, self.max_bytes, size):
+            size = len(stored.model_dump_json().encode())
+        self.total_bytes += size - self.stored_bytes.get(stored.id, 0)
+        self.stored_bytes[stored.id] = size
+        self._live[key] = (stored, time.time() + self.ttl_seconds)
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=(session_id or "").strip() or str(uuid.uuid4()),
+            state=state or {},
+            last_update_time=time.time(),
+        )
+        await self._store(session)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        session = await self._load(app_name, user_id, session_id)
+        if session is None or config is None:
+            return session
+        if config.num_recent_events:
+            session.events = session.events[-config.num_recent_events :]
+        if config.after_timestamp:
+            session.events = [
+                e for e in session.events if e.timestamp >= config.after_timestamp
+            ]
+        return session
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: str
+    ) -> ListSessionsResponse:
+        prefix = self._key(app_name, user_id, "")
+        if self._live is not None:
+            keys = [key for key in self._live if key.startswith(prefix)]
+        else:
+            keys = await self.backend.scan_keys(prefix)
+        sessions = []
+        for key in keys:
+            session = await self._load(app_name, user_id, key[len(prefix) :])
+            if session is not None:
+                session.events = []
+                sessions.append(session)
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        key = self._key(app_name, user_id, session_id)
+        if self._live is not None:
+            self._live.pop(key, None)
+        else:
+            await self.backend.delete(key)
+        self.total_bytes -= self.stored_bytes.pop(session_id, 0)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        key = self._key(session.app_name, session.user_id, session.id)
+
+        if self._live is not None:
+            stored = self._live_session(key)
+            if stored is not None:
+                self._append_live(key, stored, event)
+            return event
+
+        # Append to the stored copy rather than writing `session` back: the
+        # caller's object may have been loaded with a trimmed event list, and
+        # another worker may have appended since it was loaded.
+        def append(raw: Optional[str]) -> Optional[str]:
+            if not raw:
+                return None
+            stored = Session.model_validate_json(raw)
+            _apply_event(stored, event)
+            return self._document(stored)
+
+        document = await self.backend.update(key, append, self.ttl_seconds)
+        if document is not None:
+            self._account(session.id, document)
+        return event
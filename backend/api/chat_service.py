@@ -1,30 +1,83 @@
 import asyncio
+import functools
 import json
 import logging
 import os
 import re
+import sqlite3
+import time
+import uuid
+from contextlib import aclosing
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Any, AsyncIterator, NamedTuple, Optional, Set, Tuple
 
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event, EventActions
 from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
 from google.genai import types
+from opentelemetry import trace
+from opentelemetry.trace import StatusCode
 
 import agent_system.src.multi_tool_agent.agent as agent_module
+from agent_system.src.multi_tool_agent.tools.cache import normalize_city
+from agent_system.src.multi_tool_agent.tools.hotel_index import get_hotel_index
+from agent_system.src.multi_tool_agent.tools.hotel_locale import target_currency
+from agent_system.src.multi_tool_agent.tools.quota import (
+    EXHAUSTED,
+    GEMINI,
+    model_calls,
+    quota,
+)
 
-from .combined_payload import validate_combined_payload
-from .hotel_payload import validate_hotel_payload
-from .models import ChatRequest, ChatResponse
+from .combined_payload import CombinedPayload, validate_combined_payload
+from .hotel_payload import HotelPayload, validate_hotel_payload
+from .intent import WeatherIntent, intent_router, parse_weather_intent
+from .models import ChatRequest, ChatResponse, ChatStreamEvent
+from .prometheus import (
+    CHAT_LATENCY,
+    CHAT_TIMEOUTS,
+    LLM_TURNS,
+    MALFORMED_JSON,
+    PARALLEL_COMBINED_TURNS,
+    TOOL_LATENCY,
+    VALIDATION_FAILURES,
+)
 from .session_manager import APP_NAME, session_manager
+from .tracing import request_id_var
+from .turn_cache import turn_cache
 from .weather_payload import validate_weather_payload
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
 
 # Timeout for the ADK runner. Covers the full round-trip: LLM call(s) + tool
-# calls + final response generation. Combined weather+hotel replies chain up
-# to 3 root-level LLM turns plus 2 nested AgentTool sub-runs, so this needs
-# more headroom than a single-intent reply.
+# calls + final response generation. Combined weather+hotel replies left to
+# root chain up to 3 root-level LLM turns plus 2 nested AgentTool sub-runs,
+# so this needs more headroom than a single-intent reply.
 _ADK_TIMEOUT_SECONDS = 100
 
+# "parallel" (default) runs a first message the router is sure asks for
+# weather and hotels as concurrent sub-agent runs, assembled server-side;
+# "agent" leaves it to root's COMBINED QUERY LOGIC.
+_PARALLEL_COMBINED = (os.getenv("COMBINED_QUERY_MODE") or "parallel") != "agent"
+_WEATHER_SCOPE = (
+    "[Weather-and-hotels request: answer only the weather part,"
+    " then suggest three things to do]"
+)
+_HOTELS_SCOPE = "[Weather-and-hotels request: only find the hotels]"
+# Stands in for a failed branch's text, as root's partial failure rules ask.
+_UNAVAILABLE = {
+    "en": {
+        "weather": "Weather information is unavailable right now.",
+        "hotels": "Hotel information is unavailable right now.",
+    },
+    "pl": {
+        "weather": "Informacje o pogodzie są teraz niedostępne.",
+        "hotels": "Informacje o hotelach są teraz niedostępne.",
+    },
+}
+
 # Matches weather-json, hotel-json, combined-json, and plain json fenced blocks.
 FENCE_PATTERN = re.compile(
     r"```\s*(weather-json|hotel-json|combined-json|json)\s*\n([\s\S]*?)\n```",
@@ -35,6 +88,51 @@ FENCE_PATTERN = re.compile(
 # harmless to strip, and recovers an otherwise well-formed payload.
 _TRAILING_COMMA_PATTERN = re.compile(r",(\s*[}\]])")
 
+try:
+    # Optional: parses the fenced payloads several times faster. Its decode
+    # error subclasses json.JSONDecodeError, so the handling is the same.
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+@functools.cache
+def get_runner(agent_name: Optional[str] = None) -> Runner:
+    """Return the process-wide ADK Runner, building it on first use.
+
+    A Runner holds no per-turn state — every run_async call gets its own
+    invocation context — so one instance safely serves concurrent chats,
+    and constructing it per message was pure overhead.
+
+    With `agent_name` the Runner starts a new session's first turn at that
+    sub-agent instead of root, as if root had transferred to it. The agent
+    tree is the same, so later turns on the root Runner resume with the
+    sub-agent, and it can still hand a message back to root.
+    """
+    agent = agent_module.root_agent
+    if agent_name is not None:
+        agent = agent.find_agent(agent_name)
+    return Runner(
+        agent=agent,
+        app_name=APP_NAME,
+        session_service=session_manager.session_service,
+    )
+
+
+@functools.cache
+def get_sub_agent_runner(agent_name: str) -> Runner:
+    """Return the Runner that runs `agent_name` alone, building it on first use.
+
+    Like an AgentTool sub-run it has its own in-memory session service, so
+    the parallel combined turn's branches never write to the chat session;
+    each run takes a throwaway session from it (see _run_sub_agent).
+    """
+    return Runner(
+        agent=agent_module.root_agent.find_agent(agent_name),
+        app_name=agent_name,
+        session_service=InMemorySessionService(),
+    )
+
 
 def _with_date_header(message: str, now: Optional[datetime] = None) -> str:
     """Prefix the user's message with the current date.
@@ -49,8 +147,22 @@ def _with_date_header(message: str, now: Optional[datetime] = None) -> str:
     return f"[Today is {now:%Y-%m-%d}, {now:%A}] {message}"
 
 
-def _extract_fenced_json(raw_text: str) -> Optional[Tuple[str, dict]]:
-    """Return (fence_type, parsed_dict) for the first fenced JSON block, or None."""
+class FencedReply(NamedTuple):
+    """The first fenced JSON block of a reply, parsed once.
+
+    `start` is where the fence begins in the raw text (everything before it
+    is the human text); `body` is the JSON text to ship — the model's own,
+    or the repaired text when the trailing-comma repair was needed.
+    """
+
+    fence_type: str
+    payload: Any
+    start: int
+    body: str
+
+
+def _extract_fenced_json(raw_text: str) -> Optional[FencedReply]:
+    """Find, parse and (if needed) repair the first fenced JSON block, or None."""
     match = FENCE_PATTERN.search(raw_text)
     if not match:
         return None
@@ -58,12 +170,15 @@ def _extract_fenced_json(raw_text: str) -> Optional[Tuple[str, dict]]:
     json_body = match.group(2).strip()
 
     try:
-        return fence_type, json.loads(json_body)
+        return FencedReply(fence_type, _json_loads(json_body), match.start(), json_body)
     except json.JSONDecodeError:
         repaired = _TRAILING_COMMA_PATTERN.sub(r"\1", json_body)
         if repaired != json_body:
             try:
-                return fence_type, json.loads(repaired)
+                # The repaired text is what parsed, so it ships as is: the
+                # client never sees the malformed original.
+                payload = _json_loads(repaired)
+                return FencedReply(fence_type, payload, match.start(), repaired)
             except json.JSONDecodeError:
                 pass
         # Log the raw offending body so failures can actually be diagnosed —
@@ -78,168 +193,531 @@ def _extract_fenced_json(raw_text: str) -> Optional[Tuple[str, dict]]:
 
 
 def _normalize_agent_response(
-    raw_text: str,
-    fence_type: Optional[str] = None,
-    json_payload: Optional[dict] = None,
+    raw_text: str, reply: Optional[FencedReply] = None
 ) -> str:
     """
     Re-emit the human text + fenced JSON block from the agent's raw response.
 
-    When json_payload is provided (the already-parsed, trailing-comma-repaired
-    dict from _extract_fenced_json), it is re-serialized here instead of
-    re-slicing raw_text — otherwise a payload that only validated because of
-    the repair would still ship the original malformed JSON text to the
-    client, which fails JSON.parse there silently.
+    `reply` is the block _extract_fenced_json already found: its span and
+    body are reused, so the text is neither searched nor serialized again.
+    Without one the reply has no fenced block and is returned unchanged.
     """
     if not raw_text:
         return "[Agent error] No response content"
+    if reply is None:
+        return raw_text
 
-    match = FENCE_PATTERN.search(raw_text)
-    if match:
-        human_text = raw_text[: match.start()].strip()
-        resolved_fence_type = fence_type or match.group(1).lower()
-        json_body = (
-            json.dumps(json_payload, ensure_ascii=False, indent=2)
-            if json_payload is not None
-            else match.group(2).strip()
-        )
-        return (
-            human_text + "\n\n" if human_text else ""
-        ) + f"```{resolved_fence_type}\n{json_body}\n```"
-
-    return raw_text
+    human_text = raw_text[: reply.start].strip()
+    return (
+        human_text + "\n\n" if human_text else ""
+    ) + f"```{reply.fence_type}\n{reply.body}\n```"
 
 
 def _detect_error_in_response(
     raw_text: str,
-) -> Tuple[bool, Optional[str], Optional[str], Optional[dict]]:
+) -> Tuple[bool, Optional[str], Optional[FencedReply]]:
     """
     Detect if the agent response contains an error.
     Agent returns errors in fenced blocks as {"error": "message"}.
 
     Returns:
-        (is_error, error_message, fence_type, json_payload)
+        (is_error, error_message, fenced_reply)
     """
     if not raw_text:
-        return True, "No response content from agent.", None, None
+        return True, "No response content from agent.", None
 
     try:
-        result = _extract_fenced_json(raw_text)
+        reply = _extract_fenced_json(raw_text)
     except (json.JSONDecodeError, TypeError) as exc:
-        return True, f"Agent returned malformed JSON: {exc}", None, None
+        MALFORMED_JSON.inc()
+        return True, f"Agent returned malformed JSON: {exc}", None
 
-    if result is not None:
-        fence_type, parsed_json = result
+    if reply is not None:
+        parsed_json = reply.payload
         if isinstance(parsed_json, dict) and "error" in parsed_json:
             error_msg = parsed_json["error"]
             if error_msg:
-                return True, str(error_msg), fence_type, parsed_json
-            return True, "Agent encountered an error.", fence_type, parsed_json
-        return False, None, fence_type, parsed_json
+                return True, str(error_msg), reply
+            return True, "Agent encountered an error.", reply
+        return False, None, reply
+
+    return False, None, None
 
-    return False, None, None, None
 
+def _validate_payload(fence_type: str, payload: dict) -> Any:
+    """Route payload validation to the right validator by fence type and kind.
 
-def _validate_payload(fence_type: str, payload: dict) -> None:
-    """Route payload validation to the right validator by fence type and kind."""
+    Returns the validated model.
+    """
     kind = payload.get("meta", {}).get("kind") if isinstance(payload, dict) else None
 
     if fence_type == "combined-json" or kind == "combined":
-        validate_combined_payload(payload)
-    elif fence_type == "hotel-json" or kind == "hotels":
-        validate_hotel_payload(payload)
+        return validate_combined_payload(payload)
+    if fence_type == "hotel-json" or kind == "hotels":
+        return validate_hotel_payload(payload)
+    return validate_weather_payload(payload)
+
+
+# One short status line per tool call, streamed while the tool runs so the
+# client has something better than a spinner to show.
+_TOOL_PROGRESS = {
+    "get_current_weather": "Fetching current weather…",
+    "get_forecast": "Fetching forecast…",
+    "get_history_weather": "Fetching weather history…",
+    "search_hotels": "Searching hotels…",
+    "build_hotel_booking_link": "Preparing booking links…",
+    "get_weather_agent": "Checking the weather…",
+    "search_hotels_agent": "Looking for hotels…",
+    "transfer_to_agent": "Routing your question…",
+}
+
+
+def _event_text(event) -> str:
+    """Join the text parts of an ADK event's content."""
+    if not (getattr(event, "content", None) and getattr(event.content, "parts", None)):
+        return ""
+    return "\n".join(
+        text for part in event.content.parts if (text := getattr(part, "text", None))
+    ).strip()
+
+
+def _progress_events(event) -> list[ChatStreamEvent]:
+    """Translate an intermediate ADK event into stream events for the client."""
+    stream_events = []
+    for call in event.get_function_calls():
+        stream_events.append(
+            ChatStreamEvent(
+                event="progress",
+                data={
+                    "stage": "tool_call",
+                    "tool": call.name,
+                    "message": _TOOL_PROGRESS.get(call.name, "Working on it…"),
+                },
+            )
+        )
+    for response in event.get_function_responses():
+        stream_events.append(
+            ChatStreamEvent(
+                event="progress",
+                data={"stage": "tool_result", "tool": response.name},
+            )
+        )
+    if getattr(event, "partial", False) and (text := _event_text(event)):
+        stream_events.append(ChatStreamEvent(event="partial", data={"text": text}))
+    return stream_events
+
+
+def _observe_tool_latency(event, pending: dict) -> None:
+    """Time tool calls from the call event to the matching response event.
+
+    Both events are stamped by ADK when created, so the difference is the
+    tool's run time (for AgentTool, the whole sub-run).
+    """
+    for call in event.get_function_calls():
+        pending[call.id or call.name] = event.timestamp
+    for response in event.get_function_responses():
+        started = pending.pop(response.id or response.name, None)
+        if started is not None:
+            TOOL_LATENCY.labels(tool=response.name or "unknown").observe(
+                max(event.timestamp - started, 0.0)
+            )
+
+
+# Hotel index writes still running; kept so they are not dropped mid-write.
+_index_writes: Set[asyncio.Future] = set()
+
+
+def _index_hotels(validated: HotelPayload | CombinedPayload) -> None:
+    """Record a validated reply's hotels in the hotel index, off the event loop.
+
+    search_hotels answers from them when Tavily is shed or failing. Hotels
+    priced in another currency than the chat's are skipped, so they never
+    answer under the wrong one. The Hotel models are the ones validation
+    built (and sanitized), so nothing is validated again.
+    """
+    currency = target_currency(validated.meta.language)
+    hotels = [
+        hotel.model_dump()
+        for hotel in validated.hotels
+        if hotel.currency in ("", currency)
+    ]
+    if not hotels:
+        return
+    city = normalize_city(validated.meta.city)
+
+    def write() -> None:
+        try:
+            get_hotel_index().put_hotels(city, currency, hotels)
+        except (OSError, sqlite3.Error):
+            logger.warning("Failed to index hotels for %s", city, exc_info=True)
+
+    future = asyncio.get_running_loop().run_in_executor(None, write)
+    _index_writes.add(future)
+    future.add_done_callback(_index_writes.discard)
+
+
+def _final_chat_response(
+    raw_text: str, session_id: str, intent: Optional[WeatherIntent] = None
+) -> ChatResponse:
+    """Run the detect → validate → normalize pipeline on the final agent text.
+
+    With `intent` (a plain weather question opening a session) a valid
+    weather-json reply is also offered to the turn cache; the hotels of a
+    valid hotel-json or combined-json reply go to the hotel index.
+    """
+    with tracer.start_as_current_span("chat.extract_json"):
+        is_error, error_message, reply = _detect_error_in_response(raw_text)
+    if is_error:
+        return ChatResponse(success=False, error=error_message, session_id=session_id)
+
+    validated = None
+    if reply is not None:
+        with tracer.start_as_current_span("chat.validate"):
+            try:
+                validated = _validate_payload(reply.fence_type, reply.payload)
+            except ValueError as exc:
+                VALIDATION_FAILURES.labels(fence_type=reply.fence_type).inc()
+                return ChatResponse(
+                    success=False,
+                    error=f"Invalid response data: {exc}",
+                    session_id=session_id,
+                )
+
+    with tracer.start_as_current_span("chat.normalize"):
+        normalized = _normalize_agent_response(raw_text, reply)
+    if intent is not None and reply is not None and reply.fence_type == "weather-json":
+        turn_cache.put(intent, reply.payload, normalized)
+    if isinstance(validated, (HotelPayload, CombinedPayload)):
+        _index_hotels(validated)
+    return ChatResponse(
+        success=True,
+        data={"message": normalized, "sender": "ai"},
+        session_id=session_id,
+    )
+
+
+async def _seed_turn(
+    session_data: dict,
+    message_text: str,
+    reply: str,
+    author: str,
+    state_delta: dict,
+) -> None:
+    """Record a turn answered outside the root Runner in the ADK session.
+
+    The events match what a real turn leaves behind for follow-ups: the
+    user's message, then `author`'s reply with the output_key state the
+    agents would have written. ADK resumes the next turn with `author`.
+    """
+    service = session_manager.session_service
+    session = await service.get_session(
+        app_name=APP_NAME,
+        user_id=session_data["user_id"],
+        session_id=session_data["adk_session_id"],
+    )
+    if session is None:
+        return
+    invocation_id = f"e-{uuid.uuid4()}"
+    events = (
+        Event(
+            invocation_id=invocation_id,
+            author="user",
+            content=types.Content(role="user", parts=[types.Part(text=message_text)]),
+        ),
+        Event(
+            invocation_id=invocation_id,
+            author=author,
+            content=types.Content(role="model", parts=[types.Part(text=reply)]),
+            actions=EventActions(state_delta=state_delta),
+        ),
+    )
+    for event in events:
+        await service.append_event(session, event)
+
+
+async def _run_sub_agent(agent_name: str, text: str, user_id: str) -> str:
+    """Run `agent_name` alone on `text` and return its last reply.
+
+    Each run gets a throwaway session, dropped afterwards, so concurrent
+    runs never write to the same one.
+    """
+    runner = get_sub_agent_runner(agent_name)
+    session = await runner.session_service.create_session(
+        app_name=agent_name, user_id=user_id
+    )
+    reply = ""
+    content = types.Content(role="user", parts=[types.Part(text=text)])
+    try:
+        async with aclosing(
+            runner.run_async(
+                user_id=user_id, session_id=session.id, new_message=content
+            )
+        ) as events:
+            async for event in events:
+                reply = _event_text(event) or reply
+    finally:
+        await runner.session_service.delete_session(
+            app_name=agent_name, user_id=user_id, session_id=session.id
+        )
+    return reply
+
+
+def _branch_reply(raw_text: str, fence_type: str) -> Optional[FencedReply]:
+    """The branch's fenced payload if it parsed, validated and is no error."""
+    is_error, _, reply = _detect_error_in_response(raw_text)
+    if is_error or reply is None or reply.fence_type != fence_type:
+        return None
+    try:
+        _validate_payload(fence_type, reply.payload)
+    except ValueError:
+        return None
+    return reply
+
+
+def _assemble_combined_reply(weather: str, hotels: str) -> Optional[str]:
+    """Build the reply root's COMBINED QUERY LOGIC writes, from the branches.
+
+    Human text is the weather summary with its three suggestions, then the
+    hotel summary. Both payloads make a combined-json; if one branch failed
+    its text is replaced by a sentence saying that part is unavailable, and
+    the other branch's fence ships as is. None if neither branch produced a
+    payload.
+    """
+    weather_reply = _branch_reply(weather, "weather-json")
+    hotel_reply = _branch_reply(hotels, "hotel-json")
+    reply = weather_reply or hotel_reply
+    if reply is None:
+        return None
+
+    language = reply.payload["meta"]["language"]
+    unavailable = _UNAVAILABLE.get(language, _UNAVAILABLE["en"])
+    parts = (
+        weather[: weather_reply.start].strip()
+        if weather_reply
+        else unavailable["weather"],
+        hotels[: hotel_reply.start].strip() if hotel_reply else unavailable["hotels"],
+    )
+    text = "\n\n".join(part for part in parts if part)
+
+    if weather_reply is not None and hotel_reply is not None:
+        meta = weather_reply.payload["meta"]
+        payload = {
+            "meta": {**meta, "kind": "combined"},
+            "weather": {
+                "kind": meta["kind"],
+                **{k: v for k, v in weather_reply.payload.items() if k != "meta"},
+            },
+            "hotels": hotel_reply.payload.get("hotels", []),
+        }
+        body = json.dumps(payload, ensure_ascii=False, indent=2)
+        fence = f"```combined-json\n{body}\n```"
     else:
-        validate_weather_payload(payload)
+        fence = f"```{reply.fence_type}\n{reply.body}\n```"
+    return f"{text}\n\n{fence}" if text else fence
 
 
-async def process_chat_request(request: ChatRequest) -> ChatResponse:
+async def _run_combined_turn(
+    message: str, now: datetime, user_id: str
+) -> Tuple[str, str]:
+    """Run the weather and hotel branches concurrently.
+
+    Returns the (weather, hotels) reply texts; a branch that raised
+    contributes "". The weather agent writes the three suggestions in the
+    same reply, so wall-clock time is the slower branch, not the sum.
     """
-    Process a chat request through the ADK agent and return a ChatResponse.
 
-    Always returns ChatResponse (success=True or success=False) — never raises.
-    HTTP status is always 200; callers check response.success for error state.
+    async def branch(name: str, agent_name: str, scope: str) -> str:
+        with tracer.start_as_current_span(f"chat.combined.{name}"):
+            return await _run_sub_agent(
+                agent_name, _with_date_header(f"{scope} {message}", now), user_id
+            )
+
+    branches = await asyncio.gather(
+        branch("weather", agent_module.get_weather_agent.name, _WEATHER_SCOPE),
+        branch("hotels", agent_module.search_hotels_agent.name, _HOTELS_SCOPE),
+        return_exceptions=True,
+    )
+    for result in branches:
+        if isinstance(result, Exception):
+            logger.error("Combined turn branch failed", exc_info=result)
+    weather, hotels = ("" if isinstance(b, Exception) else b for b in branches)
+    return weather, hotels
+
+
+def _timeout_response(session_data: Optional[dict]) -> ChatResponse:
+    CHAT_TIMEOUTS.inc()
+    logger.warning("ADK runner timed out after %s seconds", _ADK_TIMEOUT_SECONDS)
+    return ChatResponse(
+        success=False,
+        error="The request timed out. Please try again.",
+        session_id=session_data["session_id"] if session_data else None,
+    )
+
+
+async def stream_chat_request(
+    request: ChatRequest, streaming: bool = False
+) -> AsyncIterator[ChatStreamEvent | ChatResponse]:
+    """
+    Run a chat turn, yielding progress as it happens and the ChatResponse last.
+
+    Intermediate items are ChatStreamEvents (tool-call progress, and partial
+    text when streaming=True asks ADK for token-level SSE output). The final
+    item is always exactly one ChatResponse, built and validated the same
+    way process_chat_request returns it — never raises.
+
+    The turn runs inside a chat.turn span (see tracing.py) that every stage
+    below, ADK's own spans and the tools' upstream spans nest under, and its
+    latency and model-call count feed the Prometheus histograms.
     """
+    started = time.perf_counter()
+    calls = [0]
+    calls_token = model_calls.set(calls)
+    try:
+        with tracer.start_as_current_span(
+            "chat.turn",
+            attributes={
+                "chat.request_id": request_id_var.get(),
+                "chat.streaming": streaming,
+            },
+        ) as span:
+            async with aclosing(_run_chat_turn(request, streaming)) as items:
+                async for item in items:
+                    if isinstance(item, ChatResponse):
+                        span.set_attribute("chat.success", item.success)
+                        if item.session_id:
+                            span.set_attribute("chat.session_id", item.session_id)
+                        if item.error:
+                            span.set_status(StatusCode.ERROR, item.error)
+                        CHAT_LATENCY.labels(
+                            mode="stream" if streaming else "sync",
+                            outcome="success" if item.success else "error",
+                        ).observe(time.perf_counter() - started)
+                        if calls[0]:
+                            LLM_TURNS.observe(calls[0])
+                    yield item
+    finally:
+        # Also when the consumer closes the generator after the ChatResponse,
+        # as process_chat_request does.
+        model_calls.reset(calls_token)
+
+
+async def _run_chat_turn(
+    request: ChatRequest, streaming: bool
+) -> AsyncIterator[ChatStreamEvent | ChatResponse]:
     session_data: Optional[dict] = None
     try:
         if not os.getenv("GOOGLE_API_KEY"):
-            return ChatResponse(
+            yield ChatResponse(
                 success=False,
                 error="AI chat is not available. GOOGLE_API_KEY is not configured.",
             )
+            return
 
-        await session_manager.cleanup_expired_sessions()
-        session_data = await session_manager.ensure_session(request.session_id)
+        if quota.mode(GEMINI) == EXHAUSTED:
+            quota.shed[GEMINI] += 1
+            yield ChatResponse(
+                success=False,
+                error="AI chat has reached its usage limit for now. "
+                "Please try again later.",
+            )
+            return
 
-        runner = Runner(
-            agent=agent_module.root_agent,
-            app_name=APP_NAME,
-            session_service=session_manager.session_service,
-        )
-        content = types.Content(
-            role="user", parts=[types.Part(text=_with_date_header(request.message))]
+        # Flushed before any session or model work so the client gets its
+        # first byte immediately.
+        yield ChatStreamEvent(
+            event="progress", data={"stage": "accepted", "message": "Thinking…"}
         )
 
-        try:
-            async with asyncio.timeout(_ADK_TIMEOUT_SECONDS):
-                events = runner.run_async(
-                    user_id=session_data["user_id"],
-                    session_id=session_data["adk_session_id"],
-                    new_message=content,
+        with tracer.start_as_current_span("chat.session"):
+            session_data = await session_manager.ensure_session(request.session_id)
+
+        now = datetime.now(timezone.utc)
+        message_text = _with_date_header(request.message, now)
+        # Only a session's first message is answered or routed without its
+        # history; later turns resume with whichever agent replied last.
+        fresh = session_data["session_id"] != request.session_id
+        intent = parse_weather_intent(request.message, now.date()) if fresh else None
+        if intent is not None and (cached := turn_cache.get(intent)) is not None:
+            weather_agent = agent_module.get_weather_agent
+            with tracer.start_as_current_span("chat.turn_cache"):
+                await _seed_turn(
+                    session_data,
+                    message_text,
+                    cached,
+                    weather_agent.name,
+                    {weather_agent.output_key: cached},
                 )
-                async for event in events:
-                    if event.is_final_response():
-                        raw_text = ""
-                        if getattr(event, "content", None) and getattr(
-                            event.content, "parts", None
-                        ):
-                            parts_text = [
-                                text
-                                for part in event.content.parts
-                                if (text := getattr(part, "text", None))
-                            ]
-                            raw_text = "\n".join(parts_text).strip()
-
-                        is_error, error_message, fence_type, json_payload = (
-                            _detect_error_in_response(raw_text)
-                        )
-                        if is_error:
-                            return ChatResponse(
-                                success=False,
-                                error=error_message,
-                                session_id=session_data["session_id"],
-                            )
-
-                        if json_payload is not None:
-                            try:
-                                _validate_payload(fence_type or "", json_payload)
-                            except ValueError as exc:
-                                return ChatResponse(
-                                    success=False,
-                                    error=f"Invalid response data: {exc}",
-                                    session_id=session_data["session_id"],
-                                )
-
-                        normalized = _normalize_agent_response(
-                            raw_text, fence_type, json_payload
-                        )
-                        return ChatResponse(
-                            success=True,
-                            data={"message": normalized, "sender": "ai"},
-                            session_id=session_data["session_id"],
-                        )
-
-        except TimeoutError:
-            logger.warning(
-                "ADK runner timed out after %s seconds", _ADK_TIMEOUT_SECONDS
+            yield ChatResponse(
+                success=True,
+                data={"message": cached, "sender": "ai"},
+                session_id=session_data["session_id"],
             )
-            return ChatResponse(
-                success=False,
-                error="The request timed out. Please try again.",
-                session_id=session_data["session_id"] if session_data else None,
+            return
+
+        route = intent_router.route(request.message) if fresh else None
+        if route is not None:
+            trace.get_current_span().set_attributes(
+                {"chat.route": route.agent or "root", "chat.route_label": route.label}
+            )
+        if (
+            _PARALLEL_COMBINED
+            and route is not None
+            and route.label == "combined"
+            and route.confidence >= intent_router.min_confidence
+        ):
+            async for item in _parallel_combined_turn(
+                request.message, now, session_data, message_text
+            ):
+                yield item
+            return
+
+        runner = get_runner(route.agent if route else None)
+        content = types.Content(role="user", parts=[types.Part(text=message_text)])
+        run_config = RunConfig(
+            streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE
+        )
+
+        # A deadline rather than one timeout block around the loop: this is a
+        # generator, and a timeout spanning a yield would fire inside the
+        # consumer's code instead of here.
+        deadline = asyncio.get_running_loop().time() + _ADK_TIMEOUT_SECONDS
+        final_text: Optional[str] = None
+        pending_tools: dict = {}
+        with tracer.start_as_current_span("chat.agent_run"):
+            events = runner.run_async(
+                user_id=session_data["user_id"],
+                session_id=session_data["adk_session_id"],
+                new_message=content,
+                run_config=run_config,
             )
+            try:
+                while True:
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            event = await anext(events)
+                    except StopAsyncIteration:
+                        break
+
+                    if event.is_final_response():
+                        final_text = _event_text(event)
+                        break
+
+                    _observe_tool_latency(event, pending_tools)
+                    for stream_event in _progress_events(event):
+                        yield stream_event
+
+            except TimeoutError:
+                yield _timeout_response(session_data)
+                return
+            finally:
+                await events.aclose()
+
+        if final_text is not None:
+            yield _final_chat_response(final_text, session_data["session_id"], intent)
+            return
 
         logger.warning("ADK runner finished without a final response event")
-        return ChatResponse(
+        yield ChatResponse(
             success=False,
             error="No response from agent. Please try again.",
             session_id=session_data["session_id"] if session_data else None,
@@ -247,8 +725,82 @@ async def process_chat_request(request: ChatRequest) -> ChatResponse:
 
     except Exception:
         logger.exception("Unexpected error in chat endpoint")
-        return ChatResponse(
+        yield ChatResponse(
             success=False,
             error="An unexpected error occurred. Please try again.",
             session_id=session_data["session_id"] if session_data else None,
         )
+
+
+async def _parallel_combined_turn(
+    message: str, now: datetime, session_data: dict, message_text: str
+) -> AsyncIterator[ChatStreamEvent | ChatResponse]:
+    """Answer a weather-and-hotels first message from two concurrent branches.
+
+    Yields a progress event per branch, then the ChatResponse. A successful
+    reply is seeded into the session with root as its author and the
+    sub-agents' output_key state, so follow-ups continue at root. When the
+    branches overrun the ADK timeout the turn ends with the timeout error
+    and nothing is written to the session.
+    """
+    for agent_name in ("get_weather_agent", "search_hotels_agent"):
+        yield ChatStreamEvent(
+            event="progress",
+            data={
+                "stage": "tool_call",
+                "tool": agent_name,
+                "message": _TOOL_PROGRESS[agent_name],
+            },
+        )
+    try:
+        with tracer.start_as_current_span("chat.combined"):
+            async with asyncio.timeout(_ADK_TIMEOUT_SECONDS):
+                weather, hotels = await _run_combined_turn(
+                    message, now, session_data["user_id"]
+                )
+    except TimeoutError:
+        yield _timeout_response(session_data)
+        return
+
+    reply = _assemble_combined_reply(weather, hotels)
+    if reply is None:
+        response = ChatResponse(
+            success=False,
+            error="Neither weather nor hotel information could be retrieved. "
+            "Please try again.",
+            session_id=session_data["session_id"],
+        )
+    else:
+        response = _final_chat_response(reply, session_data["session_id"])
+    PARALLEL_COMBINED_TURNS.labels(
+        outcome="success" if response.success else "error"
+    ).inc()
+    if response.success:
+        await _seed_turn(
+            session_data,
+            message_text,
+            response.data["message"],
+            agent_module.root_agent.name,
+            {
+                agent_module.get_weather_agent.output_key: weather,
+                agent_module.search_hotels_agent.output_key: hotels,
+            },
+        )
+    yield response
+
+
+async def process_chat_request(request: ChatRequest) -> ChatResponse:
+    """
+    Process a chat request through the ADK agent and return a ChatResponse.
+
+    Always returns ChatResponse (success=True or success=False) — never raises.
+    HTTP status is always 200; callers check response.success for error state.
+    """
+    async with aclosing(stream_chat_request(request)) as items:
+        async for item in items:
+            if isinstance(item, ChatResponse):
+                return item
+    # stream_chat_request always ends with a ChatResponse; this is a backstop.
+    return ChatResponse(
+        success=False, error="No response from agent. Please try again."
+    )
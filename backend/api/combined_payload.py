@@ -5,6 +5,7 @@ from typing import Annotated, Any, Literal
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from .hotel_payload import Hotel
+from .payload_registry import payload_validators
 from .weather_payload import CurrentWeather, DateRangeStr, DateStr, DayWeather
 
 
@@ -42,21 +43,48 @@ class CombinedPayload(BaseModel):
     model_config = ConfigDict(extra="allow")
 
 
+class CombinedCurrentPayload(CombinedPayload):
+    weather: CombinedWeatherCurrent
+
+
+class CombinedDaysPayload(CombinedPayload):
+    weather: CombinedWeatherDays
+
+
 def _format_validation_error(exc: ValidationError) -> str:
     errors = exc.errors(include_url=False)
     if not errors:
         return "Invalid combined-json payload"
-    first = errors[0]
-    loc = ".".join(str(p) for p in first.get("loc", ()))
+    # Weather errors come first and read relative to the weather object
+    # ("days.0.datetime"), as when it was validated on its own.
+    first = next((e for e in errors if e["loc"][:1] == ("weather",)), errors[0])
+    loc_parts = first.get("loc", ())
+    if loc_parts[:1] == ("weather",) and len(loc_parts) > 1:
+        loc_parts = loc_parts[1:]
+    loc = ".".join(str(p) for p in loc_parts)
     msg = first.get("msg", "Invalid value")
     return f"{loc}: {msg}" if loc else str(msg)
 
 
-def validate_combined_payload(payload: Any) -> None:
+payload_validators.register(
+    "combined-json", ("current",), CombinedCurrentPayload, _format_validation_error
+)
+payload_validators.register(
+    "combined-json",
+    ("forecast", "history"),
+    CombinedDaysPayload,
+    _format_validation_error,
+)
+
+
+def validate_combined_payload(payload: Any) -> CombinedPayload:
     """
     Validate agent combined payload against the combined-json schema
     documented in `agent_system/src/multi_tool_agent/templates/json_format.py`.
 
+    Returns:
+        The validated model.
+
     Raises:
         ValueError: if payload is invalid.
     """
@@ -72,16 +100,9 @@ def validate_combined_payload(payload: Any) -> None:
         raise ValueError("weather must be an object")
 
     weather_kind = weather.get("kind")
-    try:
-        if weather_kind == "current":
-            CombinedWeatherCurrent.model_validate(weather)
-        elif weather_kind in ("forecast", "history"):
-            CombinedWeatherDays.model_validate(weather)
-        else:
-            raise ValueError(
-                'weather.kind must be one of: "current", "forecast", "history"'
-            )
-
-        CombinedPayload.model_validate(payload)
-    except ValidationError as exc:
-        raise ValueError(_format_validation_error(exc)) from exc
+    if weather_kind not in ("current", "forecast", "history"):
+        raise ValueError(
+            'weather.kind must be one of: "current", "forecast", "history"'
+        )
+    # Keyed by weather.kind: one pass validates meta, weather and hotels.
+    return payload_validators.validate("combined-json", weather_kind, payload)
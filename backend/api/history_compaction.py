@@ -0,0 +1,207 @@
+"""Bound the ADK event history kept per session.
+
+Every turn re-sends the whole session history to the model, so an old
+session got slower and more expensive with each message. Only the last few
+turns are kept verbatim; older ones are folded into a small summary stored
+in session state — the CONTEXT TEMPLATE fields they established (city,
+weather information type, date or date range, language) plus the last few
+things the user asked. The agent prompts read it back through the
+{conversation_summary?} placeholder in context_template_instructions.
+
+On top of the turn limit, a per-session byte budget on the serialized
+session folds further turns, oldest first. The turn in progress is never
+folded: splitting it would separate function calls from their responses.
+If the kept turns are still over budget (one turn with a 15-day forecast
+and a hotel search can be), their largest tool responses are replaced by a
+short placeholder; the reply text already carries what the user was shown.
+Only text — user messages and replies — is never cut, so a single turn
+whose text alone is over budget still leaves the session above it.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+
+from agent_system.src.multi_tool_agent.tools.weather_json import KIND_BY_TOOL
+
+SUMMARY_STATE_KEY = "conversation_summary"
+KEEP_TURNS = 6
+MAX_SESSION_BYTES = 256 * 1024
+# Earlier user requests kept in the summary, and their length cap.
+_MAX_REQUESTS = 3
+_MAX_REQUEST_CHARS = 200
+_TRUNCATED_RESPONSE = {"truncated": "Tool response dropped from stored history."}
+
+_DATE_HEADER_PATTERN = re.compile(r"^\[Today is [^\]]*\]\s*")
+_PAYLOAD_FENCE_PATTERN = re.compile(
+    r"```\s*(weather-json|combined-json)\s*\n([\s\S]*?)\n```", re.IGNORECASE
+)
+
+
+def split_turns(events: List[Event]) -> List[List[Event]]:
+    """Group events into turns, each starting at a user-authored event."""
+    turns: List[List[Event]] = []
+    for event in events:
+        if event.author == "user" or not turns:
+            turns.append([event])
+        else:
+            turns[-1].append(event)
+    return turns
+
+
+def _event_text(event: Event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text or "" for part in event.content.parts)
+
+
+def _apply_weather(
+    summary: Dict[str, Any],
+    city: Any,
+    kind: Any,
+    date: Any = None,
+    date_range: Any = None,
+    language: Any = None,
+) -> None:
+    if isinstance(city, str) and city.strip():
+        summary["city"] = city.strip()
+    if isinstance(kind, str) and kind:
+        summary["weather_information_type"] = kind
+        summary["date"] = date or None
+        summary["date_range"] = date_range or None
+    if isinstance(language, str) and language.strip():
+        summary["language"] = language.strip().lower()
+
+
+def _fold_turn(summary: Dict[str, Any], turn: List[Event]) -> None:
+    for event in turn:
+        text = _event_text(event)
+        if event.author == "user":
+            if text and not event.get_function_responses():
+                request = _DATE_HEADER_PATTERN.sub("", text).strip()
+                requests = summary.setdefault("earlier_requests", [])
+                requests.append(request[:_MAX_REQUEST_CHARS])
+                del requests[:-_MAX_REQUESTS]
+            continue
+
+        for call in event.get_function_calls():
+            args = call.args or {}
+            kind = KIND_BY_TOOL.get(call.name or "")
+            if kind:
+                start, end = args.get("start_date"), args.get("end_date")
+                ranged = kind != "current" and end and end != start
+                _apply_weather(
+                    summary,
+                    args.get("city"),
+                    kind,
+                    date=None if ranged or kind == "current" else start,
+                    date_range=f"{start}..{end}" if ranged else None,
+                    language=args.get("language"),
+                )
+            elif call.name == "search_hotels" and args.get("city"):
+                summary["hotel_city"] = args["city"]
+
+        # Replies served through AgentTool leave no tool calls in this
+        # session; the weather-json the server attached still names them.
+        for match in _PAYLOAD_FENCE_PATTERN.finditer(text):
+            try:
+                payload = json.loads(match.group(2))
+            except ValueError:
+                continue
+            weather = (
+                payload.get("weather", payload) if isinstance(payload, dict) else {}
+            )
+            meta = weather.get("meta") if isinstance(weather, dict) else None
+            if isinstance(meta, dict):
+                _apply_weather(
+                    summary,
+                    meta.get("city"),
+                    meta.get("kind"),
+                    date=meta.get("date"),
+                    date_range=meta.get("date_range"),
+                    language=meta.get("language"),
+                )
+
+
+def _compact_json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def _truncate_responses(turns: List[List[Event]], excess: int) -> int:
+    """Replace the largest tool responses in `turns` until `excess` bytes are
+    saved; return the bytes saved."""
+    responses = [
+        (_compact_json_size(part.function_response.response), part.function_response)
+        for turn in turns
+        for event in turn
+        if event.content and event.content.parts
+        for part in event.content.parts
+        if part.function_response and part.function_response.response
+    ]
+    placeholder = _compact_json_size(_TRUNCATED_RESPONSE)
+    saved = 0
+    for size, response in sorted(responses, key=lambda item: -item[0]):
+        if saved >= excess or size <= placeholder:
+            break
+        response.response = dict(_TRUNCATED_RESPONSE)
+        saved += size - placeholder
+    return saved
+
+
+def _load_summary(session: Session) -> Dict[str, Any]:
+    try:
+        summary = json.loads(session.state.get(SUMMARY_STATE_KEY) or "{}")
+    except (TypeError, ValueError):
+        return {}
+    return summary if isinstance(summary, dict) else {}
+
+
+def compact_session(
+    session: Session,
+    keep_turns: int = KEEP_TURNS,
+    max_bytes: int = MAX_SESSION_BYTES,
+    size: Optional[int] = None,
+) -> bool:
+    """Fold old turns of `session` into its summary state, in place.
+
+    Args:
+        session: The stored session to compact.
+        keep_turns: Turns kept verbatim.
+        max_bytes: Budget for the serialized session.
+        size: Serialized size in bytes, when the caller already has it.
+
+    Returns:
+        True when events were folded or truncated (the caller must
+        re-serialize).
+    """
+    turns = split_turns(session.events)
+    fold = max(0, len(turns) - keep_turns)
+    if size is None:
+        size = len(session.model_dump_json().encode())
+
+    truncated = False
+    if size > max_bytes:
+        turn_sizes = [
+            sum(len(event.model_dump_json().encode()) for event in turn)
+            for turn in turns
+        ]
+        remaining = size - sum(turn_sizes[:fold])
+        while remaining > max_bytes and fold < len(turns) - 1:
+            remaining -= turn_sizes[fold]
+            fold += 1
+        if remaining > max_bytes:
+            truncated = _truncate_responses(turns[fold:], remaining - max_bytes) > 0
+
+    if fold == 0:
+        return truncated
+
+    summary = _load_summary(session)
+    for turn in turns[:fold]:
+        _fold_turn(summary, turn)
+    summary["compacted_turns"] = summary.get("compacted_turns", 0) + fold
+    session.state[SUMMARY_STATE_KEY] = json.dumps(summary, ensure_ascii=False)
+    session.events = [event for turn in turns[fold:] for event in turn]
+    return True
@@ -4,6 +4,8 @@ from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 
+from .payload_registry import payload_validators
+
 
 class HotelMeta(BaseModel):
     city: Annotated[str, Field(min_length=1)]
@@ -78,10 +80,18 @@ def _format_validation_error(exc: ValidationError) -> str:
     return f"{loc}: {msg}" if loc else str(msg)
 
 
-def validate_hotel_payload(payload: Any) -> None:
+payload_validators.register(
+    "hotel-json", ("hotels",), HotelPayload, _format_validation_error
+)
+
+
+def validate_hotel_payload(payload: Any) -> HotelPayload:
     """
     Validate agent hotel payload against the hotel-json schema.
 
+    Returns:
+        The validated model.
+
     Raises:
         ValueError: if payload is invalid.
     """
@@ -92,7 +102,5 @@ def validate_hotel_payload(payload: Any) -> None:
     if not isinstance(meta, dict):
         raise ValueError("meta must be an object")
 
-    try:
-        HotelPayload.model_validate(payload)
-    except ValidationError as exc:
-        raise ValueError(_format_validation_error(exc)) from exc
+    # meta.kind is checked by HotelMeta, so every hotel-json uses one entry.
+    return payload_validators.validate("hotel-json", "hotels", payload)
@@ -0,0 +1,337 @@
+"""Recognize what a first message asks for without asking the model.
+
+Most first messages are a handful of words — "weather in Warsaw today",
+"pogoda w Krakowie jutro". parse_weather_intent reads those with a closed
+vocabulary: every word must be a weather word, a time word or filler, and
+the rest must be one short run of words naming the city. Anything else
+(hotels, travel advice, specific measurements, a second city, an unknown
+word outside the city) is not an intent, and the caller leaves the message
+to the agents.
+
+IntentRouter answers a looser question: which agent should take the
+message. root_agent spends a model call with its long prompt on every
+first message just to pick between weather, travel advice, hotels and a
+combined reply. The router decides that locally — keyword rules first,
+then a small naive Bayes model shipped as intent_model.json — and names
+get_weather_agent or search_hotels_agent only when it is confident; any
+other message still goes to root. Retrain and score the model with
+``python -m benchmarks.intent_router``.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from agent_system.src.multi_tool_agent.tools.cache import normalize_city
+from agent_system.src.multi_tool_agent.tools.utils import MAX_FORECAST_DAYS
+
+logger = logging.getLogger(__name__)
+
+_MAX_CITY_WORDS = 3
+_WORD_PATTERN = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+
+# Folded word (normalize_city) -> language. Weather words make a message a
+# weather question; filler may surround them.
+_WEATHER_WORDS = {
+    "weather": "en",
+    "forecast": "en",
+    "pogoda": "pl",
+    "pogode": "pl",
+    "pogody": "pl",
+    "prognoza": "pl",
+    "prognoze": "pl",
+    "prognozy": "pl",
+}
+# Folded word -> (language, relative day). Day 0 is current conditions.
+_TIME_WORDS: Dict[str, Tuple[str, int]] = {
+    "now": ("en", 0),
+    "today": ("en", 0),
+    "currently": ("en", 0),
+    "current": ("en", 0),
+    "tomorrow": ("en", 1),
+    "yesterday": ("en", -1),
+    "teraz": ("pl", 0),
+    "dzisiaj": ("pl", 0),
+    "dzis": ("pl", 0),
+    "aktualna": ("pl", 0),
+    "aktualnie": ("pl", 0),
+    "obecnie": ("pl", 0),
+    "jutro": ("pl", 1),
+    "wczoraj": ("pl", -1),
+}
+_FILLER_WORDS = {
+    "en": {
+        "what", "what's", "whats", "how", "how's", "hows", "is", "the", "like",
+        "will", "be", "was", "it", "show", "tell", "give", "me", "please",
+        "for", "in", "at", "of", "right",
+    },
+    "pl": {
+        "jaka", "jak", "jest", "bedzie", "byla", "w", "we", "dla", "na",
+        "pokaz", "podaj", "sprawdz", "mi", "prosze",
+    },
+}  # fmt: skip
+# A second request joined to the first ("... and hotels") is never plain.
+_CONJUNCTIONS = {"and", "or", "with", "plus", "also", "i", "oraz", "lub", "albo", "a"}
+
+
+@dataclass(frozen=True)
+class WeatherIntent:
+    """What a plain weather question asks for, resolved against `today`.
+
+    `city` is the folded city as the user wrote it (possibly inflected:
+    "krakowie"); `resolved` is meta.date for current weather and
+    meta.date_range otherwise — one day for "tomorrow"/"yesterday", the
+    15 days from today for a general forecast.
+    """
+
+    city: str
+    kind: str
+    resolved: str
+    language: str
+
+
+def _words(message: str) -> List[str]:
+    return [normalize_city(w) for w in _WORD_PATTERN.findall(message)]
+
+
+def parse_weather_intent(message: str, today: date) -> Optional[WeatherIntent]:
+    """Return the intent of a plain weather question, or None."""
+    words = _words(message)
+    if not words or len(words) > 12:
+        return None
+
+    languages = set()
+    forecast = False
+    weather = False
+    days = set()
+    city: List[str] = []
+    city_ended = False
+    for word in words:
+        if word in _CONJUNCTIONS:
+            return None
+        if word in _WEATHER_WORDS:
+            languages.add(_WEATHER_WORDS[word])
+            weather = True
+            forecast = forecast or word.startswith(("forecast", "prognoz"))
+        elif word in _TIME_WORDS:
+            language, day = _TIME_WORDS[word]
+            languages.add(language)
+            days.add(day)
+        elif filler := [lang for lang, fill in _FILLER_WORDS.items() if word in fill]:
+            languages.add(filler[0])
+        elif city_ended:
+            return None  # a second run of unknown words
+        else:
+            city.append(word)
+            continue
+        city_ended = bool(city)
+
+    if not weather or not city or len(city) > _MAX_CITY_WORDS:
+        return None
+    if len(languages) != 1 or len(days) > 1:
+        return None
+
+    day = days.pop() if days else None
+    if day is None and not forecast:
+        day = 0  # "weather in Warsaw" asks about now
+    if day is None:
+        last = today + timedelta(days=MAX_FORECAST_DAYS - 1)
+        kind, resolved = "forecast", f"{today.isoformat()}..{last.isoformat()}"
+    elif day == 0:
+        kind, resolved = "current", today.isoformat()
+    else:
+        target = (today + timedelta(days=day)).isoformat()
+        kind = "forecast" if day > 0 else "history"
+        resolved = f"{target}..{target}"
+    return WeatherIntent(" ".join(city), kind, resolved, languages.pop())
+
+
+# Router labels that name a sub-agent root would transfer the message to.
+# "combined", "travel" and "other" need root's own prompt.
+ROUTABLE_AGENTS = {"weather": "get_weather_agent", "hotels": "search_hotels_agent"}
+MODEL_PATH = Path(__file__).with_name("intent_model.json")
+DEFAULT_MIN_CONFIDENCE = 0.8
+_STEM_LENGTH = 5
+
+# Cues over folded text. One of weather/hotels alone decides the label;
+# both mean a combined request; an advice or planning cue leaves the
+# message to the model. Stems that open city names (Windsor, Snowdonia,
+# Rainham, Padang) are spelled out as word forms instead.
+_WEATHER_CUES = re.compile(
+    r"\b(weather|forecast\w*|temperature\w*|rain(s|y|ing|ed)?"
+    r"|snow(s|y|ing|ed)?|sunny|wind(s|y)?|humid\w*|pogod\w*|prognoz\w*"
+    r"|temperatur\w*|deszcz\w*|pada(c|ja|l|la|lo)?|snieg\w*|wiatr\w*|wieje"
+    r"|stopni\w*)\b"
+)
+_HOTEL_CUES = re.compile(
+    r"\b(hotel\w*|hostel\w*|motel\w*|accommodation|lodging|nocleg\w*"
+    r"|apartament\w*|pensjonat\w*|przenocowa\w*)\b"
+)
+_ADVICE_CUES = re.compile(
+    r"\b(visit\w*|sightseeing|attraction\w*|museum\w*|landmark\w*|activit\w*"
+    r"|to do|can i do|should i do|pack|wear|walk|trip|plan\w*|holiday\w*"
+    r"|vacation\w*|getaway|restaurant\w*|zwiedz\w*|zobaczyc|atrakcj\w*|muze\w*"
+    r"|warto|robic|spakowac|spacer\w*|zaplan\w*|wycieczk\w*|wyjazd\w*"
+    r"|wakacj\w*|pobyt\w*|podroz\w*)\b"
+)
+
+
+def message_features(message: str) -> List[str]:
+    """Folded words plus a short stem of each long one.
+
+    The stems ("krakowie" -> "krako~") let Polish inflections and English
+    plurals share evidence the training corpus only has one form of.
+    """
+    words = _words(message)
+    return words + [f"{w[:_STEM_LENGTH]}~" for w in words if len(w) > _STEM_LENGTH]
+
+
+class IntentModel:
+    """Multinomial naive Bayes over message_features, stored as raw counts."""
+
+    def __init__(
+        self,
+        documents: Dict[str, int],
+        token_counts: Dict[str, Dict[str, int]],
+        alpha: float = 1.0,
+    ) -> None:
+        self.documents = documents
+        self.token_counts = token_counts
+        self.alpha = alpha
+        self.labels = sorted(documents)
+        vocabulary = {t for counts in token_counts.values() for t in counts}
+        total = sum(documents.values())
+        self._log_prior = {c: math.log(documents[c] / total) for c in self.labels}
+        self._log_likelihood: Dict[str, Dict[str, float]] = {}
+        for label in self.labels:
+            counts = token_counts.get(label, {})
+            denominator = math.log(sum(counts.values()) + alpha * len(vocabulary))
+            self._log_likelihood[label] = {
+                token: math.log(counts.get(token, 0) + alpha) - denominator
+                for token in vocabulary
+            }
+
+    @classmethod
+    def train(
+        cls, corpus: Dict[str, Iterable[str]], alpha: float = 1.0
+    ) -> "IntentModel":
+        documents: Dict[str, int] = {}
+        token_counts: Dict[str, Dict[str, int]] = {}
+        for label, messages in corpus.items():
+            counts: Counter = Counter()
+            documents[label] = 0
+            for message in messages:
+                documents[label] += 1
+                counts.update(message_features(message))
+            token_counts[label] = dict(sorted(counts.items()))
+        return cls(documents, token_counts, alpha)
+
+    @classmethod
+    def load(cls, path: Path) -> "IntentModel":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["documents"], data["token_counts"], data["alpha"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "documents": self.documents,
+            "token_counts": self.token_counts,
+        }
+
+    def predict(self, message: str) -> Tuple[str, float]:
+        """The most likely label and its posterior probability."""
+        features = message_features(message)
+        scores = {}
+        for label in self.labels:
+            likelihood = self._log_likelihood[label]
+            scores[label] = self._log_prior[label] + sum(
+                likelihood[t] for t in features if t in likelihood
+            )
+        best = max(scores, key=scores.__getitem__)
+        top = scores[best]
+        total = sum(math.exp(score - top) for score in scores.values())
+        return best, 1.0 / total
+
+
+class Route(NamedTuple):
+    label: str
+    confidence: float
+    source: str  # "rule" or "model"
+    agent: Optional[str]  # sub-agent to run instead of root, if any
+
+
+class IntentRouter:
+    """Pick the agent for a session's first message; None means root."""
+
+    def __init__(
+        self,
+        model: Optional[IntentModel],
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    ) -> None:
+        self.model = model
+        self.min_confidence = min_confidence
+        self.decisions: Counter = Counter()
+
+    def classify(self, message: str) -> Route:
+        folded = " ".join(_words(message))
+        weather = bool(_WEATHER_CUES.search(folded))
+        hotels = bool(_HOTEL_CUES.search(folded))
+        if weather and hotels:
+            label, confidence, source = "combined", 1.0, "rule"
+        elif (weather or hotels) and not _ADVICE_CUES.search(folded):
+            label, confidence, source = "weather" if weather else "hotels", 1.0, "rule"
+        elif self.model is not None:
+            label, confidence = self.model.predict(message)
+            source = "model"
+        else:
+            label, confidence, source = "other", 0.0, "rule"
+
+        agent = ROUTABLE_AGENTS.get(label)
+        if confidence < self.min_confidence:
+            agent = None
+        return Route(label, confidence, source, agent)
+
+    def route(self, message: str) -> Route:
+        """classify, counting the decision for stats()."""
+        route = self.classify(message)
+        self.decisions[route.agent or "root"] += 1
+        return route
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model is not None,
+            "min_confidence": self.min_confidence,
+            "decisions": dict(self.decisions),
+        }
+
+
+def _load_router() -> IntentRouter:
+    try:
+        min_confidence = float(
+            os.getenv("INTENT_ROUTER_MIN_CONFIDENCE") or DEFAULT_MIN_CONFIDENCE
+        )
+    except ValueError:
+        logger.warning(
+            "Ignoring non-numeric INTENT_ROUTER_MIN_CONFIDENCE=%r",
+            os.getenv("INTENT_ROUTER_MIN_CONFIDENCE"),
+        )
+        min_confidence = DEFAULT_MIN_CONFIDENCE
+    try:
+        model = IntentModel.load(MODEL_PATH)
+    except (OSError, ValueError, KeyError):
+        logger.warning(
+            "No usable intent model at %s; routing by rules only", MODEL_PATH
+        )
+        model = None
+    return IntentRouter(model, min_confidence)
+
+
+intent_router = _load_router()
@@ -1,18 +1,40 @@
+import asyncio
+import json
 import logging
 import os
+from contextlib import aclosing, asynccontextmanager, suppress
 from datetime import datetime
+from typing import AsyncIterator
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from agent_system.src.multi_tool_agent.tools.hotel_index import get_hotel_index
+from agent_system.src.multi_tool_agent.tools.http_client import aclose_http_client
+from agent_system.src.multi_tool_agent.tools.quota import quota
+from agent_system.src.multi_tool_agent.tools.search_hotels import hotel_cache
+from agent_system.src.multi_tool_agent.tools.single_flight import single_flight
+from agent_system.src.multi_tool_agent.tools.visual_crossing import timeline_cache
 from agent_system.src.utils.load_env_data import get_environment_info, load_env_data
 
-from .chat_service import process_chat_request
+from .chat_service import process_chat_request, stream_chat_request
+from .intent import intent_router
 from .models import ChatRequest, ChatResponse
+from .prometheus import CONTENT_TYPE, render_metrics
+from .rate_limit import (
+    CHAT_LIMIT_PER_IP,
+    CHAT_LIMIT_PER_SESSION,
+    RateLimitExceeded,
+    chat_limiter,
+)
+from .session_manager import session_manager
+from .tracing import RequestIdMiddleware, configure_logging, configure_tracing
+from .turn_cache import turn_cache
 
+configure_logging()
 logger = logging.getLogger(__name__)
+tracer_provider = configure_tracing()
 
 
 def _client_ip(request: Request) -> str:
@@ -24,8 +46,6 @@ def _client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-limiter = Limiter(key_func=_client_ip)
-
 # Load environment variables (warn about missing keys, never crash on startup)
 try:
     load_env_data()
@@ -35,13 +55,39 @@ except ValueError as e:
         "Some features may be unavailable until environment variables are configured."
     )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Expired sessions are dropped in the background rather than on every
+    # chat request.
+    reaper = asyncio.create_task(session_manager.run_reaper())
+    yield
+    reaper.cancel()
+    with suppress(asyncio.CancelledError):
+        await reaper
+    # Drain the pooled upstream connections the weather tools keep alive.
+    await aclose_http_client()
+    await chat_limiter.store.close()
+    if tracer_provider is not None:
+        tracer_provider.force_flush()
+
+
 app = FastAPI(
     title="Travel and Weather Center Chat API",
     description="A comprehensive weather and AI chat application API",
     version="1.0.0",
+    lifespan=lifespan,
 )
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    return JSONResponse(
+        {"error": str(exc)},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 # Allow CORS for local frontend (Next.js/Vite dev and other ports)
 # Configure CORS
@@ -64,7 +110,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+app.add_middleware(RequestIdMiddleware)
 
 # Mount static files (conditioned for production only)
 # app.mount("/static", StaticFiles(directory="/app/frontend/out"), name="static")
@@ -111,14 +159,81 @@ def api_health():
     return health()
 
 
+# Operational readout: session capacity plus the upstream caches. Counts
+# only, no session ids or content.
+@app.get("/api/metrics")
+def api_metrics():
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "sessions": session_manager.stats(),
+        "timeline_cache": timeline_cache.stats(),
+        "hotel_cache": hotel_cache.stats(),
+        "hotel_index": get_hotel_index().stats(),
+        "turn_cache": turn_cache.stats(),
+        "intent_router": intent_router.stats(),
+        "single_flight": single_flight.stats(),
+        "quotas": quota.stats(),
+    }
+
+
+# Prometheus scrape target. Served by uvicorn on :8000 only — nginx does not
+# proxy it, so it stays off the public site.
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
 # Static file serving is handled by nginx in production. Do not define catch-all
 # routes here to avoid intercepting /api/* paths.
 
 
 # Health endpoints stay unlimited (Render health checks poll them); the chat
-# endpoint is capped per client IP because every call spends paid LLM and
-# search-API quota.
+# endpoints are capped per client IP and per session because every call
+# spends paid LLM and search-API quota.
+#
+# Both windows are checked before either counts the request, so one the
+# session limit rejects does not also spend the client's IP budget. The
+# session limit only keys on ids the session manager issued: an unknown id
+# starts a new session anyway, and keying on it would let a client dodge
+# the limit by sending a fresh id each time.
+async def _enforce_chat_limits(request: Request, chat_request: ChatRequest) -> None:
+    checks = [("ip", _client_ip(request), CHAT_LIMIT_PER_IP)]
+    session_id = chat_request.session_id
+    if session_id and await session_manager.get_session(session_id) is not None:
+        checks.append(("session", session_id, CHAT_LIMIT_PER_SESSION))
+    await chat_limiter.check_all(checks)
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-@limiter.limit("10/minute")
 async def chat_endpoint(request: Request, chat_request: ChatRequest):
+    await _enforce_chat_limits(request, chat_request)
     return await process_chat_request(chat_request)
+
+
+def _sse(event: str, data_json: str) -> str:
+    # JSON never contains a raw newline, so one data: line per event is safe.
+    return f"event: {event}\ndata: {data_json}\n\n"
+
+
+async def _chat_event_stream(chat_request: ChatRequest) -> AsyncIterator[str]:
+    async with aclosing(stream_chat_request(chat_request, streaming=True)) as items:
+        async for item in items:
+            if isinstance(item, ChatResponse):
+                yield _sse("final", item.model_dump_json())
+            else:
+                yield _sse(item.event, json.dumps(item.data, ensure_ascii=False))
+
+
+# Same contract as /api/chat, delivered as Server-Sent Events: "progress"
+# (tool calls), "partial" (model text as it is generated) and exactly one
+# "final" event carrying the validated ChatResponse.
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: Request, chat_request: ChatRequest):
+    await _enforce_chat_limits(request, chat_request)
+    return StreamingResponse(
+        _chat_event_stream(chat_request),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx from holding events back until the
+        # whole response is done.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
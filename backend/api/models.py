@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, Field, StringConstraints
 
@@ -22,3 +22,13 @@ class ChatResponse(BaseModel):
     data: dict[str, Any] | None = None
     error: str | None = None
     session_id: str | None = None
+
+
+class ChatStreamEvent(BaseModel):
+    """One intermediate Server-Sent Event of /api/chat/stream.
+
+    The stream ends with a "final" event whose data is the ChatResponse.
+    """
+
+    event: Literal["progress", "partial"]
+    data: dict[str, Any]
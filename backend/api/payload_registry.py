@@ -0,0 +1,53 @@
+"""Payload validators, compiled once and keyed by (fence_type, kind).
+
+Each schema module registers a pydantic TypeAdapter per fence type and
+kind at import, so validating a reply is one dictionary lookup and one
+validation pass over the payload — no per-call dispatch through several
+models, and no sub-object validated twice.
+"""
+
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+
+class _Validator(NamedTuple):
+    adapter: TypeAdapter
+    format_error: Callable[[ValidationError], str]
+
+
+class PayloadValidators:
+    def __init__(self) -> None:
+        self._validators: Dict[Tuple[str, str], _Validator] = {}
+
+    def register(
+        self,
+        fence_type: str,
+        kinds: Iterable[str],
+        model: Any,
+        format_error: Callable[[ValidationError], str],
+    ) -> None:
+        validator = _Validator(TypeAdapter(model), format_error)
+        for kind in kinds:
+            self._validators[(fence_type, kind)] = validator
+
+    def validate(self, fence_type: str, kind: str, payload: Any) -> Any:
+        """
+        Validate payload with the validator registered for (fence_type, kind).
+
+        Returns:
+            The validated model, so callers can use it without validating
+            again.
+
+        Raises:
+            ValueError: if payload is invalid, with the schema's error message.
+            KeyError: if nothing is registered for the pair.
+        """
+        validator = self._validators[(fence_type, kind)]
+        try:
+            return validator.adapter.validate_python(payload)
+        except ValidationError as exc:
+            raise ValueError(validator.format_error(exc)) from exc
+
+
+payload_validators = PayloadValidators()
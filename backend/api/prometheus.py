@@ -0,0 +1,262 @@
+"""Prometheus metrics for chat throughput, latency and error classes.
+
+/api/metrics is a JSON readout for people; GET /metrics serves the same
+kind of numbers in the Prometheus text exposition format so they can be
+scraped, graphed and alerted on. Counters and histograms updated on the
+request path are prometheus_client's; numbers the caches, quotas and
+router already keep are read into the scrape by StatsCollector rather
+than mirrored.
+
+Values are per process. With UVICORN_WORKERS > 1 each scrape reaches one
+worker, so scrape the workers individually or run one per container.
+"""
+
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    disable_created_metrics,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from agent_system.src.multi_tool_agent.tools.hotel_index import get_hotel_index
+from agent_system.src.multi_tool_agent.tools.quota import quota
+from agent_system.src.multi_tool_agent.tools.search_hotels import hotel_cache
+from agent_system.src.multi_tool_agent.tools.visual_crossing import timeline_cache
+
+from .intent import intent_router
+from .rate_limit import chat_limiter
+from .session_manager import session_manager
+from .turn_cache import turn_cache
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+LabelValues = Tuple[str, ...]
+
+# A *_created series per counter and histogram only doubles the scrape;
+# nothing here graphs process start per metric.
+disable_created_metrics()
+
+
+class StatsCollector(Collector):
+    """A gauge (or counter) read from existing stats at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], Dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._read = read
+
+    def collect(self) -> Iterable[Metric]:
+        family_type = (
+            CounterMetricFamily if self.kind == "counter" else GaugeMetricFamily
+        )
+        family = family_type(self.name, self.documentation, labels=self.labelnames)
+        for values, value in self._read().items():
+            family.add_metric(values, value)
+        yield family
+
+
+registry = CollectorRegistry()
+
+CHAT_LATENCY = Histogram(
+    "chat_request_duration_seconds",
+    "Time from accepting a chat turn to its final response.",
+    labelnames=("mode", "outcome"),
+    buckets=(0.5, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    registry=registry,
+)
+TOOL_LATENCY = Histogram(
+    "chat_tool_duration_seconds",
+    "Time from a tool call to its response, per tool (AgentTool included).",
+    labelnames=("tool",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32),
+    registry=registry,
+)
+LLM_TURNS = Histogram(
+    "chat_llm_turns",
+    "Model calls made by one chat turn, nested agents included.",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15),
+    registry=registry,
+)
+PARALLEL_COMBINED_TURNS = Counter(
+    "chat_parallel_combined_turns",
+    "Weather-and-hotel first messages run as parallel sub-agent branches"
+    " instead of through the root agent.",
+    labelnames=("outcome",),
+    registry=registry,
+)
+CHAT_TIMEOUTS = Counter(
+    "chat_timeouts", "Chat turns that hit the ADK runner deadline.", registry=registry
+)
+MALFORMED_JSON = Counter(
+    "chat_malformed_json",
+    "Final replies whose fenced JSON block did not parse.",
+    registry=registry,
+)
+VALIDATION_FAILURES = Counter(
+    "chat_validation_failures",
+    "Final replies whose JSON payload failed schema validation.",
+    labelnames=("fence_type",),
+    registry=registry,
+)
+
+registry.register(
+    StatsCollector(
+        "chat_rate_limit_rejections",
+        "Chat requests rejected by the per-IP or per-session rate limit.",
+        lambda: {(): chat_limiter.rejected},
+        kind="counter",
+    )
+)
+registry.register(
+    StatsCollector(
+        "weather_cache_requests",
+        "Visual Crossing timeline cache lookups by result.",
+        lambda: {
+            ("hit",): timeline_cache.hits,
+            ("miss",): timeline_cache.misses,
+        },
+        labelnames=("result",),
+        kind="counter",
+    )
+)
+
+registry.register(
+    StatsCollector(
+        "chat_turn_cache_requests",
+        "Turn cache lookups for plain weather questions opening a session.",
+        lambda: {
+            ("hit",): turn_cache.stats()["hits"],
+            ("miss",): turn_cache.stats()["misses"],
+        },
+        labelnames=("result",),
+        kind="counter",
+    )
+)
+
+registry.register(
+    StatsCollector(
+        "chat_router_decisions",
+        "First messages by the agent the intent router started them at; every"
+        " one not at root skipped root's model call.",
+        lambda: {
+            (agent,): count
+            for agent, count in intent_router.stats()["decisions"].items()
+        },
+        labelnames=("agent",),
+        kind="counter",
+    )
+)
+
+registry.register(
+    StatsCollector(
+        "hotel_cache_requests",
+        "Hotel search cache lookups: fresh and stale hits (stale ones refresh in"
+        " the background) and misses.",
+        lambda: {
+            (result,): hotel_cache.stats()[key]
+            for result, key in (
+                ("fresh", "fresh_hits"),
+                ("stale", "stale_hits"),
+                ("miss", "misses"),
+            )
+        },
+        labelnames=("result",),
+        kind="counter",
+    )
+)
+
+registry.register(
+    StatsCollector(
+        "hotel_index_lookups",
+        "On-disk hotel index lookups: indexed searches found or missed on a"
+        " hotel cache miss, and answers made from hotels of earlier replies.",
+        lambda: {
+            (result,): get_hotel_index().stats()[key]
+            for result, key in (
+                ("search_hit", "search_hits"),
+                ("search_miss", "search_misses"),
+                ("known_hotels", "known_hotel_answers"),
+            )
+        },
+        labelnames=("result",),
+        kind="counter",
+    )
+)
+
+
+def _hit_ratio() -> Dict[LabelValues, float]:
+    lookups = timeline_cache.hits + timeline_cache.misses
+    return {(): timeline_cache.hits / lookups if lookups else 0.0}
+
+
+registry.register(
+    StatsCollector(
+        "weather_cache_hit_ratio",
+        "Share of timeline cache lookups served from cache since start.",
+        _hit_ratio,
+    )
+)
+registry.register(
+    StatsCollector(
+        "chat_sessions",
+        "Sessions currently tracked by this worker.",
+        lambda: {(): session_manager.stats()["live"]},
+    )
+)
+
+
+def _quota_field(field: str) -> Callable[[], Dict[LabelValues, float]]:
+    def read() -> Dict[LabelValues, float]:
+        return {
+            (upstream,): stats[field]
+            for upstream, stats in quota.stats().items()
+            if stats[field] is not None
+        }
+
+    return read
+
+
+registry.register(
+    StatsCollector(
+        "upstream_quota_used",
+        "Budget units spent in the current rolling window, per upstream.",
+        _quota_field("used"),
+        labelnames=("upstream",),
+    )
+)
+registry.register(
+    StatsCollector(
+        "upstream_quota_budget",
+        "Configured budget per rolling window (absent when unlimited).",
+        _quota_field("budget"),
+        labelnames=("upstream",),
+    )
+)
+registry.register(
+    StatsCollector(
+        "upstream_quota_burn_per_hour",
+        "Budget units spent over the last hour, per upstream.",
+        _quota_field("burn_per_hour"),
+        labelnames=("upstream",),
+    )
+)
+
+
+def render_metrics() -> bytes:
+    """The registry in the Prometheus text exposition format."""
+    return generate_latest(registry)
@@ -0,0 +1,209 @@
+"""Sliding-window rate limits shared across workers.
+
+slowapi kept its counters in each process, so with several workers or
+replicas every one of them enforced its own "10/minute" and the effective
+limit multiplied. Counters now live in a store all workers share — a
+Redis-protocol server, or process memory for the single-worker default.
+
+The algorithm is the sliding-window counter: one counter per fixed window,
+with the previous window's count weighted by how much of it still overlaps
+the sliding window. A check is one atomic INCR on the current window plus a
+read of the previous one, pipelined into a single round trip.
+"""
+
+import logging
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .resp import RespClient, RespError
+from .session_backend import KEY_PREFIX
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(second|minute|hour|day)\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    window_seconds: int
+
+    @classmethod
+    def parse(cls, text: str) -> "RateLimit":
+        """Parse slowapi-style strings such as "10/minute" or "100 per hour"."""
+        match = _LIMIT_PATTERN.match(text.lower())
+        if not match:
+            raise ValueError(f"Invalid rate limit {text!r}; expected e.g. 10/minute")
+        return cls(int(match.group(1)), _PERIODS[match.group(2)])
+
+    def __str__(self) -> str:
+        period = next(k for k, v in _PERIODS.items() if v == self.window_seconds)
+        return f"{self.limit} per 1 {period}"
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, limit: RateLimit, retry_after: int) -> None:
+        super().__init__(f"Rate limit exceeded: {limit}")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class InMemoryRateStore:
+    """Per-process counters; the default when only one worker runs."""
+
+    name = "memory"
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._counts: Dict[str, Tuple[int, float]] = {}
+        self._clock = clock
+        self._ops = 0
+
+    def _live(self, key: str, now: float) -> int:
+        entry = self._counts.get(key)
+        return entry[0] if entry and entry[1] > now else 0
+
+    async def hit(
+        self, current_key: str, previous_key: str, ttl_ms: int
+    ) -> Tuple[int, int]:
+        now = self._clock()
+        count = self._live(current_key, now) + 1
+        self._counts[current_key] = (count, now + ttl_ms / 1000)
+        self._ops += 1
+        if self._ops % 1024 == 0:
+            self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+        return count, self._live(previous_key, now)
+
+    async def undo(self, current_key: str) -> None:
+        count, expires_at = self._counts.get(current_key, (0, 0.0))
+        if count > 0:
+            self._counts[current_key] = (count - 1, expires_at)
+
+    async def close(self) -> None:
+        return None
+
+
+class RespRateStore:
+    """Counters on a Redis-protocol server, shared by every worker."""
+
+    name = "redis"
+
+    def __init__(self, url: str, client: Optional[RespClient] = None) -> None:
+        self.client = client or RespClient(url, timeout=0.5)
+
+    async def hit(
+        self, current_key: str, previous_key: str, ttl_ms: int
+    ) -> Tuple[int, int]:
+        count, _, previous = await self.client.pipeline(
+            ("INCR", current_key),
+            ("PEXPIRE", current_key, ttl_ms),
+            ("GET", previous_key),
+        )
+        return count, int(previous or 0)
+
+    async def undo(self, current_key: str) -> None:
+        await self.client.execute("INCRBY", current_key, -1)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+class SlidingWindowLimiter:
+    def __init__(self, store, clock=time.time) -> None:
+        self.store = store
+        self._clock = clock
+        self.rejected = 0
+
+    async def check(self, scope: str, key: str, limit: RateLimit) -> None:
+        """Count one request against `limit` for key, or raise.
+
+        A rejected request is not counted, so a client hammering past its
+        limit does not keep pushing its own window forward. If the shared
+        store is unreachable the request is let through: the limiter protects
+        upstream quota, it must not take the chat down with it.
+
+        Raises:
+            RateLimitExceeded: the sliding-window count is over the limit.
+        """
+        await self.check_all([(scope, key, limit)])
+
+    async def check_all(self, checks: Sequence[Tuple[str, str, RateLimit]]) -> None:
+        """check() several (scope, key, limit) windows as one request.
+
+        The request is counted in every window or in none: when one window
+        rejects it, the hits already made in the others are taken back too.
+
+        Raises:
+            RateLimitExceeded: for the first window over its limit.
+        """
+        counted: List[str] = []
+        for scope, key, limit in checks:
+            window_ms = limit.window_seconds * 1000
+            now_ms = self._clock() * 1000
+            window = int(now_ms // window_ms)
+            elapsed = (now_ms % window_ms) / window_ms
+            base = f"{KEY_PREFIX}rl:{scope}:{key}:"
+            current_key = f"{base}{window}"
+            try:
+                count, previous = await self.store.hit(
+                    current_key, f"{base}{window - 1}", 2 * window_ms
+                )
+            except (OSError, TimeoutError, RespError) as exc:
+                logger.warning(
+                    "Rate limit store unavailable, allowing request: %s", exc
+                )
+                continue
+            counted.append(current_key)
+
+            if previous * (1 - elapsed) + count <= limit.limit:
+                continue
+
+            self.rejected += 1
+            for counted_key in counted:
+                try:
+                    await self.store.undo(counted_key)
+                except (OSError, TimeoutError, RespError):
+                    pass
+            raise RateLimitExceeded(
+                limit, _retry_after(limit, count - 1, previous, elapsed)
+            )
+
+
+def _retry_after(limit: RateLimit, count: int, previous: int, elapsed: float) -> int:
+    """Seconds until one more request fits the sliding window."""
+    window = limit.window_seconds
+    room = limit.limit - count - 1
+    if previous and room >= 0:
+        # The previous window's weight decays until it leaves enough room.
+        seconds = (1 - room / previous - elapsed) * window
+    else:
+        seconds = (1 - elapsed) * window
+    # Rounded first so float noise (20.000000001) does not add a second.
+    return max(1, math.ceil(round(seconds, 6)))
+
+
+def create_rate_store(kind: Optional[str] = None):
+    """Build the store named by `kind` or RATE_LIMIT_BACKEND (memory|redis)."""
+    kind = (kind or os.getenv("RATE_LIMIT_BACKEND") or "memory").strip().lower()
+    if kind == "memory":
+        return InMemoryRateStore()
+    if kind == "redis":
+        url = (
+            os.getenv("RATE_LIMIT_REDIS_URL")
+            or os.getenv("SESSION_REDIS_URL")
+            or "redis://127.0.0.1:6379/0"
+        )
+        return RespRateStore(url)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {kind!r}; expected memory or redis")
+
+
+CHAT_LIMIT_PER_IP = RateLimit.parse(os.getenv("CHAT_RATE_LIMIT_PER_IP", "10/minute"))
+CHAT_LIMIT_PER_SESSION = RateLimit.parse(
+    os.getenv("CHAT_RATE_LIMIT_PER_SESSION", "6/minute")
+)
+
+chat_limiter = SlidingWindowLimiter(create_rate_store())
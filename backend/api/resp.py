@@ -0,0 +1,197 @@
+"""Minimal asyncio client for the Redis serialization protocol (RESP2).
+
+Enough of the protocol for the shared stores the backend keeps outside the
+process (sessions, rate limits): send a command, read one reply. It talks to
+Redis and to anything that speaks the same protocol (Valkey, KeyDB, the
+in-repo test stand-in), without adding a client library dependency.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlsplit
+
+
+class RespError(Exception):
+    """An error reply (-ERR ...) from the server."""
+
+
+def parse_redis_url(url: str) -> Tuple[str, int, Optional[str], int]:
+    """Split redis://[:password@]host[:port][/db] into its parts."""
+    parts = urlsplit(url)
+    if parts.scheme != "redis":
+        raise ValueError(f"Unsupported URL scheme for RESP client: {url!r}")
+    db = int(parts.path.lstrip("/") or 0)
+    password = unquote(parts.password) if parts.password else None
+    return parts.hostname or "127.0.0.1", parts.port or 6379, password, db
+
+
+def encode_command(*args: Any) -> bytes:
+    out = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("RESP connection closed mid-reply")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RespError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode()
+    if kind == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected RESP reply type: {line!r}")
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def execute(self, *args: Any) -> Any:
+        self.writer.write(encode_command(*args))
+        await self.writer.drain()
+        return await read_reply(self.reader)
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        self.writer.write(b"".join(encode_command(*args) for args in commands))
+        await self.writer.drain()
+        replies: List[Any] = []
+        for _ in commands:
+            # Read every reply even after an error one, so the connection is
+            # left at a clean reply boundary.
+            try:
+                replies.append(await read_reply(self.reader))
+            except RespError as exc:
+                replies.append(exc)
+        return replies
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RespClient:
+    """Small connection pool issuing one command at a time per connection.
+
+    Like the shared HTTP client, connections belong to the event loop that
+    opened them; a new loop starts a fresh pool.
+    """
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 2.0) -> None:
+        self.host, self.port, self._password, self._db = parse_redis_url(url)
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._idle: List[_Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._slots is None:
+            self._idle = []
+            self._slots = asyncio.Semaphore(self._pool_size)
+            self._loop = loop
+        return self._slots
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        conn = _Connection(reader, writer)
+        if self._password:
+            await conn.execute("AUTH", self._password)
+        if self._db:
+            await conn.execute("SELECT", self._db)
+        return conn
+
+    async def _run(self, send: Callable[[_Connection], Awaitable[Any]]) -> Any:
+        async with self._bind_loop():
+            conn = self._idle.pop() if self._idle else None
+            try:
+                async with asyncio.timeout(self._timeout):
+                    if conn is None:
+                        conn = await self._connect()
+                    reply = await send(conn)
+            except RespError:
+                self._idle.append(conn)
+                raise
+            except BaseException:
+                # The connection may hold half a reply; never reuse it.
+                if conn is not None:
+                    conn.close()
+                raise
+            self._idle.append(conn)
+            return reply
+
+    async def execute(self, *args: Any) -> Any:
+        """Send one command and return its decoded reply.
+
+        Raises:
+            RespError: the server answered with an error reply.
+            OSError / TimeoutError: the server is unreachable or too slow.
+        """
+        return await self._run(lambda conn: conn.execute(*args))
+
+    async def pipeline(self, *commands: Sequence[Any]) -> List[Any]:
+        """Send several commands in one write and return all their replies.
+
+        One network round trip for the batch. Each command is still applied
+        on its own by the server; error replies raise after every reply has
+        been read.
+        """
+        replies = await self._run(lambda conn: conn.pipeline(commands))
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    async def update(
+        self,
+        key: str,
+        update: Callable[[Optional[str]], Optional[str]],
+        *set_options: Any,
+    ) -> Optional[str]:
+        """Optimistic read-modify-write of one string key.
+
+        WATCH, GET, then SET inside MULTI/EXEC on one connection; if another
+        client wrote the key in between, EXEC is aborted and the whole cycle
+        runs again with the new value (each round someone wins, so this
+        ends). update() returning None leaves the key alone. Returns the
+        value written, or None.
+        """
+
+        async def send(conn: _Connection) -> Optional[str]:
+            while True:
+                await conn.execute("WATCH", key)
+                value = update(await conn.execute("GET", key))
+                if value is None:
+                    await conn.execute("UNWATCH")
+                    return None
+                replies = await conn.pipeline(
+                    [("MULTI",), ("SET", key, value, *set_options), ("EXEC",)]
+                )
+                for reply in replies:
+                    if isinstance(reply, RespError):
+                        raise reply
+                if replies[-1] is not None:
+                    return value
+
+        return await self._run(send)
+
+    async def close(self) -> None:
+        for conn in self._idle:
+            conn.close()
+        self._idle = []
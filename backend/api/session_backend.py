@@ -0,0 +1,340 @@
+"""Pluggable key-value stores for session state.
+
+The session registry and the ADK conversation history used to live in
+module-level dicts, which pinned the app to a single uvicorn worker: a
+second worker never saw the sessions the first one created. Both now go
+through a SessionBackend, selected with SESSION_BACKEND:
+
+- "memory" (default): a process-local dict — the previous behaviour.
+- "sqlite": a WAL-mode SQLite file (SESSION_SQLITE_PATH) that every worker
+  on the same host can share.
+- "redis": any server speaking the Redis protocol (SESSION_REDIS_URL), for
+  workers spread over several hosts.
+
+Values are strings (JSON, written by the callers); every key carries a TTL
+so an abandoned session disappears from the store on its own.
+"""
+
+import asyncio
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .resp import RespClient
+
+KEY_PREFIX = "weather_center:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at);
+"""
+
+
+class SessionBackend(ABC):
+    """Async string key-value store with per-key expiry."""
+
+    name = "base"
+    # Whether other processes read and write the same keys.
+    shared = True
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    async def update(
+        self,
+        key: str,
+        update: Callable[[Optional[str]], Optional[str]],
+        ttl_seconds: float,
+    ) -> Optional[str]:
+        """Atomically replace the value of `key` with update(current value).
+
+        No other writer, in this process or another worker, can change the
+        key between the read and the write. update() returning None leaves
+        the key as it is. Returns the value written, or None.
+        """
+
+    @abstractmethod
+    async def scan_keys(self, prefix: str) -> List[str]:
+        """Return every live key starting with `prefix`."""
+
+    async def purge_expired(self) -> int:
+        """Drop expired keys the store does not reclaim on its own."""
+        return 0
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryBackend(SessionBackend):
+    """Process-local store; expired keys are dropped lazily or on purge.
+
+    Like the session manager's reaper, purge works off a min-heap of
+    (expiry, key), so a pass costs the number of due entries rather than a
+    walk over every key. Entries superseded by a later set are skipped.
+    """
+
+    name = "memory"
+    shared = False
+
+    def __init__(self, clock=time.time) -> None:
+        self._data: Dict[str, Tuple[str, float]] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._clock = clock
+        # key -> (object, expiry) for clients that keep live objects rather
+        # than documents (BackendSessionService's sessions); nothing else in
+        # the process writes them, so there is nothing to serialize.
+        self.live: Dict[str, Tuple[Any, float]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= self._clock():
+            del self._data[key]
+            return None
+        return entry[0]
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        expires_at = self._clock() + ttl_seconds
+        self._data[key] = (value, expires_at)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        # Every set pushes a fresh entry; rebuild once stale ones dominate.
+        if len(self._expiry_heap) > 2 * len(self._data) + 64:
+            self._expiry_heap = [(exp, k) for k, (_, exp) in self._data.items()]
+            heapq.heapify(self._expiry_heap)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def update(
+        self,
+        key: str,
+        update: Callable[[Optional[str]], Optional[str]],
+        ttl_seconds: float,
+    ) -> Optional[str]:
+        # Nothing here suspends, so no other task runs between read and write.
+        value = update(await self.get(key))
+        if value is not None:
+            await self.set(key, value, ttl_seconds)
+        return value
+
+    async def scan_keys(self, prefix: str) -> List[str]:
+        now = self._clock()
+        return [
+            key
+            for key, (_, expires_at) in self._data.items()
+            if key.startswith(prefix) and expires_at > now
+        ]
+
+    async def purge_expired(self) -> int:
+        now = self._clock()
+        purged = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self._data[key]
+                purged += 1
+        return purged
+
+
+class SQLiteBackend(SessionBackend):
+    """SQLite file shared by all workers on one host.
+
+    Like HistoryStore, one connection per process is serialized with a lock
+    and driven from asyncio.to_thread. WAL lets workers read while another
+    writes; busy_timeout makes concurrent writers wait instead of failing.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, clock=time.time) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._clock = clock
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(_SCHEMA)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND expires_at > ?",
+                (key, self._clock()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, ttl_seconds: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, self._clock() + ttl_seconds),
+            )
+
+    def _update(
+        self,
+        key: str,
+        update: Callable[[Optional[str]], Optional[str]],
+        ttl_seconds: float,
+    ) -> Optional[str]:
+        # BEGIN IMMEDIATE takes the database write lock before the read, so
+        # a worker sharing the file cannot write in between.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM kv WHERE key = ? AND expires_at > ?",
+                    (key, self._clock()),
+                ).fetchone()
+                value = update(row[0] if row else None)
+                if value is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO kv (key, value, expires_at)"
+                        " VALUES (?, ?, ?)",
+                        (key, value, self._clock() + ttl_seconds),
+                    )
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+        return value
+
+    def _delete(self, keys: Tuple[str, ...]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM kv WHERE key = ?", [(key,) for key in keys]
+            )
+
+    def _scan_keys(self, prefix: str) -> List[str]:
+        # A range on the primary key instead of LIKE, which would need
+        # escaping and cannot use the index.
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM kv WHERE key >= ? AND key < ? AND expires_at > ?",
+                (prefix, prefix + "\U0010ffff", self._clock()),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _purge_expired(self) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM kv WHERE expires_at <= ?", (self._clock(),)
+            )
+        return cursor.rowcount
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl_seconds)
+
+    async def delete(self, *keys: str) -> None:
+        await asyncio.to_thread(self._delete, keys)
+
+    async def update(
+        self,
+        key: str,
+        update: Callable[[Optional[str]], Optional[str]],
+        ttl_seconds: float,
+    ) -> Optional[str]:
+        return await asyncio.to_thread(self._update, key, update, ttl_seconds)
+
+    async def scan_keys(self, prefix: str) -> List[str]:
+        return await asyncio.to_thread(self._scan_keys, prefix)
+
+    async def purge_expired(self) -> int:
+        return await asyncio.to_thread(self._purge_expired)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _glob_escape(text: str) -> str:
+    return "".join("\\" + ch if ch in "*?[]\\" else ch for ch in text)
+
+
+class RedisBackend(SessionBackend):
+    """Store on a Redis-protocol server; expiry is handled server-side."""
+
+    name = "redis"
+
+    def __init__(self, url: str, client: Optional[RespClient] = None) -> None:
+        self.client = client or RespClient(url)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.execute("GET", key)
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        await self.client.execute(
+            "SET", key, value, "PX", max(1, int(ttl_seconds * 1000))
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.execute("DEL", *keys)
+
+    async def update(
+        self,
+        key: str,
+        update: Callable[[Optional[str]], Optional[str]],
+        ttl_seconds: float,
+    ) -> Optional[str]:
+        return await self.client.update(
+            key, update, "PX", max(1, int(ttl_seconds * 1000))
+        )
+
+    async def scan_keys(self, prefix: str) -> List[str]:
+        keys: List[str] = []
+        cursor = "0"
+        match = _glob_escape(prefix) + "*"
+        while True:
+            cursor, batch = await self.client.execute(
+                "SCAN", cursor, "MATCH", match, "COUNT", 500
+            )
+            keys.extend(batch)
+            if cursor == "0":
+                return keys
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def default_sqlite_path() -> str:
+    return os.getenv("SESSION_SQLITE_PATH") or os.path.join(
+        os.path.expanduser("~"), ".cache", "weather-center", "sessions.sqlite3"
+    )
+
+
+def create_session_backend(kind: Optional[str] = None) -> SessionBackend:
+    """Build the backend named by `kind` or the SESSION_BACKEND env var."""
+    kind = (kind or os.getenv("SESSION_BACKEND") or "memory").strip().lower()
+    if kind == "memory":
+        return InMemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(default_sqlite_path())
+    if kind == "redis":
+        url = os.getenv("SESSION_REDIS_URL", "redis://127.0.0.1:6379/0")
+        return RedisBackend(url)
+    raise ValueError(
+        f"Unknown SESSION_BACKEND {kind!r}; expected memory, sqlite or redis"
+    )
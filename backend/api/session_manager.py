@@ -1,20 +1,144 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from google.adk.sessions import InMemorySessionService
+from .backend_session_service import BackendSessionService
+from .session_backend import KEY_PREFIX, SessionBackend, create_session_backend
 
 # Must match the app_name the Runner is constructed with — a mismatch makes
 # ADK silently fail to find sessions created here.
 APP_NAME = "weather_center"
 
+SESSION_MAX_AGE_HOURS = 24
+REAP_INTERVAL_SECONDS = 60
+# Backend TTLs outlive the session by this much, so the reaper normally finds
+# and deletes a due session itself; the TTL is the backstop for sessions no
+# running worker is tracking.
+TTL_GRACE_SECONDS = 3600
+# Per-worker capacity, overridable with SESSION_MAX_COUNT and
+# SESSION_MAX_TOTAL_MB. Each worker counts and evicts only the sessions it
+# has served, so N workers sharing a backend hold up to N times this; the
+# backend TTL is what bounds the shared store as a whole.
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_MAX_TOTAL_MB = 512
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PREFIX = f"{KEY_PREFIX}registry:"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        logger.warning("Ignoring non-integer %s=%r", name, os.getenv(name))
+        return default
+
+
+def _dump_record(record: Dict[str, Any]) -> str:
+    return json.dumps(
+        {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in record.items()
+        }
+    )
+
+
+def _load_record(raw: str) -> Dict[str, Any]:
+    record = json.loads(raw)
+    for key in ("created_at", "last_activity"):
+        record[key] = datetime.fromisoformat(record[key])
+    return record
+
 
 class SessionManager:
-    """Lightweight in-memory session registry decoupled from user authentication."""
+    """Session registry decoupled from user authentication.
+
+    Registry records and ADK conversation history both live in a
+    SessionBackend, so with a shared backend any worker can serve any
+    session.
+
+    Expiry is tracked in a min-heap of (deadline, session id) pushed by
+    ensure_session, so the background reaper only touches sessions that are
+    actually due instead of walking the whole registry. Entries superseded by
+    later activity stay in the heap and are skipped when popped.
+
+    The sessions this worker tracks are also kept in least-recently-active
+    order; once their count or estimated size passes the capacity limits, the
+    least recently active ones are evicted — registry record and ADK history
+    both — so a burst of anonymous clients cannot exhaust memory. That order
+    only reflects this worker's traffic, so like the reaper, eviction re-reads
+    a candidate first and spares one another worker has served since.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[SessionBackend] = None,
+        max_age_hours: int = SESSION_MAX_AGE_HOURS,
+        max_sessions: Optional[int] = None,
+        max_total_bytes: Optional[int] = None,
+    ) -> None:
+        self.backend = backend or create_session_backend()
+        self.ttl_seconds = max_age_hours * 3600 + TTL_GRACE_SECONDS
+        self.max_age = timedelta(hours=max_age_hours)
+        self.max_sessions = max_sessions or _env_int(
+            "SESSION_MAX_COUNT", DEFAULT_MAX_SESSIONS
+        )
+        self.max_total_bytes = max_total_bytes or (
+            _env_int("SESSION_MAX_TOTAL_MB", DEFAULT_MAX_TOTAL_MB) * 1024 * 1024
+        )
+        self.session_service = BackendSessionService(self.backend, self.ttl_seconds)
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        # session id -> deadline, user id, ADK session id and registry record
+        # size, ordered from least to most recently active.
+        self._tracked: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._registry_bytes = 0
+        self.evicted = 0
+        self.reaped = 0
+
+    def _track(self, session: Dict[str, Any], record_bytes: int) -> None:
+        sid = session["session_id"]
+        previous = self._tracked.pop(sid, None)
+        if previous is not None:
+            self._registry_bytes -= previous["bytes"]
+        deadline = session["last_activity"] + self.max_age
+        self._tracked[sid] = {
+            "deadline": deadline,
+            "user_id": session["user_id"],
+            "adk_session_id": session["adk_session_id"],
+            "bytes": record_bytes,
+        }
+        self._registry_bytes += record_bytes
+        heapq.heappush(self._expiry_heap, (deadline, sid))
+        # Every turn pushes a fresh entry; rebuild once stale ones dominate.
+        if len(self._expiry_heap) > 2 * len(self._tracked) + 64:
+            self._expiry_heap = [
+                (t["deadline"], sid) for sid, t in self._tracked.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _untrack(self, session_id: str) -> Optional[Dict[str, Any]]:
+        tracked = self._tracked.pop(session_id, None)
+        if tracked is not None:
+            self._registry_bytes -= tracked["bytes"]
+        return tracked
 
-    def __init__(self) -> None:
-        self.session_service = InMemorySessionService()
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+    async def _save(self, session: Dict[str, Any]) -> None:
+        record = _dump_record(session)
+        await self.backend.set(
+            REGISTRY_PREFIX + session["session_id"], record, self.ttl_seconds
+        )
+        self._track(session, len(record))
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.backend.get(REGISTRY_PREFIX + session_id)
+        return _load_record(raw) if raw else None
 
     async def ensure_session(self, session_id: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -25,11 +149,24 @@ class SessionManager:
         adopting a client-chosen (guessable) id would let another client attach
         to the same conversation. The frontend already handles this: it swaps
         to whatever session_id the response carries.
+
+        A registered session idle for max_age is expired here rather than
+        resumed: its record outlives it by TTL_GRACE_SECONDS, and a worker
+        that never tracked it (after a restart, with a shared backend) would
+        otherwise revive it.
         """
-        session = self.sessions.get(session_id) if session_id else None
+        session = await self.get_session(session_id) if session_id else None
+        if session is not None and (
+            session["last_activity"] + self.max_age <= datetime.now()
+        ):
+            await self._delete(session_id, session)
+            self.reaped += 1
+            session = None
 
         if session is not None:
             session["last_activity"] = datetime.now()
+            await self._save(session)
+            await self._enforce_capacity()
             return session
 
         sid = str(uuid.uuid4())
@@ -45,27 +182,97 @@ class SessionManager:
             "created_at": datetime.now(),
             "last_activity": datetime.now(),
         }
-        self.sessions[sid] = session
+        await self._save(session)
+        await self._enforce_capacity()
         return session
 
-    async def cleanup_expired_sessions(self, max_age_hours: int = 24) -> None:
-        """Drop stale sessions from the registry AND the ADK session store."""
-        cutoff = datetime.now() - timedelta(hours=max_age_hours)
-        expired = [
-            sid
-            for sid, data in self.sessions.items()
-            if data.get("last_activity", datetime.min) < cutoff
-        ]
-        for sid in expired:
-            data = self.sessions.pop(sid, None)
-            # Without this, the ADK store keeps the full conversation event
-            # history of a session that is no longer reachable — a slow leak.
-            if data and data.get("adk_session_id"):
-                await self.session_service.delete_session(
-                    app_name=APP_NAME,
-                    user_id=data["user_id"],
-                    session_id=data["adk_session_id"],
-                )
+    async def _delete(
+        self, session_id: str, record: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Drop a session; `record` names its ADK session if it is untracked."""
+        tracked = self._untrack(session_id) or record
+        await self.backend.delete(REGISTRY_PREFIX + session_id)
+        # Without this, the ADK store keeps the full conversation event
+        # history of a session that is no longer reachable — a slow leak.
+        if tracked is not None:
+            await self.session_service.delete_session(
+                app_name=APP_NAME,
+                user_id=tracked["user_id"],
+                session_id=tracked["adk_session_id"],
+            )
+
+    def estimated_bytes(self) -> int:
+        """Registry records plus stored ADK sessions written by this worker."""
+        return self._registry_bytes + self.session_service.total_bytes
+
+    async def _enforce_capacity(self) -> None:
+        # The most recently active session (the one being served) is never
+        # evicted, even if it alone exceeds the byte budget.
+        while len(self._tracked) > 1 and (
+            len(self._tracked) > self.max_sessions
+            or self.estimated_bytes() > self.max_total_bytes
+        ):
+            sid, tracked = next(iter(self._tracked.items()))
+            data = await self.get_session(sid)
+            if (
+                data is not None
+                and data["last_activity"] + self.max_age > tracked["deadline"]
+            ):
+                # Another worker served it since: most recently active now.
+                self._track(data, tracked["bytes"])
+                continue
+            await self._delete(sid)
+            if data is not None:
+                self.evicted += 1
+
+    async def reap_expired_sessions(self, now: Optional[datetime] = None) -> int:
+        """Drop sessions whose deadline has passed; return how many went.
+
+        Cost is proportional to the number of due heap entries. A due session
+        is re-read first: with a shared backend another worker may have kept
+        it alive, in which case it is rescheduled instead of deleted.
+        Sessions this worker never saw expire through the backend TTL.
+        """
+        now = now or datetime.now()
+        reaped = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            deadline, sid = heapq.heappop(self._expiry_heap)
+            tracked = self._tracked.get(sid)
+            if tracked is None or tracked["deadline"] != deadline:
+                continue
+            data = await self.get_session(sid)
+            if data is not None and data["last_activity"] + self.max_age > now:
+                self._track(data, tracked["bytes"])
+                continue
+            await self._delete(sid)
+            reaped += 1
+        # Keys past their TTL that were never looked at again.
+        await self.backend.purge_expired()
+        self.reaped += reaped
+        return reaped
+
+    async def run_reaper(self, interval_seconds: float = REAP_INTERVAL_SECONDS) -> None:
+        """Reap expired sessions every interval until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                reaped = await self.reap_expired_sessions()
+            except Exception:
+                logger.exception("Session reaper pass failed")
+                continue
+            if reaped:
+                logger.info("Reaped %d expired sessions", reaped)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "live": len(self._tracked),
+            "max_sessions": self.max_sessions,
+            "estimated_bytes": self.estimated_bytes(),
+            "max_total_bytes": self.max_total_bytes,
+            "evicted": self.evicted,
+            "reaped": self.reaped,
+        }
 
 
 session_manager = SessionManager()
@@ -0,0 +1,182 @@
+"""Per-request tracing and request ids for chat turns.
+
+A slow chat can be the root LLM turn, an AgentTool sub-run, Visual Crossing,
+Tavily or the post-processing of the reply. Each stage runs inside an
+OpenTelemetry span: chat.turn wraps the request, chat_service adds its own
+stages, the tools add upstream spans, and ADK's invocation / call_llm /
+execute_tool spans nest in between because ADK uses the same global
+tracer provider.
+
+Spans are only recorded once an exporter is configured (TRACE_EXPORTER):
+
+* file: one OpenTelemetry JSON span per line in TRACE_FILE, for offline use.
+* console: the same JSON on stdout.
+* otlp: OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT; needs
+  opentelemetry-exporter-otlp-proto-http installed.
+
+Every request also gets an id — the caller's X-Request-ID when it sent a
+sane one — echoed in the response header, stored on the chat.turn span and
+added to every log line.
+"""
+
+import logging
+import os
+import re
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "x-request-id"
+SERVICE_NAME = "weather-center-backend"
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Write finished spans as OpenTelemetry JSON, one span per line."""
+
+    def __init__(self, path: Optional[str] = None, stream=None) -> None:
+        self.path = Path(path).expanduser() if path else None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock:
+                if self.path:
+                    with self.path.open("a", encoding="utf-8") as f:
+                        f.write(lines)
+                else:
+                    stream = self._stream or sys.stdout
+                    stream.write(lines)
+                    stream.flush()
+        except OSError:
+            logger.exception("Failed to write spans")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        return None
+
+
+def default_trace_path() -> str:
+    return str(Path.home() / ".cache" / "weather-center" / "traces.jsonl")
+
+
+def _exporter_from_env(kind: str) -> Optional[SpanExporter]:
+    if kind == "file":
+        return JsonLinesSpanExporter(os.getenv("TRACE_FILE") or default_trace_path())
+    if kind == "console":
+        return JsonLinesSpanExporter()
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+        except ImportError:
+            logger.warning(
+                "TRACE_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http; "
+                "tracing is disabled"
+            )
+            return None
+        return OTLPSpanExporter()
+    if kind not in ("", "none"):
+        logger.warning("Unknown TRACE_EXPORTER %r; tracing is disabled", kind)
+    return None
+
+
+def configure_tracing(
+    exporter: Optional[SpanExporter] = None,
+) -> Optional[TracerProvider]:
+    """Install a tracer provider exporting to `exporter` or TRACE_EXPORTER.
+
+    The global provider can only be set once per process, so a second call
+    adds its exporter to the provider already installed.
+    """
+    if exporter is None:
+        exporter = _exporter_from_env(os.getenv("TRACE_EXPORTER", "").strip().lower())
+        if exporter is None:
+            return None
+
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": SERVICE_NAME})
+        )
+        trace.set_tracer_provider(provider)
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    return provider
+
+
+class RequestIdLogFilter(logging.Filter):
+    """Stamp each log record with the id of the request it belongs to."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+def configure_logging() -> None:
+    """Log to stderr with the request id on every line.
+
+    The filter sits on the handlers rather than a logger so records from
+    every module's logger get the field.
+    """
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format=LOG_FORMAT)
+    for handler in logging.getLogger().handlers:
+        if not any(isinstance(f, RequestIdLogFilter) for f in handler.filters):
+            handler.addFilter(RequestIdLogFilter())
+
+
+class RequestIdMiddleware:
+    """Assign every HTTP request an id and return it as X-Request-ID.
+
+    Plain ASGI rather than BaseHTTPMiddleware so the id stays set for the
+    whole of a streamed response.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER.encode())
+        request_id = incoming.decode("latin-1") if incoming else ""
+        if not _REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_id(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
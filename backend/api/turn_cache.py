@@ -0,0 +1,112 @@
+"""Whole-turn replies for plain weather questions that open a session.
+
+A large share of chats start with the same question ("weather in Warsaw
+today"), and each one ran root agent -> get_weather_agent -> tool -> model
+for an answer the previous asker already got. Replies to first messages
+that parse as a WeatherIntent are cached here, keyed by (city, kind,
+resolved date or range, language), with the timeline cache's TTL for that
+kind.
+
+The city in the key is the canonical one from the reply's meta.city, not
+the user's spelling: each stored reply also teaches the cache which
+canonical city a spelling means ("krakowie" -> "krakow"). Once one reply
+has taught that, "pogoda w Krakowie jutro" is answered from the entry an
+earlier "prognoza Kraków jutro" stored. A spelling never seen before is a
+miss, and the agent's answer teaches it.
+
+Only replies whose weather-json matches the intent exactly — same kind,
+date or range and language — are stored, so a reply the agent interpreted
+differently never answers the next asker.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from agent_system.src.multi_tool_agent.tools.cache import TTLCache, normalize_city
+from agent_system.src.multi_tool_agent.tools.visual_crossing import cache_ttl
+
+from .intent import WeatherIntent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 2048
+# Which canonical city a spelling means does not go stale like weather does.
+CITY_ALIAS_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class TurnCache:
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.enabled = max_entries > 0
+        self._replies = TTLCache(max_entries=max(max_entries, 1), clock=clock)
+        self._cities = TTLCache(max_entries=max(max_entries, 1), clock=clock)
+        self.stored = 0
+
+    def _key(self, intent: WeatherIntent, city: str) -> Hashable:
+        return (city, intent.kind, intent.resolved, intent.language)
+
+    def get(self, intent: WeatherIntent) -> Optional[str]:
+        """The cached reply text for `intent`, or None."""
+        if not self.enabled:
+            return None
+        city = self._cities.get(intent.city) or intent.city
+        return self._replies.get(self._key(intent, city))
+
+    def put(self, intent: WeatherIntent, payload: Any, reply: str) -> bool:
+        """Store `reply` if its weather-json `payload` answers `intent` exactly."""
+        if not self.enabled or not isinstance(payload, dict):
+            return False
+        meta = payload.get("meta")
+        if not isinstance(meta, dict) or not isinstance(meta.get("city"), str):
+            return False
+        resolved = (
+            meta.get("date") if intent.kind == "current" else meta.get("date_range")
+        )
+        if (meta.get("kind"), resolved, meta.get("language")) != (
+            intent.kind,
+            intent.resolved,
+            intent.language,
+        ):
+            return False
+
+        city = normalize_city(meta["city"])
+        self._cities.set(intent.city, city, CITY_ALIAS_TTL_SECONDS)
+        end_date = intent.resolved.rpartition("..")[2]
+        self._replies.set(
+            self._key(intent, city), reply, cache_ttl(intent.kind, end_date)
+        )
+        self.stored += 1
+        return True
+
+    def clear(self) -> None:
+        self._replies.clear()
+        self._cities.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._replies),
+            "hits": self._replies.hits,
+            "misses": self._replies.misses,
+            "stored": self.stored,
+            "cities": len(self._cities),
+        }
+
+
+def _max_entries() -> int:
+    try:
+        return int(os.getenv("TURN_CACHE_MAX_ENTRIES") or DEFAULT_MAX_ENTRIES)
+    except ValueError:
+        logger.warning(
+            "Ignoring non-integer TURN_CACHE_MAX_ENTRIES=%r",
+            os.getenv("TURN_CACHE_MAX_ENTRIES"),
+        )
+        return DEFAULT_MAX_ENTRIES
+
+
+turn_cache = TurnCache(_max_entries())
@@ -4,6 +4,8 @@ from typing import Annotated, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
+from .payload_registry import payload_validators
+
 DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
 DATE_RANGE_PATTERN = r"^\d{4}-\d{2}-\d{2}\.\.\d{4}-\d{2}-\d{2}$"
 TIME_PATTERN = r"^\d{2}:\d{2}$"
@@ -88,11 +90,27 @@ def _format_validation_error(exc: ValidationError) -> str:
     return f"{loc}: {msg}" if loc else str(msg)
 
 
-def validate_weather_payload(payload: Any) -> None:
+payload_validators.register(
+    "weather-json", ("current",), WeatherCurrentPayload, _format_validation_error
+)
+payload_validators.register(
+    "weather-json",
+    ("forecast", "history"),
+    WeatherDaysPayload,
+    _format_validation_error,
+)
+
+
+def validate_weather_payload(
+    payload: Any,
+) -> WeatherCurrentPayload | WeatherDaysPayload:
     """
     Validate agent weather payload against the schema documented in
     `agent_system/src/multi_tool_agent/templates/json_format.py`.
 
+    Returns:
+        The validated model.
+
     Raises:
         ValueError: if payload is invalid.
     """
@@ -104,14 +122,6 @@ def validate_weather_payload(payload: Any) -> None:
         raise ValueError("meta must be an object")
 
     kind = meta.get("kind")
-    try:
-        if kind == "current":
-            WeatherCurrentPayload.model_validate(payload)
-            return
-        if kind in ("forecast", "history"):
-            WeatherDaysPayload.model_validate(payload)
-            return
-    except ValidationError as exc:
-        raise ValueError(_format_validation_error(exc)) from exc
-
-    raise ValueError('meta.kind must be one of: "current", "forecast", "history"')
+    if kind not in ("current", "forecast", "history"):
+        raise ValueError('meta.kind must be one of: "current", "forecast", "history"')
+    return payload_validators.validate("weather-json", kind, payload)
@@ -0,0 +1,107 @@
+"""Realistic final agent replies, for benchmarking the response pipeline.
+
+Every reply is built the way production builds it: weather payloads come
+from a stand-in timeline run through project_timeline and
+build_weather_payload, hotel payloads carry eight results shaped like the
+hotel agent's output, and the fences are indented as the model and
+render_fence write them. MALFORMED_* replies reproduce what the model gets
+wrong: trailing commas before a closing bracket (repairable) and a
+truncated body (not).
+"""
+
+import json
+from typing import Any, Dict, List
+
+from agent_system.src.multi_tool_agent.tools.utils import (
+    MAX_FORECAST_DAYS,
+    project_timeline,
+)
+from agent_system.src.multi_tool_agent.tools.weather_json import (
+    build_weather_payload,
+)
+from benchmarks.upstreams import search_body, timeline_body
+
+CITY = "Kraków"
+
+
+def hotel_payload(city: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """A hotel-json payload with one hotel per Tavily search result."""
+    return {
+        "meta": {
+            "city": city,
+            "kind": "hotels",
+            "date": None,
+            "date_range": None,
+            "language": "en",
+        },
+        "hotels": [
+            {
+                "name": result.get("title", "Hotel").split(" – ")[0],
+                "price_per_night": f"{80 + 15 * n}",
+                "currency": "USD",
+                "availability": "unknown",
+                "rating": 8.4,
+                "reviews_count": 1200,
+                "highlights": ["Free WiFi", "Breakfast", "Close to the old town"],
+                "url": result.get("url", ""),
+            }
+            for n, result in enumerate(results)
+        ],
+    }
+
+
+def _weather(kind: str) -> Dict[str, Any]:
+    body = timeline_body(CITY, current=kind == "current")
+    projected = project_timeline(body, kind, max_days=MAX_FORECAST_DAYS)
+    payload = build_weather_payload(projected, kind, CITY)
+    assert payload is not None
+    return payload
+
+
+def _combined() -> Dict[str, Any]:
+    weather = _weather("forecast")
+    meta = weather.pop("meta")
+    return {
+        "meta": {**meta, "kind": "combined"},
+        "weather": {"kind": "forecast", **weather},
+        "hotels": hotel_payload(CITY, search_body(f"hotels in {CITY}")["results"])[
+            "hotels"
+        ],
+    }
+
+
+def _reply(text: str, fence_type: str, payload: Dict[str, Any]) -> str:
+    body = json.dumps(payload, ensure_ascii=False, indent=2)
+    return f"{text}\n\n```{fence_type}\n{body}\n```"
+
+
+def _with_trailing_commas(reply: str) -> str:
+    # What the model does wrong most often: a comma left after the last
+    # member of every object and array.
+    return reply.replace("\n  }", ",\n  }").replace("\n  ]", ",\n  ]")
+
+
+CURRENT = _reply(
+    f"Right now it is sunny in {CITY}.", "weather-json", _weather("current")
+)
+FORECAST = _reply(
+    f"Here is the 15-day forecast for {CITY}.", "weather-json", _weather("forecast")
+)
+HOTELS = _reply(
+    f"I found 8 hotels in {CITY}.",
+    "hotel-json",
+    hotel_payload(CITY, search_body(f"hotels in {CITY}")["results"]),
+)
+COMBINED = _reply(f"Weather and hotels for {CITY}.", "combined-json", _combined())
+MALFORMED_TRAILING_COMMA = _with_trailing_commas(FORECAST)
+MALFORMED_TRUNCATED = FORECAST[: len(FORECAST) // 2] + "\n```"
+
+# name → reply, valid replies first.
+CORPORA = {
+    "current": CURRENT,
+    "forecast-15d": FORECAST,
+    "hotels-8": HOTELS,
+    "combined": COMBINED,
+    "trailing-comma": MALFORMED_TRAILING_COMMA,
+    "truncated": MALFORMED_TRUNCATED,
+}
@@ -0,0 +1,344 @@
+"""Labelled first messages for training and scoring the intent router.
+
+Labels follow what root_agent does with a message (see prompt.py):
+"weather" and "hotels" are the single-intent requests it transfers to
+get_weather_agent / search_hotels_agent; "combined" covers weather plus
+hotels and open-ended trip planning (COMBINED QUERY LOGIC); "travel" is
+what-to-see advice; "other" is everything root answers itself.
+
+TEST is held out — written separately, with other cities and phrasings —
+and only ever scored, never trained on.
+"""
+
+from typing import Dict, List
+
+TRAIN: Dict[str, List[str]] = {
+    "weather": [
+        "weather in Warsaw today",
+        "What's the weather like in London?",
+        "What is the weather in Paris right now?",
+        "How is the weather in Berlin?",
+        "weather forecast for Madrid",
+        "Give me the forecast for Vienna for the next 5 days",
+        "Will it rain in Amsterdam tomorrow?",
+        "Is it going to snow in Zakopane this weekend?",
+        "What's the temperature in Rome?",
+        "How cold is it in Oslo now?",
+        "How hot will it be in Athens on Friday?",
+        "What was the weather in Prague yesterday?",
+        "weather history for Budapest last week",
+        "What was the temperature in Dublin on 2024-03-01?",
+        "How windy is it in Gdynia?",
+        "humidity in Singapore today",
+        "When is sunset in Reykjavik today?",
+        "What time is sunrise in Helsinki tomorrow?",
+        "Do I need an umbrella in Brussels today?",
+        "Should I take a jacket in Edinburgh tomorrow?",
+        "Is it sunny in Barcelona?",
+        "forecast Lisbon 2025-06-10 to 2025-06-14",
+        "What will the weather be like in Munich next week?",
+        "current conditions in Stockholm",
+        "Is there a storm coming to Miami?",
+        "wind speed in Hel right now",
+        "air pressure in Lublin",
+        "How much rain fell in Bergen last month?",
+        "Will it be warm in Nice on Saturday?",
+        "UV index in Valencia today",
+        "pogoda w Warszawie",
+        "Jaka jest pogoda w Krakowie?",
+        "Jaka będzie pogoda w Gdańsku jutro?",
+        "prognoza pogody dla Wrocławia na 5 dni",
+        "Czy jutro będzie padać w Poznaniu?",
+        "Czy w Zakopanem pada śnieg?",
+        "Ile stopni jest teraz w Łodzi?",
+        "Jaka była pogoda w Katowicach wczoraj?",
+        "temperatura w Szczecinie",
+        "Jak mocno wieje w Sopocie?",
+        "Kiedy jest zachód słońca w Olsztynie?",
+        "wilgotność powietrza w Bydgoszczy",
+        "Czy będzie burza w Rzeszowie?",
+        "pogoda na weekend w Toruniu",
+        "Czy potrzebuję parasola w Kielcach?",
+        "Jak zimno będzie w Białymstoku w nocy?",
+        "Pokaż prognozę dla Opola na przyszły tydzień",
+        "Jaka była temperatura w Lublinie 2024-01-15?",
+        "ciśnienie w Gliwicach dzisiaj",
+        "Czy w Berlinie jest słonecznie?",
+        "Podaj pogodę w Pradze na jutro",
+        "Jak jest teraz na dworze w Radomiu?",
+        "Will there be frost in Tallinn tonight?",
+        "Is it foggy in San Francisco?",
+        "Check the weather in Tokyo for me",
+        "Tell me the forecast for Seoul",
+        "Is it raining in Manchester now?",
+        "How many degrees in Riga?",
+        "Czy w Krynicy spadnie śnieg w tym tygodniu?",
+        "Jaka pogoda była w Gdyni w zeszłym tygodniu?",
+    ],
+    "hotels": [
+        "hotels in Warsaw",
+        "Find me a hotel in Paris",
+        "Search for hotels in Rome for next weekend",
+        "Cheap hotels in Berlin",
+        "Can you recommend a hotel in Lisbon?",
+        "I need accommodation in Madrid from 2025-07-01 to 2025-07-05",
+        "Where can I stay in Amsterdam?",
+        "Book a room in Vienna",
+        "Find a hostel in Prague",
+        "Best hotels near the center of Budapest",
+        "Any good hotels in Krakow for two nights?",
+        "Looking for a place to stay in Dublin",
+        "luxury hotel in Dubai",
+        "hotel deals in Barcelona in August",
+        "Find hotels in Munich with breakfast",
+        "apartments for rent in Split for a week",
+        "Show me hotels in Copenhagen under 100 dollars",
+        "I'm looking for a hotel in Oslo, check in Friday check out Sunday",
+        "Where should I sleep in Venice?",
+        "Recommend a boutique hotel in Florence",
+        "family hotel in Zakopane",
+        "Hotels with a pool in Malaga",
+        "Find me lodging in Edinburgh",
+        "B&B in Bath",
+        "Suggest some hotels in Stockholm",
+        "hotels in Gdansk near the old town",
+        "Cheapest room in London tonight",
+        "Where to stay in Athens for 3 nights",
+        "Need a hotel in Brussels tomorrow",
+        "Can you search accommodation in Tallinn?",
+        "hotele w Warszawie",
+        "Znajdź hotel w Krakowie",
+        "Szukam noclegu w Gdańsku",
+        "Gdzie mogę przenocować we Wrocławiu?",
+        "Tanie hotele w Poznaniu",
+        "Poleć mi hotel w Zakopanem",
+        "Znajdź nocleg w Sopocie na weekend",
+        "Hotele w Paryżu od 2025-05-01 do 2025-05-03",
+        "Szukam apartamentu w Gdyni",
+        "Gdzie się zatrzymać w Łodzi?",
+        "Pokaż hotele w Berlinie",
+        "Zarezerwuj pokój w Pradze",
+        "hostel w Toruniu",
+        "Jakie są dobre hotele w Lublinie?",
+        "nocleg w Szczecinie na dwie noce",
+        "Znajdź hotele w Rzymie na przyszły tydzień",
+        "pensjonat w Karpaczu",
+        "Hotel ze śniadaniem w Katowicach",
+        "Szukam taniego pokoju w Londynie",
+        "Gdzie przenocować w Olsztynie?",
+        "hotel blisko rynku w Kielcach",
+        "Potrzebuję hotelu w Bydgoszczy na jutro",
+        "Polecisz jakiś hotel w Białymstoku?",
+        "Wyszukaj hotele w Wiedniu",
+        "Find me a hotel room in Seville",
+        "hotels near the airport in Frankfurt",
+        "motel in Las Vegas",
+        "Where can we stay in Porto with kids?",
+        "Znajdź kwaterę w Ustce",
+        "Szukam hotelu z basenem w Kołobrzegu",
+    ],
+    "combined": [
+        "weather and hotels in Warsaw",
+        "What's the weather in Paris and find me a hotel",
+        "Plan my trip to Rome",
+        "Plan a weekend in Berlin",
+        "What can I do in Lisbon this week and where should I stay?",
+        "I'm going to Madrid next week, weather and hotels please",
+        "Help me plan a stay in Vienna",
+        "Trip to Prague on Friday: forecast and accommodation",
+        "Forecast for Budapest and some hotels",
+        "What should I do in Amsterdam next week?",
+        "Organize my visit to Barcelona",
+        "Plan 3 days in Munich for me",
+        "I'm visiting Copenhagen next weekend, help me plan",
+        "weather plus a hotel in Dublin for tomorrow",
+        "Find hotels in Oslo and tell me the forecast",
+        "How's the weather in Athens and can you book a hotel?",
+        "Holiday in Split next week, weather and where to stay",
+        "Plan my vacation in Nice",
+        "Weekend getaway to Florence",
+        "What to do in Stockholm this weekend and hotels",
+        "Zaplanuj mi pobyt w Poznaniu",
+        "Zaplanuj weekend w Krakowie",
+        "Pogoda i hotele w Gdańsku",
+        "Jaka będzie pogoda we Wrocławiu i znajdź mi hotel",
+        "Poznań na następne 5 dni",
+        "Co mogę robić w Berlinie w tym tygodniu i znajdź mi hotele",
+        "Jadę do Zakopanego w sobotę, pogoda i noclegi",
+        "Zaplanuj wycieczkę do Pragi",
+        "Prognoza i nocleg w Sopocie na weekend",
+        "Pomóż mi zaplanować wyjazd do Wiednia",
+        "Wyjazd do Rzymu w przyszłym tygodniu, co robić i gdzie spać",
+        "Zaplanuj 3 dni w Toruniu",
+        "Wakacje w Gdyni, pogoda i hotele",
+        "Weekend w Łodzi, zaplanuj mi go",
+        "pogoda oraz hotele w Lublinie",
+        "Znajdź hotel w Paryżu i sprawdź pogodę",
+        "Co robić w Szczecinie w weekend i gdzie się zatrzymać",
+        "Organizuję wyjazd do Budapesztu, pomóż",
+        "Kraków w przyszłym tygodniu",
+        "Plan a trip to Edinburgh for next weekend",
+    ],
+    "travel": [
+        "What should I see in Krakow in this weather?",
+        "Co warto zobaczyć w Krakowie przy takiej pogodzie?",
+        "Any ideas for things to do in Warsaw when it's raining?",
+        "What are the best attractions in Paris?",
+        "Where should I go sightseeing in Rome?",
+        "Is it a good day for a walk in Gdansk?",
+        "What can I visit in Berlin on a rainy day?",
+        "Recommend some museums in Vienna",
+        "What are must-see places in Prague?",
+        "Give me travel tips for Lisbon",
+        "What to pack for a trip to Oslo?",
+        "Is it worth visiting Budapest in winter?",
+        "What can kids do in Amsterdam when it's cold?",
+        "Suggest outdoor activities given this weather",
+        "Good restaurants in Barcelona?",
+        "Co zwiedzić w Warszawie?",
+        "Jakie atrakcje są w Gdańsku?",
+        "Gdzie iść na spacer we Wrocławiu przy tej pogodzie?",
+        "Co robić w deszczowy dzień w Poznaniu?",
+        "Jakie muzea warto odwiedzić w Krakowie?",
+        "Co spakować na wyjazd do Zakopanego?",
+        "Czy warto jechać do Sopotu zimą?",
+        "Polecisz jakieś atrakcje dla dzieci w Łodzi?",
+        "Gdzie dobrze zjeść w Toruniu?",
+        "Jakie miejsca warto zobaczyć w Pradze?",
+        "Co polecasz robić w taką pogodę?",
+        "Daj mi porady podróżnicze dla Rzymu",
+        "Jakie są ciekawe szlaki w Tatrach?",
+        "What should I wear for sightseeing there?",
+        "Which landmarks can I see in one day in London?",
+    ],
+    "other": [
+        "Hi",
+        "Hello!",
+        "Thanks!",
+        "Thank you, that's all",
+        "Who are you?",
+        "What can you do?",
+        "Help",
+        "How does this work?",
+        "Tell me a joke",
+        "What's 2 + 2?",
+        "Write me a poem",
+        "Can you speak Polish?",
+        "ok",
+        "Goodbye",
+        "What is the capital of France?",
+        "Explain quantum physics",
+        "Cześć",
+        "Dzień dobry",
+        "Dzięki",
+        "Kim jesteś?",
+        "Co potrafisz?",
+        "Pomocy",
+        "Opowiedz mi kawał",
+        "Jak się masz?",
+        "Do widzenia",
+        "Jaka jest stolica Niemiec?",
+        "Napisz wiersz",
+        "Czy mówisz po angielsku?",
+        "Nie rozumiem",
+        "Yes please",
+    ],
+}
+
+TEST: Dict[str, List[str]] = {
+    "weather": [
+        "weather in Bratislava",
+        "What's the forecast for Zurich tomorrow?",
+        "Is it raining in Glasgow?",
+        "How warm is it in Marseille today?",
+        "What was the weather like in Genoa last Tuesday?",
+        "temperature in Geneva now",
+        "Will it snow in Innsbruck next week?",
+        "Sunrise time in Tromsø",
+        "How strong is the wind in Rotterdam?",
+        "Do I need a coat in Hamburg tomorrow?",
+        "forecast for Cork",
+        "weather history Antwerp 2024-02-01 to 2024-02-07",
+        "Is it humid in Bangkok?",
+        "Tell me the weather in Vilnius",
+        "pogoda w Częstochowie",
+        "Jaka będzie pogoda w Elblągu w sobotę?",
+        "Czy pada w Tarnowie?",
+        "Ile stopni będzie jutro w Płocku?",
+        "prognoza dla Koszalina",
+        "Jaka była pogoda w Zielonej Górze przedwczoraj?",
+        "temperatura w Gorzowie teraz",
+        "Czy będzie wiać w Świnoujściu?",
+        "Kiedy wschód słońca w Przemyślu?",
+        "Czy jutro będzie słonecznie w Nowym Sączu?",
+        "Jaka pogoda w Wilnie?",
+    ],
+    "hotels": [
+        "hotels in Bratislava",
+        "Find me a hotel in Zurich for Friday",
+        "Where can I stay in Glasgow?",
+        "cheap accommodation in Marseille",
+        "Recommend a hotel near the beach in Genoa",
+        "Book a hotel in Geneva from 2025-09-01 to 2025-09-03",
+        "hostel in Innsbruck",
+        "I need a place to stay in Tromsø",
+        "Search hotels in Rotterdam",
+        "good hotel in Hamburg for a business trip",
+        "apartment in Cork for the weekend",
+        "Hotels in Antwerp with parking",
+        "Find lodging in Bangkok",
+        "hotele w Częstochowie",
+        "Znajdź nocleg w Elblągu",
+        "Szukam hotelu w Tarnowie na jutro",
+        "Gdzie przenocować w Płocku?",
+        "Tanie noclegi w Koszalinie",
+        "Poleć hotel w Zielonej Górze",
+        "apartament w Świnoujściu na tydzień",
+        "Znajdź hotel w Przemyślu z parkingiem",
+        "Gdzie się zatrzymać w Nowym Sączu?",
+        "Szukam pokoju w Wilnie",
+        "Find a B&B in Galway",
+        "hotel w Gorzowie",
+    ],
+    "combined": [
+        "weather and hotels in Bratislava",
+        "Plan my trip to Zurich",
+        "Forecast for Glasgow and a hotel please",
+        "Plan a weekend in Marseille",
+        "What can I do in Genoa next week and where to stay?",
+        "Help me plan a visit to Geneva",
+        "I'm heading to Hamburg on Saturday, weather and accommodation",
+        "Zaplanuj mi pobyt w Częstochowie",
+        "Pogoda i noclegi w Elblągu",
+        "Zaplanuj weekend w Tarnowie",
+        "Jaka pogoda w Płocku i znajdź hotel",
+        "Wyjazd do Koszalina, pomóż mi zaplanować",
+        "Świnoujście na najbliższe 3 dni",
+        "Co robić w Przemyślu w weekend i gdzie spać",
+        "Plan my holiday in Vilnius",
+    ],
+    "travel": [
+        "What should I visit in Bratislava in this weather?",
+        "Best museums in Zurich?",
+        "What to do in Glasgow on a rainy day?",
+        "Is Marseille worth visiting in November?",
+        "Co warto zobaczyć w Częstochowie?",
+        "Jakie atrakcje w Elblągu przy deszczu?",
+        "Gdzie zjeść w Tarnowie?",
+        "Co spakować na wyjazd do Wilna?",
+        "Give me sightseeing ideas for Hamburg",
+        "Co zwiedzić w Przemyślu?",
+    ],
+    "other": [
+        "Hey there",
+        "thanks a lot",
+        "What are you?",
+        "Can you help me?",
+        "Siema",
+        "Dziękuję bardzo",
+        "Co umiesz?",
+        "Tell me something funny",
+        "Na razie",
+        "What day is it?",
+    ],
+}
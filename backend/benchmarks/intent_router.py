@@ -0,0 +1,98 @@
+"""Train and score the local intent router on the labelled corpus.
+
+Run from backend/:  python -m benchmarks.intent_router [--train] [options]
+
+--train rebuilds api/intent_model.json from the TRAIN split of
+benchmarks/intent_corpus.py. Every run then scores the router on the
+held-out TEST split and prints:
+
+- label accuracy: the router's label (rule or model) against the gold one;
+- routing accuracy: the agent it picked against the one root would have
+  transferred to (root itself for combined, travel and other);
+- LLM turns saved: each correctly routed first message skips root's model
+  call; each misrouted one costs an extra call, since the sub-agent has to
+  hand the message back to root;
+- microseconds per routing decision.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from collections import Counter
+from typing import Optional
+
+from api.intent import (
+    DEFAULT_MIN_CONFIDENCE,
+    MODEL_PATH,
+    ROUTABLE_AGENTS,
+    IntentModel,
+    IntentRouter,
+)
+from benchmarks.intent_corpus import TEST, TRAIN
+
+
+def _train() -> IntentModel:
+    model = IntentModel.train(TRAIN)
+    with open(MODEL_PATH, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    vocabulary = {t for counts in model.token_counts.values() for t in counts}
+    print(
+        f"trained on {sum(model.documents.values())} messages, "
+        f"{len(vocabulary)} features -> {MODEL_PATH}"
+    )
+    return model
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--train", action="store_true", help="rebuild the model")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE)
+    parser.add_argument("--errors", action="store_true", help="list every miss")
+    args = parser.parse_args(argv)
+
+    model = _train() if args.train else IntentModel.load(MODEL_PATH)
+    router = IntentRouter(model, args.min_confidence)
+
+    labelled = [(m, label) for label, messages in TEST.items() for m in messages]
+    labels_right = routes_right = routed = misrouted = 0
+    by_source: Counter = Counter()
+    per_label: Counter = Counter()
+    for message, gold in labelled:
+        route = router.classify(message)
+        expected = ROUTABLE_AGENTS.get(gold)
+        by_source[route.source] += 1
+        labels_right += route.label == gold
+        per_label[gold] += route.label == gold
+        routes_right += route.agent == expected
+        if route.agent is not None:
+            routed += 1
+            misrouted += route.agent != expected
+        if args.errors and (route.label != gold or route.agent != expected):
+            print(
+                f"  {gold:>8} -> {route.label:<8} {route.confidence:.2f} "
+                f"{route.source:<5} {route.agent or 'root':<19} {message}"
+            )
+
+    total = len(labelled)
+    routable = sum(len(TEST[label]) for label in ROUTABLE_AGENTS)
+    saved = routed - 2 * misrouted
+    timer = timeit.Timer(lambda: [router.classify(m) for m, _ in labelled])
+    micros = min(timer.repeat(repeat=5, number=20)) / (20 * total) * 1e6
+
+    print(f"test messages       {total} ({routable} weather/hotels)")
+    print(f"label accuracy      {labels_right / total:.1%}")
+    for label, messages in TEST.items():
+        print(f"  {label:<17} {per_label[label] / len(messages):.1%}")
+    print(f"routing accuracy    {routes_right / total:.1%}")
+    print(f"routed to sub-agent {routed} ({routed / routable:.1%} of routable)")
+    print(f"misrouted           {misrouted}")
+    print(f"decided by          {dict(by_source)}")
+    print(f"LLM turns saved     {saved} ({saved / total:.2f} per first message)")
+    print(f"µs per decision     {micros:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
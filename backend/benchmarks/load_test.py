@@ -0,0 +1,224 @@
+"""Offline load test of POST /api/chat: stub model, local upstreams.
+
+Run from backend/:  python -m benchmarks.load_test [options]
+
+Starts the FastAPI app in-process with every agent's model replaced by
+StubLlm and the Visual Crossing and Tavily tools pointed at a local
+UpstreamStandIn, then drives /api/chat through httpx's ASGI transport at
+the requested concurrency. Reports latency percentiles, throughput, errors,
+resident-memory growth and how many model and upstream calls the run made.
+No API keys or network are needed; the latencies are all configurable so a
+change can be measured against the same simulated upstreams each time.
+
+    python -m benchmarks.load_test --requests 500 --concurrency 32 \\
+        --llm-latency 0.4 --search-latency 0.8 --mix current=2,hotels=1
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import resource
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.stub_llm import StubLlm, stub_model
+from benchmarks.upstreams import UpstreamStandIn
+
+MESSAGES = {
+    "current": "What's the weather like in {city}?",
+    "forecast": "Give me the forecast in {city}",
+    "hotels": "Find me hotels in {city}",
+    "combined": "Show me the weather and hotels in {city}",
+}
+# Env var -> file name of every on-disk store the app would otherwise open
+# under ~/.cache/weather-center.
+STORE_FILES = {
+    "HOTEL_INDEX_PATH": "hotels.sqlite3",
+    "HISTORY_STORE_PATH": "history.sqlite3",
+    "SESSION_SQLITE_PATH": "sessions.sqlite3",
+}
+CITIES = ("Warsaw", "Krakow", "Berlin", "Paris", "Lisbon", "Oslo", "Rome", "Madrid")
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _parse_mix(text: str) -> List[str]:
+    """'current=2,hotels=1' → ['current', 'current', 'hotels']."""
+    scenarios: List[str] = []
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in MESSAGES:
+            raise argparse.ArgumentTypeError(
+                f"unknown scenario {name!r}; expected one of {', '.join(MESSAGES)}"
+            )
+        scenarios.extend([name] * int(weight or 1))
+    return scenarios
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def _drive(
+    client: httpx.AsyncClient, jobs: List[Tuple[str, str]], concurrency: int
+) -> Tuple[List[float], Dict[str, int]]:
+    latencies: List[float] = []
+    outcomes: Dict[str, int] = {}
+    queue = iter(enumerate(jobs))
+
+    async def worker() -> None:
+        for n, (scenario, message) in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/api/chat",
+                    json={"message": message},
+                    # A distinct client per request keeps the per-IP limit
+                    # out of the measurement.
+                    headers={"X-Forwarded-For": f"10.0.{n // 250}.{n % 250}"},
+                )
+                body = response.json()
+                ok = response.status_code == 200 and body.get("success")
+                outcome = "ok" if ok else f"{scenario}: {body.get('error')}"
+            except httpx.HTTPError as e:
+                outcome = f"{scenario}: {type(e).__name__}"
+            latencies.append(time.perf_counter() - start)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, outcomes
+
+
+async def run(args: argparse.Namespace) -> None:
+    upstreams = await UpstreamStandIn(
+        weather_latency=args.weather_latency, search_latency=args.search_latency
+    ).start()
+    os.environ.update(upstreams.env())
+    for key in ("GOOGLE_API_KEY", "VISUAL_CROSSING_API_KEY", "TAVILY_API_KEY"):
+        os.environ.setdefault(key, "load-test")
+    os.environ.setdefault("TRACE_EXPORTER", "none")
+    # Stub hotels and weather days must not land in the real stores: a run
+    # gets fresh SQLite files unless --store-dir names some to reuse.
+    scratch = None
+    if args.store_dir:
+        for key, name in STORE_FILES.items():
+            os.environ[key] = os.path.join(args.store_dir, name)
+    else:
+        scratch = tempfile.TemporaryDirectory(prefix="weather-load-test-")
+        for key, name in STORE_FILES.items():
+            os.environ.setdefault(key, os.path.join(scratch.name, name))
+    # Per-request INFO logs would dominate the run; errors still show.
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+    # Imported only now: the app reads its environment at import time.
+    import agent_system.src.multi_tool_agent.agent as agent_module
+    from api import main
+
+    llm = StubLlm(latency=args.llm_latency)
+    scenarios = itertools.cycle(args.mix)
+    cities = itertools.cycle(args.cities)
+    jobs = []
+    for _ in range(args.requests):
+        scenario = next(scenarios)
+        jobs.append((scenario, MESSAGES[scenario].format(city=next(cities))))
+
+    transport = httpx.ASGITransport(app=main.app)
+    with stub_model(agent_module.root_agent, llm):
+        async with main.lifespan(main.app):
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://load-test", timeout=None
+            ) as client:
+                # One untimed pass so imports and first-use setup stay out
+                # of both the latency and the memory numbers.
+                await _drive(client, jobs[: args.concurrency], args.concurrency)
+                upstreams.requests.clear()
+                llm.calls = 0
+                rss_before = _rss_bytes()
+                start = time.perf_counter()
+                latencies, outcomes = await _drive(client, jobs, args.concurrency)
+                elapsed = time.perf_counter() - start
+                rss_after = _rss_bytes()
+    await upstreams.stop()
+    if scratch is not None:
+        scratch.cleanup()
+
+    print(
+        f"requests {len(latencies)}  concurrency {args.concurrency}  "
+        f"llm {args.llm_latency}s  weather {args.weather_latency}s  "
+        f"search {args.search_latency}s"
+    )
+    print(f"{'':<12}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'mean':>9}")
+    print(
+        f"{'latency ms':<12}"
+        + "".join(
+            f"{value * 1000:>9.1f}"
+            for value in (
+                _percentile(latencies, 50),
+                _percentile(latencies, 95),
+                _percentile(latencies, 99),
+                max(latencies),
+                statistics.fmean(latencies),
+            )
+        )
+    )
+    print(f"throughput  {len(latencies) / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(
+        f"memory      rss {rss_before / 2**20:.1f} → {rss_after / 2**20:.1f} MiB "
+        f"({(rss_after - rss_before) / 2**10 / len(latencies):+.1f} KiB/request)"
+    )
+    calls = upstreams.requests
+    print(
+        f"upstream    model {llm.calls}  visual_crossing "
+        f"{calls['visual_crossing']}  tavily {calls['tavily']}"
+    )
+    errors = {k: v for k, v in outcomes.items() if k != "ok"}
+    print(f"errors      {sum(errors.values())}")
+    for outcome, count in sorted(errors.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {count:>5}  {outcome}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--weather-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.5)
+    parser.add_argument(
+        "--mix",
+        type=_parse_mix,
+        default=_parse_mix("current=4,forecast=2,hotels=2,combined=1"),
+        help="scenario weights, e.g. current=4,forecast=2,hotels=2,combined=1",
+    )
+    parser.add_argument(
+        "--cities",
+        type=lambda text: [c.strip() for c in text.split(",") if c.strip()],
+        default=list(CITIES),
+        help="comma-separated cities to cycle through",
+    )
+    parser.add_argument(
+        "--store-dir",
+        help="directory for the hotel index, history and session SQLite files; "
+        "pass the same one to two runs to measure a restarted worker "
+        "(default: a temporary directory removed after the run)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,118 @@
+"""Per-reply cost of the response post-processing pipeline.
+
+Run from backend/:  python -m benchmarks.post_processing [options]
+
+Times each stage that runs on every final agent reply — fence extraction,
+error detection, schema validation, normalization, and the whole
+_final_chat_response — against the replies in benchmarks/corpora.py, and
+prints microseconds per call (best of several repeats).
+
+To track regressions across commits, save a baseline and compare later:
+
+    python -m benchmarks.post_processing --save /tmp/before.json
+    git switch my-branch
+    python -m benchmarks.post_processing --compare /tmp/before.json
+
+--compare exits with status 1 when any case got slower than --threshold
+(default 25 %), so it can gate a CI job.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import timeit
+from typing import Callable, Dict, Optional
+
+from api.chat_service import (
+    _detect_error_in_response,
+    _extract_fenced_json,
+    _final_chat_response,
+    _normalize_agent_response,
+    _validate_payload,
+)
+from benchmarks.corpora import CORPORA
+
+
+def _quietly(fn: Callable[[], object]) -> Callable[[], None]:
+    # Malformed corpora raise on purpose; the raise is part of the cost.
+    def call() -> None:
+        try:
+            fn()
+        except (ValueError, TypeError):
+            pass
+
+    return call
+
+
+def _cases() -> Dict[str, Callable[[], None]]:
+    cases: Dict[str, Callable[[], None]] = {}
+    for name, reply in CORPORA.items():
+        cases[f"extract/{name}"] = _quietly(lambda r=reply: _extract_fenced_json(r))
+        cases[f"detect/{name}"] = lambda r=reply: _detect_error_in_response(r)
+
+        is_error, _, fenced = _detect_error_in_response(reply)
+        if fenced is not None and not is_error:
+            cases[f"validate/{name}"] = lambda f=fenced: _validate_payload(
+                f.fence_type, f.payload
+            )
+            cases[f"normalize/{name}"] = lambda r=reply, f=fenced: (
+                _normalize_agent_response(r, f)
+            )
+        cases[f"pipeline/{name}"] = lambda r=reply: _final_chat_response(r, "s")
+    return cases
+
+
+def _measure(fn: Callable[[], None], repeat: int) -> float:
+    """Best microseconds per call over `repeat` runs of ~0.2 s each."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="only cases containing this")
+    parser.add_argument("--save", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to diff")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    # The unparseable corpus logs its body on every call.
+    logging.getLogger("api.chat_service").setLevel(logging.ERROR)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results: Dict[str, float] = {}
+    regressions = []
+    print(f"{'case':<32}{'µs/call':>10}{'baseline':>10}{'change':>9}")
+    for case, fn in _cases().items():
+        if args.filter not in case:
+            continue
+        micros = results[case] = _measure(fn, args.repeat)
+        line = f"{case:<32}{micros:>10.1f}"
+        if case in baseline:
+            change = micros / baseline[case] - 1
+            line += f"{baseline[case]:>10.1f}{change:>+9.0%}"
+            if change > args.threshold:
+                regressions.append(case)
+                line += "  slower"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(
+            f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
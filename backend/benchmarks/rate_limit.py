@@ -0,0 +1,68 @@
+"""Latency of one chat rate-limit check, per store.
+
+Run from backend/:  python -m benchmarks.rate_limit [iterations]
+
+Measures SlidingWindowLimiter.check against the in-process store and against
+a Redis-protocol server over localhost TCP (the in-repo test stand-in, or a
+real server when RATE_LIMIT_REDIS_URL is set). The check sits in front of
+every chat request, so its p99 must stay well under a millisecond.
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from api.rate_limit import (
+    InMemoryRateStore,
+    RateLimit,
+    RespRateStore,
+    SlidingWindowLimiter,
+)
+from tests.resp_server import RespServer
+
+# High enough that the benchmark never gets rejected.
+LIMIT = RateLimit(10**9, 60)
+
+
+async def _measure(limiter: SlidingWindowLimiter, iterations: int) -> list[float]:
+    await limiter.check("ip", "warmup", LIMIT)
+    samples = []
+    for n in range(iterations):
+        start = time.perf_counter()
+        await limiter.check("ip", f"client-{n % 100}", LIMIT)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+async def main(iterations: int = 5000) -> None:
+    stand_in = None
+    url = os.getenv("RATE_LIMIT_REDIS_URL")
+    if not url:
+        stand_in = await RespServer().start()
+        url = stand_in.url
+    resp_store = RespRateStore(url)
+
+    rows = [
+        (
+            "memory",
+            await _measure(SlidingWindowLimiter(InMemoryRateStore()), iterations),
+        ),
+        (
+            f"redis ({url})",
+            await _measure(SlidingWindowLimiter(resp_store), iterations),
+        ),
+    ]
+    await resp_store.close()
+    if stand_in is not None:
+        await stand_in.stop()
+
+    print(f"{'store':<40}{'p50 µs':>10}{'p99 µs':>10}")
+    for name, samples in rows:
+        q = statistics.quantiles(samples, n=100)
+        print(f"{name:<40}{q[49]:>10.1f}{q[98]:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
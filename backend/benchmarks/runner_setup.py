@@ -0,0 +1,62 @@
+"""Per-request ADK Runner setup cost: construct-per-message vs shared.
+
+Run from backend/:  python -m benchmarks.runner_setup [iterations]
+
+Reports mean wall time and bytes allocated per request for building a fresh
+Runner (the old behaviour of process_chat_request) versus fetching the
+shared instance from get_runner(). No API keys or network are needed.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from google.adk.runners import Runner
+
+import agent_system.src.multi_tool_agent.agent as agent_module
+from api.chat_service import get_runner
+from api.session_manager import APP_NAME, session_manager
+
+
+def _construct() -> Runner:
+    return Runner(
+        agent=agent_module.root_agent,
+        app_name=APP_NAME,
+        session_service=session_manager.session_service,
+    )
+
+
+def _measure(fn, iterations: int) -> tuple[float, float]:
+    """Return (mean microseconds, mean bytes allocated) per call."""
+    fn()  # warm up imports and caches outside the measurement
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+
+    # Peak traced memory above the starting point, per call: what one
+    # request allocates even if it is freed again straight after.
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(iterations):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed / iterations * 1e6, allocated / iterations
+
+
+def main(iterations: int = 2000) -> None:
+    rows = [
+        ("Runner() per request", _measure(_construct, iterations)),
+        ("shared get_runner()", _measure(get_runner, iterations)),
+    ]
+    print(f"{'setup':<24}{'µs/request':>12}{'bytes/request':>16}")
+    for name, (micros, allocated) in rows:
+        print(f"{name:<24}{micros:>12.2f}{allocated:>16.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
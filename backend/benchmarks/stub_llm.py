@@ -0,0 +1,195 @@
+"""A scripted stand-in for Gemini that drives the real agent graph.
+
+The stub answers like a well-behaved model would, one step per call: root
+transfers single-intent questions to a sub-agent or, for weather-and-hotel
+questions, calls both AgentTools and writes the combined-json reply; the
+weather agent calls its tool and writes one sentence (the server attaches
+the weather-json fence); the hotel agent calls search_hotels and writes a
+hotel-json fence from the results. Every tool, callback, session write and
+validator on the way runs for real.
+
+Scenarios come from the user's wording: "hotels" → hotels, "weather and
+hotels" → combined, "forecast" → 15-day forecast, anything else → current
+weather. The city is whatever follows the last " in ".
+"""
+
+import asyncio
+import json
+import re
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Dict, Iterator, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from benchmarks.corpora import hotel_payload
+
+_DATE_HEADER = "[Today is "
+_CITY_PATTERN = re.compile(r"\bin ([^?.!,\]]+)", re.IGNORECASE)
+_FENCE_PATTERN = re.compile(r"```\s*([a-z-]+)\s*\n([\s\S]*?)\n```")
+
+
+def scenario_of(message: str) -> str:
+    text = message.lower()
+    if "hotel" in text:
+        return "combined" if "weather" in text else "hotels"
+    return "forecast" if "forecast" in text else "current"
+
+
+def city_of(message: str) -> str:
+    matches = _CITY_PATTERN.findall(message)
+    return matches[-1].strip() if matches else "Warsaw"
+
+
+def _text(content: types.Content) -> str:
+    return "".join(part.text or "" for part in content.parts or [])
+
+
+def _fence(text: str) -> Optional[Dict[str, Any]]:
+    match = _FENCE_PATTERN.search(text)
+    return json.loads(match.group(2)) if match else None
+
+
+class StubLlm(BaseLlm):
+    """Scripted model; `latency` seconds are spent on every call."""
+
+    model: str = "stub-llm"
+    latency: float = 0.0
+    calls: int = 0
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"stub-llm"]
+
+    def _turn(self, llm_request: LlmRequest) -> types.Content:
+        contents = llm_request.contents
+        # The turn starts at the user's message (date header) or, inside an
+        # AgentTool sub-run, at the request text the parent sent.
+        start = max(
+            (
+                i
+                for i, c in enumerate(contents)
+                if c.role == "user" and _text(c).startswith(_DATE_HEADER)
+            ),
+            default=0,
+        )
+        message = _text(contents[start]) if contents else ""
+        city = city_of(message)
+        responses: Dict[str, Any] = {}
+        for content in contents[start:]:
+            for part in content.parts or []:
+                if part.function_response:
+                    responses[part.function_response.name] = (
+                        part.function_response.response or {}
+                    )
+        tools = llm_request.tools_dict
+
+        if "get_weather_agent" in tools:
+            return self._root(scenario_of(message), city, responses)
+        if "get_current_weather" in tools:
+            return self._weather(scenario_of(message), city, responses)
+        if "search_hotels" in tools:
+            return self._hotels(city, responses)
+        return _reply(f"{city} is lovely this time of year.")
+
+    def _root(self, scenario: str, city: str, responses: Dict) -> types.Content:
+        if scenario == "current" or scenario == "forecast":
+            return _call("transfer_to_agent", agent_name="get_weather_agent")
+        if scenario == "hotels":
+            return _call("transfer_to_agent", agent_name="search_hotels_agent")
+        if "get_weather_agent" not in responses:
+            return _call("get_weather_agent", request=f"Weather in {city}")
+        if "search_hotels_agent" not in responses:
+            return _call("search_hotels_agent", request=f"Hotels in {city}")
+
+        weather = _fence(str(responses["get_weather_agent"].get("result", "")))
+        hotels = _fence(str(responses["search_hotels_agent"].get("result", "")))
+        if not weather or not hotels:
+            return _reply(f"```combined-json\n{json.dumps({'error': 'no data'})}\n```")
+        meta = weather["meta"]
+        body = {k: v for k, v in weather.items() if k != "meta"}
+        combined = {
+            "meta": {**meta, "kind": "combined"},
+            "weather": {"kind": meta["kind"], **body},
+            "hotels": hotels["hotels"],
+        }
+        return _reply(
+            f"Weather and hotels for {city}.\n\n"
+            f"```combined-json\n{json.dumps(combined, ensure_ascii=False)}\n```"
+        )
+
+    def _weather(self, scenario: str, city: str, responses: Dict) -> types.Content:
+        tool = "get_forecast" if scenario == "forecast" else "get_current_weather"
+        if tool not in responses:
+            return _call(tool, city=city, language="en")
+        return _reply(f"Here is the weather for {city}.")
+
+    def _hotels(self, city: str, responses: Dict) -> types.Content:
+        if "search_hotels" not in responses:
+            return _call("search_hotels", city=city, language="en")
+        found = responses["search_hotels"]
+        if "error" in found:
+            return _reply(f"```hotel-json\n{json.dumps(found)}\n```")
+        payload = hotel_payload(city, found.get("results", []))
+        return _reply(f"Hotels in {city}.\n\n```hotel-json\n{json.dumps(payload)}\n```")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.calls += 1
+        content = self._turn(llm_request)
+        tokens = sum(len(_text(c)) for c in llm_request.contents) // 4
+        yield LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=tokens,
+                candidates_token_count=50,
+                total_token_count=tokens + 50,
+            ),
+        )
+
+
+def _call(name: str, **args: Any) -> types.Content:
+    return types.Content(
+        role="model",
+        parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+    )
+
+
+def _reply(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def _agents(root) -> Iterator[Any]:
+    seen = set()
+    stack = [root]
+    while stack:
+        agent = stack.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        yield agent
+        stack.extend(getattr(agent, "sub_agents", []) or [])
+        stack.extend(
+            tool.agent
+            for tool in getattr(agent, "tools", []) or []
+            if isinstance(tool, AgentTool)
+        )
+
+
+@contextmanager
+def stub_model(root, llm: BaseLlm) -> Iterator[BaseLlm]:
+    """Swap `llm` in for the model of every agent under `root`, then restore."""
+    originals = [(agent, agent.model) for agent in _agents(root)]
+    for agent, _ in originals:
+        agent.model = llm
+    try:
+        yield llm
+    finally:
+        for agent, model in originals:
+            agent.model = model
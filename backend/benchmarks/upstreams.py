@@ -0,0 +1,175 @@
+"""Local stand-ins for Visual Crossing and Tavily, for offline load tests.
+
+One asyncio HTTP/1.1 server answers both APIs with realistic-looking
+payloads after a configurable delay, so a load test exercises the real
+tools, the shared connection pool and the caches without network access or
+API quota. Point the app at it with VISUAL_CROSSING_API_URL and
+TAVILY_API_URL (see `env()`).
+"""
+
+import asyncio
+import json
+import random
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+TIMELINE_PATH = "/VisualCrossingWebServices/rest/services/timeline/"
+_CONDITIONS = ("Clear", "Partially cloudy", "Overcast", "Rain, Overcast", "Snow")
+_MAX_HEADER_BYTES = 64 * 1024
+
+
+def _day(day: date, rng: random.Random) -> Dict:
+    temp = round(rng.uniform(-5, 28), 1)
+    return {
+        "datetime": day.isoformat(),
+        "datetimeEpoch": (day - date(1970, 1, 1)).days * 86400,
+        "temp": temp,
+        "tempmax": round(temp + rng.uniform(1, 6), 1),
+        "tempmin": round(temp - rng.uniform(1, 6), 1),
+        "feelslike": round(temp - 1.5, 1),
+        "humidity": round(rng.uniform(30, 95), 1),
+        "precip": round(rng.uniform(0, 4), 1),
+        "windspeed": round(rng.uniform(2, 40), 1),
+        "winddir": round(rng.uniform(0, 359), 1),
+        "pressure": round(rng.uniform(995, 1030), 1),
+        "cloudcover": round(rng.uniform(0, 100), 1),
+        "sunrise": "06:52:11",
+        "sunset": "18:21:40",
+        "conditions": rng.choice(_CONDITIONS),
+        "description": "Partly cloudy throughout the day.",
+        "icon": "partly-cloudy-day",
+    }
+
+
+def timeline_body(city: str, start: str = "", end: str = "", current=False) -> Dict:
+    """A Visual Crossing timeline response for `city` and the date range."""
+    rng = random.Random(city)
+    today = date.today()
+    try:
+        first = date.fromisoformat(start) if start else today
+        last = date.fromisoformat(end) if end else first
+    except ValueError:
+        first, last = today, today
+    if not start:
+        last = today + timedelta(days=14)
+    count = min(max((last - first).days + 1, 1), 366)
+    body = {
+        "queryCost": count,
+        "resolvedAddress": city,
+        "timezone": "Europe/Warsaw",
+        "days": [_day(first + timedelta(days=n), rng) for n in range(count)],
+    }
+    if current:
+        body["currentConditions"] = {
+            **{k: v for k, v in body["days"][0].items() if k != "datetime"},
+            "datetime": "12:00:00",
+        }
+    return body
+
+
+def search_body(query: str) -> Dict:
+    """A Tavily advanced search response with eight hotel results."""
+    rng = random.Random(query)
+    results = []
+    for n in range(8):
+        slug = f"hotel-{n}-{rng.randint(1000, 9999)}"
+        results.append(
+            {
+                "url": f"https://www.booking.com/hotel/pl/{slug}.html",
+                "title": f"Hotel Number {n} – {query[:40]}",
+                "content": (
+                    f"Hotel Number {n} offers rooms from {80 + 15 * n} USD per "
+                    f"night. Rated {rng.uniform(7, 9.6):.1f}/10 from "
+                    f"{rng.randint(100, 4000)} reviews. Free WiFi, breakfast, "
+                    "24-hour front desk, close to the old town. " * 3
+                ),
+                "score": round(rng.uniform(0.5, 0.99), 3),
+            }
+        )
+    return {"query": query, "results": results, "response_time": 0.2}
+
+
+class UpstreamStandIn:
+    """Serve Visual Crossing timelines and Tavily searches on localhost."""
+
+    def __init__(
+        self, weather_latency: float = 0.05, search_latency: float = 0.3
+    ) -> None:
+        self.weather_latency = weather_latency
+        self.search_latency = search_latency
+        self.requests: Counter[str] = Counter()
+        self._server: Optional[asyncio.Server] = None
+        self.port = 0
+
+    async def start(self) -> "UpstreamStandIn":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points the weather and hotel tools here."""
+        return {
+            "VISUAL_CROSSING_API_URL": f"{self.url}{TIMELINE_PATH}",
+            "TAVILY_API_URL": self.url,
+        }
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        parts = urlsplit(target)
+        if method == "GET" and parts.path.startswith(TIMELINE_PATH):
+            self.requests["visual_crossing"] += 1
+            await asyncio.sleep(self.weather_latency)
+            segments = [unquote(s) for s in parts.path[len(TIMELINE_PATH) :].split("/")]
+            city, start, end = (segments + ["", ""])[:3]
+            include = parse_qs(parts.query).get("include", [""])[0]
+            return 200, timeline_body(city, start, end, "current" in include)
+        if method == "POST" and parts.path == "/search":
+            self.requests["tavily"] += 1
+            await asyncio.sleep(self.search_latency)
+            query = json.loads(body or b"{}").get("query", "")
+            return 200, search_body(query)
+        return 404, {"error": "not found"}
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if len(head) > _MAX_HEADER_BYTES:
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {
+                    k.strip().lower(): v.strip()
+                    for k, _, v in (line.partition(":") for line in lines[1:] if line)
+                }
+                length = int(headers.get("content-length") or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, target, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,16 @@
+import pytest
+
+from agent_system.src.multi_tool_agent.tools import history_store, hotel_index
+
+
+@pytest.fixture(autouse=True)
+def isolated_stores(tmp_path, monkeypatch):
+    """Keep the hotel index and history store out of ~/.cache/weather-center."""
+    monkeypatch.setenv("HOTEL_INDEX_PATH", str(tmp_path / "hotels.sqlite3"))
+    monkeypatch.setenv("HISTORY_STORE_PATH", str(tmp_path / "history.sqlite3"))
+    monkeypatch.setattr(hotel_index, "_index", None)
+    monkeypatch.setattr(history_store, "_store", None)
+    yield
+    for store in (hotel_index._index, history_store._store):
+        if store is not None:
+            store.close()
@@ -0,0 +1,201 @@
+"""In-process stand-in for a Redis server, for tests of the RESP backends.
+
+Implements the handful of commands the backend issues, with the same reply
+types and expiry semantics as Redis, on an asyncio server bound to an
+ephemeral localhost port.
+"""
+
+import asyncio
+import fnmatch
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, _Status):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, _Error):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    data = str(value).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class _Status(str):
+    pass
+
+
+class _Error(str):
+    pass
+
+
+OK = _Status("OK")
+QUEUED = _Status("QUEUED")
+
+
+class _Client:
+    """Per-connection transaction state: WATCHed key versions, MULTI queue."""
+
+    def __init__(self) -> None:
+        self.watched: Dict[str, int] = {}
+        self.queued: Optional[List[List[str]]] = None
+
+
+class RespServer:
+    def __init__(self) -> None:
+        self.data: Dict[str, Tuple[str, Optional[float]]] = {}
+        # Bumped on every write, for WATCH.
+        self.versions: Dict[str, int] = {}
+        self.commands: List[List[str]] = []
+        self._server: Optional[asyncio.base_events.Server] = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    async def start(self) -> "RespServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        client = _Client()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                self.commands.append(args)
+                writer.write(_encode(self.transact(client, args)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _write(self, key: str, entry: Optional[Tuple[str, Optional[float]]]) -> None:
+        if entry is None:
+            self.data.pop(key, None)
+        else:
+            self.data[key] = entry
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def transact(self, client: _Client, args: List[str]) -> Any:
+        name = args[0].upper()
+        if name == "EXEC":
+            queued, client.queued = client.queued, None
+            watched, client.watched = client.watched, {}
+            if queued is None:
+                return _Error("ERR EXEC without MULTI")
+            if any(self.versions.get(k, 0) != v for k, v in watched.items()):
+                return None
+            return [self.dispatch(command) for command in queued]
+        if client.queued is not None:
+            client.queued.append(args)
+            return QUEUED
+        if name == "MULTI":
+            client.queued = []
+            return OK
+        if name == "WATCH":
+            client.watched.update({k: self.versions.get(k, 0) for k in args[1:]})
+            return OK
+        if name == "UNWATCH":
+            client.watched = {}
+            return OK
+        return self.dispatch(args)
+
+    def dispatch(self, args: List[str]) -> Any:
+        name, rest = args[0].upper(), args[1:]
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return _Error(f"ERR unknown command '{name}'")
+        return handler(*rest)
+
+    def cmd_ping(self) -> Any:
+        return _Status("PONG")
+
+    def cmd_get(self, key: str) -> Any:
+        return self._live(key)
+
+    def cmd_mget(self, *keys: str) -> Any:
+        return [self._live(key) for key in keys]
+
+    def cmd_set(self, key: str, value: str, *options: str) -> Any:
+        expires_at = None
+        opts = [o.upper() for o in options]
+        if "NX" in opts and self._live(key) is not None:
+            return None
+        for unit, scale in (("EX", 1.0), ("PX", 0.001)):
+            if unit in opts:
+                ttl = int(options[opts.index(unit) + 1]) * scale
+                expires_at = time.monotonic() + ttl
+        self._write(key, (value, expires_at))
+        return OK
+
+    def cmd_del(self, *keys: str) -> Any:
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                removed += 1
+            self._write(key, None)
+        return removed
+
+    def cmd_incrby(self, key: str, amount: str) -> Any:
+        current = self._live(key)
+        value = int(current or 0) + int(amount)
+        expires_at = self.data[key][1] if current is not None else None
+        self._write(key, (str(value), expires_at))
+        return value
+
+    def cmd_incr(self, key: str) -> Any:
+        return self.cmd_incrby(key, "1")
+
+    def cmd_pexpire(self, key: str, ms: str) -> Any:
+        value = self._live(key)
+        if value is None:
+            return 0
+        self._write(key, (value, time.monotonic() + int(ms) / 1000))
+        return 1
+
+    def cmd_pttl(self, key: str) -> Any:
+        if self._live(key) is None:
+            return -2
+        expires_at = self.data[key][1]
+        if expires_at is None:
+            return -1
+        return int((expires_at - time.monotonic()) * 1000)
+
+    def cmd_scan(self, cursor: str, *options: str) -> Any:
+        opts = [o.upper() for o in options]
+        pattern = options[opts.index("MATCH") + 1] if "MATCH" in opts else "*"
+        keys = [
+            key
+            for key in list(self.data)
+            if self._live(key) is not None and fnmatch.fnmatchcase(key, pattern)
+        ]
+        return ["0", keys]
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from agent_system.src.multi_tool_agent.tools.cache import (
+    StaleWhileRevalidate,
+    TTLCache,
+    normalize_city,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNormalizeCity:
+    @pytest.mark.parametrize("raw", ["Kraków", "krakow", "  KRAKÓW ", "Krakow"])
+    def test_case_diacritics_and_whitespace_fold(self, raw):
+        assert normalize_city(raw) == "krakow"
+
+    def test_polish_l_stroke_folds(self):
+        assert normalize_city("Łódź") == normalize_city("Lodz") == "lodz"
+
+    def test_inner_whitespace_collapses(self):
+        assert normalize_city("New   York") == "new york"
+
+
+class TestTTLCache:
+    def test_hit_before_expiry(self):
+        clock = FakeClock()
+        cache = TTLCache(clock=clock)
+        cache.set("k", 1, ttl=10)
+        clock.now += 9
+        assert cache.get("k") == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_miss_after_expiry(self):
+        clock = FakeClock()
+        cache = TTLCache(clock=clock)
+        cache.set("k", 1, ttl=10)
+        clock.now += 10
+        assert cache.get("k") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_per_entry_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(clock=clock)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=500)
+        clock.now += 60
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+
+
+class TestStaleWhileRevalidate:
+    @staticmethod
+    def fetcher(values, calls):
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return values.pop(0)
+
+        return fetch
+
+    @pytest.mark.asyncio
+    async def test_fresh_hit_skips_the_fetch(self):
+        cache = StaleWhileRevalidate(10, 20, clock=FakeClock())
+        calls = []
+        fetch = self.fetcher(["a", "b"], calls)
+        assert await cache.get("k", fetch) == "a"
+        assert await cache.get("k", fetch) == "a"
+        assert len(calls) == 1
+        assert cache.stats()["fresh_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_hit_returns_at_once_and_refreshes_once(self):
+        clock = FakeClock()
+        cache = StaleWhileRevalidate(10, 20, clock=clock)
+        calls = []
+        fetch = self.fetcher(["a", "b"], calls)
+        await cache.get("k", fetch)
+        clock.now += 15
+        assert await cache.get("k", fetch) == "a"
+        assert await cache.get("k", fetch) == "a"
+        await asyncio.sleep(0.01)
+        assert len(calls) == 2
+        assert await cache.get("k", fetch) == "b"
+        assert cache.stats()["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_values_can_be_seeded_at_an_age(self):
+        cache = StaleWhileRevalidate(10, 20, clock=FakeClock())
+        calls = []
+        fetch = self.fetcher(["fetched"], calls)
+        cache.set("stale", "seeded", age=15)
+        cache.set("expired", "seeded", age=30)
+        assert await cache.get("stale", fetch) == "seeded"
+        assert cache.peek("expired") is None
+        await asyncio.sleep(0.01)
+        assert len(calls) == 1  # the stale seed was refreshed
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_the_stale_value(self):
+        clock = FakeClock()
+        cache = StaleWhileRevalidate(10, 20, clock=clock)
+        calls = []
+        fetch = self.fetcher(["a", {"error": "down"}], calls)
+        keep = lambda value: "error" not in value  # noqa: E731
+        await cache.get("k", fetch, keep)
+        clock.now += 15
+        await cache.get("k", fetch, keep)
+        await asyncio.sleep(0.01)
+        assert cache.peek("k") == "a"
+        assert cache.stats()["refresh_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_entry_past_both_windows_is_fetched_again(self):
+        clock = FakeClock()
+        cache = StaleWhileRevalidate(10, 20, clock=clock)
+        calls = []
+        fetch = self.fetcher(["a", "b"], calls)
+        await cache.get("k", fetch)
+        clock.now += 30
+        assert await cache.get("k", fetch) == "b"
+        assert cache.peek("gone") is None
@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 import pytest
 
 from api.chat_service import (
+    FencedReply,
     _detect_error_in_response,
     _extract_fenced_json,
     _normalize_agent_response,
@@ -35,22 +36,22 @@ class TestExtractFencedJson:
     )
     def test_extracts_each_fence_type(self, fence_type):
         result = _extract_fenced_json(fenced(fence_type, '{"a": 1}'))
-        assert result == (fence_type, {"a": 1})
+        assert result[:2] == (fence_type, {"a": 1})
 
     def test_fence_type_is_case_insensitive(self):
         result = _extract_fenced_json(fenced("Weather-JSON", '{"a": 1}'))
-        assert result == ("weather-json", {"a": 1})
+        assert result[:2] == ("weather-json", {"a": 1})
 
     def test_returns_none_without_fence(self):
         assert _extract_fenced_json("just some prose, no code fence") is None
 
     def test_repairs_trailing_comma_before_closing_brace(self):
         result = _extract_fenced_json(fenced("weather-json", '{"a": 1,}'))
-        assert result == ("weather-json", {"a": 1})
+        assert result[:2] == ("weather-json", {"a": 1})
 
     def test_repairs_trailing_comma_before_closing_bracket(self):
         result = _extract_fenced_json(fenced("hotel-json", '{"items": [1, 2,],}'))
-        assert result == ("hotel-json", {"items": [1, 2]})
+        assert result[:2] == ("hotel-json", {"items": [1, 2]})
 
     def test_irreparable_json_raises(self):
         with pytest.raises(json.JSONDecodeError):
@@ -63,7 +64,16 @@ class TestExtractFencedJson:
             + fenced("hotel-json", '{"second": true}')
         )
         result = _extract_fenced_json(text)
-        assert result == ("weather-json", {"first": True})
+        assert result[:2] == ("weather-json", {"first": True})
+
+    def test_span_and_body_point_into_the_raw_text(self):
+        text = 'Sunny.\n```weather-json\n  {"a": 1}\n```'
+        result = _extract_fenced_json(text)
+        assert (result.start, result.body) == (7, '{"a": 1}')
+
+    def test_repaired_body_is_the_repaired_text(self):
+        result = _extract_fenced_json(fenced("hotel-json", '{"items": [1, 2,],}'))
+        assert result.body == '{"items": [1, 2]}'
 
 
 class TestNormalizeAgentResponse:
@@ -75,7 +85,7 @@ class TestNormalizeAgentResponse:
 
     def test_human_text_before_fence_is_preserved(self):
         raw = "Here is the weather:\n" + fenced("weather-json", '{"a": 1}')
-        normalized = _normalize_agent_response(raw)
+        normalized = _normalize_agent_response(raw, _extract_fenced_json(raw))
         assert normalized.startswith("Here is the weather:\n\n```weather-json\n")
         assert normalized.endswith("\n```")
 
@@ -83,15 +93,19 @@ class TestNormalizeAgentResponse:
         # The raw fence body has a trailing comma; the normalized output must
         # carry the repaired payload, not the original malformed text.
         raw = fenced("weather-json", '{"a": 1,}')
-        fence_type, payload = _extract_fenced_json(raw)
-        normalized = _normalize_agent_response(raw, fence_type, payload)
+        normalized = _normalize_agent_response(raw, _extract_fenced_json(raw))
         body = normalized.split("```weather-json\n", 1)[1].rsplit("\n```", 1)[0]
         assert json.loads(body) == {"a": 1}
 
-    def test_explicit_fence_type_overrides_label(self):
+    def test_model_formatting_is_kept_without_a_repair(self):
+        raw = fenced("json", '{\n  "a": 1\n}')
+        normalized = _normalize_agent_response(raw, _extract_fenced_json(raw))
+        assert normalized == raw
+
+    def test_reply_fence_type_overrides_label(self):
         raw = fenced("json", '{"a": 1}')
-        normalized = _normalize_agent_response(raw, "weather-json", {"a": 1})
-        assert "```weather-json\n" in normalized
+        reply = FencedReply("weather-json", {"a": 1}, 0, '{"a": 1}')
+        assert "```weather-json\n" in _normalize_agent_response(raw, reply)
 
 
 class TestDetectErrorInResponse:
@@ -100,45 +114,43 @@ class TestDetectErrorInResponse:
             True,
             "No response content from agent.",
             None,
-            None,
         )
 
     def test_fenced_error_message_is_surfaced(self):
-        is_error, message, fence_type, payload = _detect_error_in_response(
+        is_error, message, reply = _detect_error_in_response(
             fenced("weather-json", '{"error": "boom"}')
         )
         assert (is_error, message) == (True, "boom")
-        assert fence_type == "weather-json"
-        assert payload == {"error": "boom"}
+        assert reply.fence_type == "weather-json"
+        assert reply.payload == {"error": "boom"}
 
     def test_empty_error_string_gets_generic_message(self):
-        is_error, message, _, _ = _detect_error_in_response(
+        is_error, message, _ = _detect_error_in_response(
             fenced("weather-json", '{"error": ""}')
         )
         assert (is_error, message) == (True, "Agent encountered an error.")
 
     def test_malformed_json_is_error(self):
-        is_error, message, fence_type, payload = _detect_error_in_response(
+        is_error, message, reply = _detect_error_in_response(
             fenced("weather-json", "{broken")
         )
         assert is_error is True
         assert "malformed JSON" in message
-        assert (fence_type, payload) == (None, None)
+        assert reply is None
 
     def test_valid_payload_is_not_error(self):
-        is_error, message, fence_type, payload = _detect_error_in_response(
+        is_error, message, reply = _detect_error_in_response(
             fenced("hotel-json", '{"hotels": []}')
         )
         assert (is_error, message) == (False, None)
-        assert fence_type == "hotel-json"
-        assert payload == {"hotels": []}
+        assert reply.fence_type == "hotel-json"
+        assert reply.payload == {"hotels": []}
 
     def test_plain_prose_is_not_error(self):
         assert _detect_error_in_response("just a friendly answer") == (
             False,
             None,
             None,
-            None,
         )
 
 
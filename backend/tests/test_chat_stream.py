@@ -0,0 +1,143 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from google.adk.events import Event
+from google.genai import types
+
+from api import chat_service
+from api.main import app
+
+WEATHER_REPLY = (
+    "Sunny in Warsaw.\n\n```weather-json\n"
+    + json.dumps(
+        {
+            "meta": {
+                "city": "Warsaw",
+                "kind": "current",
+                "date": "2026-08-08",
+                "language": "en",
+            },
+            "current": {
+                "temp": 21.5,
+                "tempmax": 25.0,
+                "tempmin": 15.0,
+                "windspeed": 10.0,
+                "winddir": 180.0,
+                "pressure": 1013.0,
+                "humidity": 60.0,
+                "sunrise": "05:30",
+                "sunset": "20:15",
+                "conditions": "Clear",
+            },
+        }
+    )
+    + "\n```"
+)
+
+
+def model_event(*parts, partial=None):
+    return Event(
+        author="weather_assistant",
+        invocation_id="inv",
+        partial=partial,
+        content=types.Content(role="model", parts=list(parts)),
+    )
+
+
+def scripted_events():
+    return [
+        model_event(
+            types.Part(function_call=types.FunctionCall(name="get_current_weather"))
+        ),
+        model_event(
+            types.Part(
+                function_response=types.FunctionResponse(
+                    name="get_current_weather", response={}
+                )
+            )
+        ),
+        model_event(types.Part(text="Sunny"), partial=True),
+        model_event(types.Part(text=WEATHER_REPLY)),
+    ]
+
+
+class FakeRunner:
+    run_configs = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def run_async(self, run_config=None, **kwargs):
+        FakeRunner.run_configs.append(run_config)
+        for event in scripted_events():
+            yield event
+
+
+@pytest.fixture(autouse=True)
+def fake_runner(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(chat_service, "Runner", FakeRunner)
+    chat_service.get_runner.cache_clear()
+    FakeRunner.run_configs = []
+    yield
+    chat_service.get_runner.cache_clear()
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestChatStreamEndpoint:
+    def test_emits_progress_partial_and_final(self):
+        client = TestClient(app)
+        response = client.post("/api/chat/stream", json={"message": "weather"})
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = parse_sse(response.text)
+        names = [name for name, _ in events]
+        assert names == ["progress", "progress", "progress", "partial", "final"]
+        assert events[0][1]["stage"] == "accepted"
+        assert events[1][1] == {
+            "stage": "tool_call",
+            "tool": "get_current_weather",
+            "message": "Fetching current weather…",
+        }
+        assert events[3][1] == {"text": "Sunny"}
+        final = events[-1][1]
+        assert final["success"] is True
+        assert "```weather-json" in final["data"]["message"]
+        assert FakeRunner.run_configs[-1].streaming_mode.name == "SSE"
+
+
+class TestProcessChatRequest:
+    @pytest.mark.asyncio
+    async def test_runner_is_built_once(self):
+        request = chat_service.ChatRequest(message="weather")
+        await chat_service.process_chat_request(request)
+        await chat_service.process_chat_request(request)
+        info = chat_service.get_runner.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+        assert chat_service.get_runner() is chat_service.get_runner()
+
+    @pytest.mark.asyncio
+    async def test_returns_only_the_final_response(self):
+        response = await chat_service.process_chat_request(
+            chat_service.ChatRequest(message="weather")
+        )
+        assert response.success is True
+        assert response.data["message"].startswith("Sunny in Warsaw.")
+        assert FakeRunner.run_configs[-1].streaming_mode.name == "NONE"
+
+    @pytest.mark.asyncio
+    async def test_missing_google_key(self, monkeypatch):
+        monkeypatch.delenv("GOOGLE_API_KEY")
+        response = await chat_service.process_chat_request(
+            chat_service.ChatRequest(message="weather")
+        )
+        assert response.success is False
+        assert "GOOGLE_API_KEY" in response.error
@@ -0,0 +1,190 @@
+import json
+
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.genai import types
+
+from api.backend_session_service import BackendSessionService
+from api.history_compaction import (
+    SUMMARY_STATE_KEY,
+    compact_session,
+    split_turns,
+)
+from api.session_backend import InMemoryBackend
+
+
+def user(text: str) -> Event:
+    return Event(
+        author="user",
+        invocation_id="inv",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+    )
+
+
+def call(name: str, **args) -> Event:
+    return Event(
+        author="get_weather_agent",
+        invocation_id="inv",
+        content=types.Content(
+            role="model",
+            parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+        ),
+    )
+
+
+def reply(text: str) -> Event:
+    return Event(
+        author="weather_assistant",
+        invocation_id="inv",
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+    )
+
+
+def session_with(events) -> Session:
+    return Session(app_name="app", user_id="u", id="s", events=list(events))
+
+
+def summary(session: Session) -> dict:
+    return json.loads(session.state[SUMMARY_STATE_KEY])
+
+
+class TestSplitTurns:
+    def test_turns_start_at_user_events(self):
+        events = [
+            user("a"),
+            call("get_current_weather", city="X"),
+            reply("r"),
+            user("b"),
+        ]
+        assert [len(turn) for turn in split_turns(events)] == [3, 1]
+
+
+class TestCompactSession:
+    def test_short_history_untouched(self):
+        session = session_with([user("hi"), reply("hello")])
+        assert compact_session(session, keep_turns=2) is False
+        assert SUMMARY_STATE_KEY not in session.state
+
+    def test_folds_old_turns_into_summary(self):
+        session = session_with(
+            [
+                user("[Today is 2026-10-18, Sunday] Pogoda w Krakowie jutro?"),
+                call(
+                    "get_forecast",
+                    city="Kraków",
+                    start_date="2026-10-19",
+                    end_date="2026-10-19",
+                    language="pl",
+                ),
+                reply("Jutro słonecznie."),
+                user("A w weekend?"),
+                call(
+                    "get_forecast",
+                    city="Kraków",
+                    start_date="2026-10-24",
+                    end_date="2026-10-25",
+                ),
+                reply("W weekend deszcz."),
+                user("Dzięki"),
+            ]
+        )
+        assert compact_session(session, keep_turns=1) is True
+        assert [e.author for e in session.events] == ["user"]
+        assert summary(session) == {
+            "city": "Kraków",
+            "weather_information_type": "forecast",
+            "date": None,
+            "date_range": "2026-10-24..2026-10-25",
+            "language": "pl",
+            "earlier_requests": ["Pogoda w Krakowie jutro?", "A w weekend?"],
+            "compacted_turns": 2,
+        }
+
+    def test_reads_server_attached_fence(self):
+        fence = json.dumps(
+            {
+                "meta": {
+                    "city": "Rome",
+                    "kind": "current",
+                    "date": "2026-10-18",
+                    "date_range": None,
+                    "language": "en",
+                },
+                "current": {},
+            }
+        )
+        session = session_with(
+            [
+                user("Rome?"),
+                reply(f"Sunny.\n\n```weather-json\n{fence}\n```"),
+                user("ok"),
+            ]
+        )
+        compact_session(session, keep_turns=1)
+        assert summary(session)["city"] == "Rome"
+        assert summary(session)["date"] == "2026-10-18"
+
+    def test_summary_accumulates_across_compactions(self):
+        session = session_with([user("one"), reply("r"), user("two")])
+        compact_session(session, keep_turns=1)
+        session.events += [reply("r"), user("three")]
+        compact_session(session, keep_turns=1)
+        assert summary(session)["earlier_requests"] == ["one", "two"]
+        assert summary(session)["compacted_turns"] == 2
+
+    def test_byte_budget_folds_more_but_keeps_current_turn(self):
+        big = "x" * 5000
+        session = session_with(
+            [user(big), reply(big), user(big), reply(big), user(big)]
+        )
+        assert compact_session(session, keep_turns=10, max_bytes=8000) is True
+        assert len(split_turns(session.events)) == 1
+        assert len(session.events) == 1
+
+    def test_oversized_tool_responses_in_kept_turns_are_truncated(self):
+        forecast = Event(
+            author="get_weather_agent",
+            invocation_id="inv",
+            content=types.Content(
+                role="user",
+                parts=[
+                    types.Part(
+                        function_response=types.FunctionResponse(
+                            name="get_forecast", response={"days": ["x" * 200] * 50}
+                        )
+                    )
+                ],
+            ),
+        )
+        session = session_with([user("forecast"), forecast, reply("Sunny.")])
+        assert compact_session(session, keep_turns=10, max_bytes=4000) is True
+        assert len(session.model_dump_json().encode()) <= 4000
+        assert len(session.events) == 3
+        response = session.events[1].content.parts[0].function_response
+        assert response.name == "get_forecast"
+        assert "truncated" in response.response
+        assert SUMMARY_STATE_KEY not in session.state
+
+
+class TestServiceCompactsOnAppend:
+    @pytest.mark.asyncio
+    async def test_stored_history_is_bounded(self):
+        service = BackendSessionService(InMemoryBackend(), 3600, keep_turns=2)
+        session = await service.create_session(app_name="app", user_id="u")
+        for n in range(5):
+            await service.append_event(session, user(f"question {n}"))
+            await service.append_event(session, reply(f"answer {n}"))
+
+        stored = await service.get_session(
+            app_name="app", user_id="u", session_id=session.id
+        )
+        assert [e.content.parts[0].text for e in stored.events] == [
+            "question 3",
+            "answer 3",
+            "question 4",
+            "answer 4",
+        ]
+        assert summary(stored)["compacted_turns"] == 3
+        # The caller's in-flight copy keeps the full invocation history.
+        assert len(session.events) == 10
@@ -0,0 +1,126 @@
+from datetime import date
+
+import pytest
+
+from agent_system.src.multi_tool_agent.tools import get_history_weather as tool
+from agent_system.src.multi_tool_agent.tools.history_store import (
+    HistoryStore,
+    missing_ranges,
+)
+
+META = {"resolvedAddress": "Warszawa, Polska", "timezone": "Europe/Warsaw"}
+
+
+def day(iso: str) -> dict:
+    return {"datetime": iso, "temp": 10.0}
+
+
+class TestMissingRanges:
+    def test_nothing_stored(self):
+        assert missing_ranges(date(2026, 1, 1), date(2026, 1, 3), []) == [
+            (date(2026, 1, 1), date(2026, 1, 3))
+        ]
+
+    def test_everything_stored(self):
+        present = ["2026-01-01", "2026-01-02"]
+        assert missing_ranges(date(2026, 1, 1), date(2026, 1, 2), present) == []
+
+    def test_gaps_collapse_into_runs(self):
+        present = ["2026-01-02", "2026-01-05"]
+        assert missing_ranges(date(2026, 1, 1), date(2026, 1, 6), present) == [
+            (date(2026, 1, 1), date(2026, 1, 1)),
+            (date(2026, 1, 3), date(2026, 1, 4)),
+            (date(2026, 1, 6), date(2026, 1, 6)),
+        ]
+
+
+class TestHistoryStore:
+    def test_round_trip(self):
+        store = HistoryStore(":memory:")
+        store.put("warsaw", META, [day("2026-01-01"), day("2026-01-02")])
+        meta, days = store.get("warsaw", "2026-01-02", "2026-01-05")
+        assert meta == META
+        assert days == {"2026-01-02": day("2026-01-02")}
+
+    def test_unknown_location(self):
+        assert HistoryStore(":memory:").get("nowhere", "2026-01-01", "2026-01-02") == (
+            None,
+            {},
+        )
+
+    def test_persists_on_disk(self, tmp_path):
+        path = str(tmp_path / "nested" / "history.sqlite3")
+        HistoryStore(path).put("warsaw", META, [day("2026-01-01")])
+        assert HistoryStore(path).get("warsaw", "2026-01-01", "2026-01-01")[1]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = HistoryStore(":memory:")
+    monkeypatch.setattr(tool, "get_history_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    async def fake_fetch(city, kind, start_date="", end_date="", not_found_error=""):
+        calls.append((start_date, end_date))
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        days = [
+            day(date.fromordinal(o).isoformat())
+            for o in range(start.toordinal(), end.toordinal() + 1)
+        ]
+        return {**META, "days": days}
+
+    monkeypatch.setattr(tool, "fetch_timeline", fake_fetch)
+    return calls
+
+
+class TestGetHistoryWeather:
+    @pytest.mark.asyncio
+    async def test_repeat_query_is_served_from_store(self, store, fetches):
+        first = await tool.get_history_weather("Warsaw", "2020-01-01", "2020-01-30")
+        second = await tool.get_history_weather("warsaw", "2020-01-01", "2020-01-30")
+        assert fetches == [("2020-01-01", "2020-01-30")]
+        assert second == first
+        assert len(second["days"]) == 30
+
+    @pytest.mark.asyncio
+    async def test_only_missing_subrange_is_fetched(self, store, fetches):
+        await tool.get_history_weather("Warsaw", "2020-01-01", "2020-01-30")
+        result = await tool.get_history_weather("Warsaw", "2020-01-02", "2020-01-31")
+        assert fetches[-1] == ("2020-01-31", "2020-01-31")
+        assert [d["datetime"] for d in result["days"]][0] == "2020-01-02"
+        assert result["days"][-1]["datetime"] == "2020-01-31"
+        assert result["resolvedAddress"] == META["resolvedAddress"]
+
+    @pytest.mark.asyncio
+    async def test_recent_days_are_not_stored(self, store, fetches):
+        today = date.today().isoformat()
+        await tool.get_history_weather("Warsaw", today, today)
+        await tool.get_history_weather("Warsaw", today, today)
+        assert len(fetches) == 2
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_is_returned(self, store, monkeypatch):
+        async def failing_fetch(*args, **kwargs):
+            return {"error": "boom"}
+
+        monkeypatch.setattr(tool, "fetch_timeline", failing_fetch)
+        result = await tool.get_history_weather("Warsaw", "2020-01-01", "2020-01-02")
+        assert result == {"error": "boom"}
+
+    @pytest.mark.asyncio
+    async def test_unparseable_dates_bypass_store(self, store, monkeypatch):
+        calls = []
+
+        async def fake_fetch(city, kind, start_date="", end_date="", **kwargs):
+            calls.append((start_date, end_date))
+            return {"error": kwargs["not_found_error"]}
+
+        monkeypatch.setattr(tool, "fetch_timeline", fake_fetch)
+        result = await tool.get_history_weather("Warsaw", "yesterday", "today")
+        assert calls == [("yesterday", "today")]
+        assert "invalid date range" in result["error"]
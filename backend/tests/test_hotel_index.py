@@ -0,0 +1,180 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agent_system.src.multi_tool_agent.tools import http_client, search_hotels
+from agent_system.src.multi_tool_agent.tools.hotel_index import (
+    KNOWN_HOTEL_MAX_AGE_SECONDS,
+    HotelIndex,
+)
+from agent_system.src.multi_tool_agent.tools.quota import TAVILY
+from agent_system.src.multi_tool_agent.tools.search_hotels import (
+    HOTEL_FRESH_SECONDS,
+    HOTEL_STALE_SECONDS,
+    hotel_cache,
+)
+from api import chat_service
+from tests.test_search_hotels_helpers import RESULTS, fake_post
+
+INDEXED = [{"url": "https://www.booking.com/hotel/no/fjord.html", "title": "Fjord"}]
+BRISTOL = {
+    "name": "Hotel Bristol",
+    "price_per_night": "120",
+    "currency": "USD",
+    "rating": 8.9,
+    "reviews_count": 1200,
+    "highlights": ["Free breakfast"],
+    "url": "https://www.booking.com/hotel/no/bristol.html",
+}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestHotelIndex:
+    def test_searches_round_trip_with_their_age(self):
+        clock = FakeClock()
+        index = HotelIndex(":memory:", clock=clock)
+        assert index.get_search("oslo", "USD") is None
+        index.put_search("oslo", "USD", INDEXED)
+        clock.now += 60
+        assert index.get_search("oslo", "USD") == (60.0, INDEXED)
+        assert index.get_search("oslo", "PLN") is None
+        assert index.stats()["search_hits"] == 1
+
+    def test_hotels_are_deduplicated_by_name_newest_first(self):
+        clock = FakeClock()
+        index = HotelIndex(":memory:", clock=clock)
+        index.put_hotels("oslo", "USD", [BRISTOL, {"name": "Fjord Inn"}])
+        clock.now += 1
+        index.put_hotels("oslo", "USD", [{**BRISTOL, "name": "hotel bristol "}])
+        names = [hotel["name"] for hotel in index.get_hotels("oslo", "USD")]
+        assert names == ["hotel bristol ", "Fjord Inn"]
+        assert index.get_hotels("oslo", "PLN") == []
+
+    def test_hotels_not_seen_for_a_month_are_dropped(self):
+        clock = FakeClock()
+        index = HotelIndex(":memory:", clock=clock)
+        index.put_hotels("oslo", "USD", [BRISTOL])
+        clock.now += KNOWN_HOTEL_MAX_AGE_SECONDS + 1
+        assert index.get_hotels("oslo", "USD") == []
+        index.put_hotels("oslo", "USD", [{"name": "Fjord Inn"}])
+        assert index.stats()["hotels"] == 1
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def index(clock, monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.delenv("TAVILY_API_URL", raising=False)
+    index = HotelIndex(":memory:", clock=clock)
+    monkeypatch.setattr(search_hotels, "get_hotel_index", lambda: index)
+    hotel_cache.clear()
+    yield index
+    hotel_cache.clear()
+
+
+class TestSearchHotelsIndex:
+    @pytest.mark.asyncio
+    async def test_indexed_search_answers_without_tavily(self, index, monkeypatch):
+        calls = []
+        monkeypatch.setattr(http_client, "post", fake_post(calls=calls))
+        index.put_search("oslo", "USD", INDEXED)
+        result = await search_hotels.search_hotels("Oslo", "2026-11-01")
+        assert result["results"] == INDEXED
+        assert result["check_in"] == "2026-11-01"
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_stale_indexed_search_is_refreshed_and_reindexed(
+        self, index, clock, monkeypatch
+    ):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "post", fake_post(json_body={"results": RESULTS}, calls=calls)
+        )
+        index.put_search("oslo", "USD", INDEXED)
+        clock.now += HOTEL_FRESH_SECONDS + 1
+        result = await search_hotels.search_hotels("Oslo")
+        assert result["results"] == INDEXED
+        await asyncio.sleep(0.01)
+        assert len(calls) == 1
+        _, results = index.get_search("oslo", "USD")
+        assert [r["title"] for r in results] == ["Wawel Inn", "Hotels"]
+
+    @pytest.mark.asyncio
+    async def test_expired_indexed_search_is_searched_again(
+        self, index, clock, monkeypatch
+    ):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "post", fake_post(json_body={"results": RESULTS}, calls=calls)
+        )
+        index.put_search("oslo", "USD", INDEXED)
+        clock.now += HOTEL_FRESH_SECONDS + HOTEL_STALE_SECONDS
+        result = await search_hotels.search_hotels("Oslo")
+        assert result["results"][0]["title"] == "Wawel Inn"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_search_falls_back_to_known_hotels(self, index, monkeypatch):
+        monkeypatch.setattr(http_client, "post", fake_post(503, {}))
+        index.put_hotels("oslo", "USD", [BRISTOL])
+        result = await search_hotels.search_hotels("Oslo")
+        (hotel,) = result["results"]
+        assert hotel["title"] == "Hotel Bristol"
+        assert hotel["content"] == (
+            "Price per night: 120 USD. Rating: 8.9/10 (1200 reviews). Free breakfast"
+        )
+        assert hotel["is_direct"] is True
+        assert hotel_cache.peek(("oslo", "", "", "USD")) is None
+
+    @pytest.mark.asyncio
+    async def test_near_the_tavily_budget_known_hotels_answer(self, index, monkeypatch):
+        monkeypatch.setattr(
+            search_hotels, "quota", SimpleNamespace(allows=lambda name: name != TAVILY)
+        )
+        index.put_hotels("oslo", "USD", [BRISTOL])
+        result = await search_hotels.search_hotels("Oslo")
+        assert result["results"][0]["title"] == "Hotel Bristol"
+        assert "error" in await search_hotels.search_hotels("Oslo", language="pl")
+
+
+class TestIndexHotels:
+    @pytest.mark.asyncio
+    async def test_validated_reply_hotels_are_indexed(self, monkeypatch):
+        index = HotelIndex(":memory:")
+        monkeypatch.setattr(chat_service, "get_hotel_index", lambda: index)
+        payload = {
+            "meta": {"city": "Kraków", "kind": "hotels", "language": "pl"},
+            "hotels": [
+                {"name": "Wawel Inn", "currency": "PLN", "url": "javascript:x"},
+                {"name": "Dollar Inn", "currency": "USD"},
+            ],
+        }
+        response = chat_service._final_chat_response(
+            "Hotels.\n\n```hotel-json\n" + json.dumps(payload) + "\n```", "s"
+        )
+        assert response.success
+        await asyncio.gather(*chat_service._index_writes)
+        (hotel,) = index.get_hotels("krakow", "PLN")
+        assert hotel["name"] == "Wawel Inn"
+        assert hotel["url"] == ""  # sanitized by the Hotel model
+        assert not chat_service._index_writes
+
+    def test_reply_without_hotels_writes_nothing(self):
+        payload = {"meta": {"city": "Oslo", "kind": "hotels", "language": "en"}}
+        validated = chat_service._validate_payload("hotel-json", payload)
+        chat_service._index_hotels(validated)
+        assert not chat_service._index_writes
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+from google.adk.events import Event
+from google.genai import types
+
+from api import chat_service
+from api.intent import (
+    MODEL_PATH,
+    ROUTABLE_AGENTS,
+    IntentModel,
+    IntentRouter,
+    intent_router,
+)
+from api.turn_cache import turn_cache
+from benchmarks.intent_corpus import TEST
+
+
+class TestIntentRouter:
+    @pytest.mark.parametrize(
+        "message, label, agent",
+        [
+            ("Will it rain in Oslo tomorrow?", "weather", "get_weather_agent"),
+            ("Znajdź nocleg w Gdańsku", "hotels", "search_hotels_agent"),
+            ("weather and hotels in Rome", "combined", None),
+            ("pogoda i hotele w Krakowie", "combined", None),
+        ],
+    )
+    def test_keyword_rules(self, message, label, agent):
+        route = IntentRouter(model=None).classify(message)
+        assert route == (label, 1.0, "rule", agent)
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "hotels in Windsor",
+            "find me a hotel in Snowdonia",
+            "hotels in Rainham",
+            "hotele w Padang",
+        ],
+    )
+    def test_city_names_are_not_weather_cues(self, message):
+        route = intent_router.classify(message)
+        assert route == ("hotels", 1.0, "rule", "search_hotels_agent")
+
+    @pytest.mark.parametrize(
+        "message", ["Is it snowing in Oslo?", "Czy padało w Gdańsku?", "windy Rome"]
+    )
+    def test_weather_word_forms_are_cues(self, message):
+        assert IntentRouter(model=None).classify(message).label == "weather"
+
+    def test_advice_wording_is_left_to_the_model(self):
+        assert IntentRouter(model=None).classify(
+            "What can I visit in Paris when it rains?"
+        ) == ("other", 0.0, "rule", None)
+
+    def test_model_routes_only_confident_predictions(self):
+        model = IntentModel.train(
+            {"weather": ["chilly in Oslo"], "other": ["hello there"]}
+        )
+        assert IntentRouter(model).classify("chilly Oslo").agent == (
+            "get_weather_agent"
+        )
+        assert (
+            IntentRouter(model, min_confidence=1.01).classify("chilly Oslo").agent
+            is None
+        )
+
+    def test_model_survives_a_round_trip(self, tmp_path):
+        trained = IntentModel.train(
+            {"hotels": ["a room in Rome"], "travel": ["sights in Rome"]}
+        )
+        path = tmp_path / "model.json"
+        path.write_text(json.dumps(trained.to_dict()))
+        loaded = IntentModel.load(path)
+        assert loaded.predict("room Rome") == trained.predict("room Rome")
+
+    def test_shipped_model_never_misroutes_the_held_out_corpus(self):
+        router = IntentRouter(IntentModel.load(MODEL_PATH))
+        for label, messages in TEST.items():
+            for message in messages:
+                agent = router.classify(message).agent
+                assert agent in (None, ROUTABLE_AGENTS.get(label)), message
+
+
+class RecordingRunner:
+    agents: list = []
+
+    def __init__(self, agent, **kwargs):
+        self.agent = agent
+
+    async def run_async(self, **kwargs):
+        RecordingRunner.agents.append(self.agent.name)
+        yield Event(
+            author=self.agent.name,
+            invocation_id="inv",
+            content=types.Content(role="model", parts=[types.Part(text="Sure.")]),
+        )
+
+
+@pytest.fixture
+def recording_runner(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(chat_service, "Runner", RecordingRunner)
+    chat_service.get_runner.cache_clear()
+    turn_cache.clear()
+    RecordingRunner.agents = []
+    yield RecordingRunner
+    chat_service.get_runner.cache_clear()
+
+
+def ask(message, session_id=None):
+    return chat_service.process_chat_request(
+        chat_service.ChatRequest(message=message, session_id=session_id)
+    )
+
+
+class TestChatRouting:
+    @pytest.mark.asyncio
+    async def test_first_message_starts_at_the_sub_agent(self, recording_runner):
+        before = intent_router.stats()["decisions"].get("search_hotels_agent", 0)
+        response = await ask("Find me a hotel in Lisbon")
+        assert response.success
+        assert recording_runner.agents == ["search_hotels_agent"]
+        assert intent_router.stats()["decisions"]["search_hotels_agent"] == before + 1
+
+    @pytest.mark.asyncio
+    async def test_unclear_messages_and_follow_ups_go_to_root(self, recording_runner):
+        first = await ask("Hello!")
+        await ask("Find me a hotel there", session_id=first.session_id)
+        assert recording_runner.agents == ["weather_assistant", "weather_assistant"]
@@ -0,0 +1,196 @@
+import asyncio
+import json
+
+import pytest
+from google.adk.events import Event
+from google.genai import types
+
+from agent_system.src.multi_tool_agent.tools.hotel_index import HotelIndex
+from api import chat_service
+from api.session_manager import APP_NAME, session_manager
+from api.turn_cache import turn_cache
+from tests.test_chat_stream import WEATHER_REPLY
+
+HOTEL_REPLY = (
+    "One hotel in Warsaw.\n\n```hotel-json\n"
+    + json.dumps(
+        {
+            "meta": {"city": "Warsaw", "kind": "hotels", "language": "en"},
+            "hotels": [{"name": "Hotel Bristol", "url": "https://example.com/b"}],
+        }
+    )
+    + "\n```"
+)
+ADVICE = "1. Łazienki Park — sunny, so go outside."
+
+
+class BranchRunner:
+    """Answers each agent with a canned reply after a short delay."""
+
+    replies: dict = {}
+    running = 0
+    max_running = 0
+    agents: list = []
+    built: list = []
+
+    def __init__(self, agent, session_service=None, **kwargs):
+        self.agent = agent
+        self.session_service = session_service
+        BranchRunner.built.append(agent.name)
+
+    async def run_async(self, **kwargs):
+        cls = BranchRunner
+        cls.agents.append(self.agent.name)
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        await asyncio.sleep(0.02)
+        cls.running -= 1
+        text = cls.replies.get(self.agent.name, "")
+        if text is None:
+            raise RuntimeError(f"{self.agent.name} failed")
+        yield Event(
+            author=self.agent.name,
+            invocation_id="inv",
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+        )
+
+
+@pytest.fixture
+def branch_runner(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(chat_service, "Runner", BranchRunner)
+    monkeypatch.setattr(chat_service, "_PARALLEL_COMBINED", True)
+    index = HotelIndex(":memory:")
+    monkeypatch.setattr(chat_service, "get_hotel_index", lambda: index)
+    chat_service.get_runner.cache_clear()
+    chat_service.get_sub_agent_runner.cache_clear()
+    turn_cache.clear()
+    BranchRunner.replies = {
+        "get_weather_agent": WEATHER_REPLY.replace(
+            "Sunny in Warsaw.", "Sunny in Warsaw.\n\n" + ADVICE
+        ),
+        "search_hotels_agent": HOTEL_REPLY,
+    }
+    BranchRunner.running = BranchRunner.max_running = 0
+    BranchRunner.agents = []
+    BranchRunner.built = []
+    yield BranchRunner
+    chat_service.get_runner.cache_clear()
+    chat_service.get_sub_agent_runner.cache_clear()
+
+
+def ask(message, session_id=None):
+    return chat_service.process_chat_request(
+        chat_service.ChatRequest(message=message, session_id=session_id)
+    )
+
+
+def fenced_payload(message, fence_type):
+    return json.loads(message.split(f"```{fence_type}\n")[1].split("\n```")[0])
+
+
+class TestParallelCombined:
+    @pytest.mark.asyncio
+    async def test_branches_run_concurrently_into_one_reply(self, branch_runner):
+        response = await ask("weather and hotels in Warsaw")
+        assert response.success
+        message = response.data["message"]
+        assert message.startswith(
+            "Sunny in Warsaw.\n\n" + ADVICE + "\n\nOne hotel in Warsaw."
+        )
+        payload = fenced_payload(message, "combined-json")
+        assert payload["meta"]["kind"] == "combined"
+        assert payload["weather"]["kind"] == "current"
+        assert payload["weather"]["current"]["conditions"] == "Clear"
+        assert [h["name"] for h in payload["hotels"]] == ["Hotel Bristol"]
+        assert branch_runner.max_running == 2
+        assert sorted(branch_runner.agents) == [
+            "get_weather_agent",
+            "search_hotels_agent",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_branch_runners_are_reused_and_sessions_dropped(self, branch_runner):
+        for _ in range(3):
+            response = await ask("weather and hotels in Warsaw")
+        record = await session_manager.get_session(response.session_id)
+        assert sorted(branch_runner.built) == [
+            "get_weather_agent",
+            "search_hotels_agent",
+        ]
+        for name in branch_runner.built:
+            service = chat_service.get_sub_agent_runner(name).session_service
+            listed = await service.list_sessions(
+                app_name=name, user_id=record["user_id"]
+            )
+            assert listed.sessions == []
+
+    @pytest.mark.asyncio
+    async def test_turn_is_seeded_for_root_follow_ups(self, branch_runner):
+        response = await ask("pogoda i hotele w Warszawie")
+        record = await session_manager.get_session(response.session_id)
+        session = await session_manager.session_service.get_session(
+            app_name=APP_NAME,
+            user_id=record["user_id"],
+            session_id=record["adk_session_id"],
+        )
+        user, reply = session.events
+        assert user.content.parts[0].text.endswith("] pogoda i hotele w Warszawie")
+        assert reply.author == "weather_assistant"
+        assert reply.content.parts[0].text == response.data["message"]
+        assert session.state["search_hotels_agent_output"] == HOTEL_REPLY
+
+    @pytest.mark.asyncio
+    async def test_failed_hotel_branch_ships_the_weather_alone(self, branch_runner):
+        branch_runner.replies["search_hotels_agent"] = (
+            'Hotel search is down.\n\n```hotel-json\n{"error": "quota"}\n```'
+        )
+        response = await ask("weather and hotels in Warsaw")
+        assert response.success
+        message = response.data["message"]
+        assert ADVICE in message
+        assert "Hotel information is unavailable right now." in message
+        assert "Hotel search is down." not in message
+        assert fenced_payload(message, "weather-json")["meta"]["kind"] == "current"
+        assert "```combined-json" not in message
+
+    @pytest.mark.asyncio
+    async def test_raised_weather_branch_says_weather_is_unavailable(
+        self, branch_runner
+    ):
+        branch_runner.replies["get_weather_agent"] = None  # raises in the runner
+        response = await ask("weather and hotels in Warsaw")
+        assert response.success
+        message = response.data["message"]
+        assert message.startswith(
+            "Weather information is unavailable right now.\n\nOne hotel in Warsaw."
+        )
+        assert "```hotel-json" in message
+
+    @pytest.mark.asyncio
+    async def test_unavailable_sentence_follows_the_reply_language(self, branch_runner):
+        branch_runner.replies["search_hotels_agent"] = HOTEL_REPLY.replace(
+            '"language": "en"', '"language": "pl"'
+        )
+        branch_runner.replies["get_weather_agent"] = "Brak danych."
+        response = await ask("pogoda i hotele w Warszawie")
+        message = response.data["message"]
+        assert message.startswith("Informacje o pogodzie są teraz niedostępne.")
+
+    @pytest.mark.asyncio
+    async def test_both_branches_failing_is_an_error(self, branch_runner):
+        branch_runner.replies["get_weather_agent"] = (
+            'No such city.\n\n```weather-json\n{"error": "City not found."}\n```'
+        )
+        branch_runner.replies["search_hotels_agent"] = None
+        response = await ask("weather and hotels in Atlantis")
+        assert not response.success
+        assert "Neither weather nor hotel information" in response.error
+        assert response.data is None
+
+    @pytest.mark.asyncio
+    async def test_agent_mode_leaves_it_to_root(self, branch_runner, monkeypatch):
+        monkeypatch.setattr(chat_service, "_PARALLEL_COMBINED", False)
+        branch_runner.replies["weather_assistant"] = "Where to?"
+        await ask("weather and hotels in Warsaw")
+        assert branch_runner.agents == ["weather_assistant"]
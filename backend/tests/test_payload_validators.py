@@ -2,6 +2,7 @@ import pytest
 
 from api.combined_payload import validate_combined_payload
 from api.hotel_payload import Hotel, validate_hotel_payload
+from api.payload_registry import payload_validators
 from api.weather_payload import validate_weather_payload
 
 CURRENT_WEATHER = {
@@ -171,3 +172,44 @@ class TestCombinedPayload:
                     "hotels": [],
                 }
             )
+
+    def test_weather_error_wins_over_meta_error(self):
+        # Both meta.city and weather.current are invalid: the weather error
+        # is reported, relative to the weather object.
+        with pytest.raises(ValueError, match=r"^current: Field required$"):
+            validate_combined_payload(
+                {
+                    "meta": {"city": "", "kind": "combined", "language": "en"},
+                    "weather": {"kind": "current"},
+                    "hotels": [],
+                }
+            )
+
+    def test_meta_error_keeps_its_path(self):
+        with pytest.raises(ValueError, match=r"^meta\.city: "):
+            validate_combined_payload(
+                {
+                    "meta": {"city": "", "kind": "combined", "language": "en"},
+                    "weather": {"kind": "current", "current": CURRENT_WEATHER},
+                }
+            )
+
+
+class TestPayloadValidatorRegistry:
+    def test_validators_are_keyed_by_fence_and_kind(self):
+        payload = {
+            "meta": {
+                "city": "Warsaw",
+                "kind": "history",
+                "date_range": "2026-08-08..2026-08-08",
+                "language": "en",
+            },
+            "days": [DAY_WEATHER],
+        }
+        payload_validators.validate("weather-json", "history", payload)
+        with pytest.raises(ValueError, match=r"^meta\.kind: "):
+            payload_validators.validate("weather-json", "current", payload)
+
+    def test_unregistered_pair_raises_key_error(self):
+        with pytest.raises(KeyError):
+            payload_validators.validate("weather-json", "hotels", {})
@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agent_system.src.multi_tool_agent.tools.quota import (
+    model_calls,
+    record_model_usage,
+)
+from api import chat_service
+from api.main import app
+from api.prometheus import StatsCollector, registry
+from tests.test_chat_stream import FakeRunner
+
+
+@pytest.fixture(autouse=True)
+def fake_runner(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(chat_service, "Runner", FakeRunner)
+    chat_service.get_runner.cache_clear()
+    yield
+    chat_service.get_runner.cache_clear()
+
+
+def sample(name, **labels):
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+class TestExposition:
+    def test_stats_are_read_at_scrape_time(self):
+        stats = {("hit",): 1}
+        collector = StatsCollector(
+            "lookups", "Lookups.", lambda: dict(stats), ("result",), kind="counter"
+        )
+        stats[("miss",)] = 2
+        (family,) = collector.collect()
+        assert family.type == "counter"
+        assert [(s.name, s.labels, s.value) for s in family.samples] == [
+            ("lookups_total", {"result": "hit"}, 1),
+            ("lookups_total", {"result": "miss"}, 2),
+        ]
+
+    def test_metrics_endpoint(self):
+        response = TestClient(app).get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "chat_timeouts_total" in response.text
+        assert 'weather_cache_requests_total{result="hit"}' in response.text
+
+
+class TestChatMetrics:
+    @pytest.mark.asyncio
+    async def test_latency_and_tool_time_are_observed(self):
+        latency = "chat_request_duration_seconds_count"
+        tool_latency = "chat_tool_duration_seconds_count"
+        before = sample(latency, mode="sync", outcome="success")
+        tools_before = sample(tool_latency, tool="get_current_weather")
+        response = await chat_service.process_chat_request(
+            chat_service.ChatRequest(message="weather")
+        )
+        assert response.success is True
+        assert sample(latency, mode="sync", outcome="success") == before + 1
+        assert sample(tool_latency, tool="get_current_weather") == tools_before + 1
+
+    @pytest.mark.asyncio
+    async def test_timeouts_are_counted(self, monkeypatch):
+        class SlowRunner(FakeRunner):
+            async def run_async(self, **kwargs):
+                await asyncio.sleep(1)
+                yield
+
+        monkeypatch.setattr(chat_service, "Runner", SlowRunner)
+        monkeypatch.setattr(chat_service, "_ADK_TIMEOUT_SECONDS", 0.01)
+        before = sample("chat_timeouts_total")
+        response = await chat_service.process_chat_request(
+            chat_service.ChatRequest(message="weather")
+        )
+        assert "timed out" in response.error
+        assert sample("chat_timeouts_total") == before + 1
+
+    def test_malformed_json_is_counted(self):
+        before = sample("chat_malformed_json_total")
+        is_error, *_ = chat_service._detect_error_in_response(
+            'Text\n\n```weather-json\n{"meta": \n```'
+        )
+        assert is_error
+        assert sample("chat_malformed_json_total") == before + 1
+
+    def test_validation_failures_are_counted_by_fence(self):
+        failures = "chat_validation_failures_total"
+        before = sample(failures, fence_type="weather-json")
+        response = chat_service._final_chat_response(
+            'Text\n\n```weather-json\n{"meta": {"kind": "current"}}\n```', "s"
+        )
+        assert response.success is False
+        assert sample(failures, fence_type="weather-json") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_model_call_counter_is_reset_after_the_turn(self):
+        response = await chat_service.process_chat_request(
+            chat_service.ChatRequest(message="Hello!")
+        )
+        assert response.success
+        assert model_calls.get() is None
+
+    def test_model_calls_are_counted_per_turn(self):
+        calls = [0]
+        token = model_calls.set(calls)
+        try:
+            final = SimpleNamespace(partial=False, usage_metadata=None)
+            record_model_usage(None, final)
+            record_model_usage(None, SimpleNamespace(partial=True))
+            record_model_usage(None, final)
+        finally:
+            model_calls.reset(token)
+        assert calls == [2]
@@ -0,0 +1,173 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agent_system.src.multi_tool_agent.tools import (
+    http_client,
+    search_hotels,
+    visual_crossing,
+)
+from agent_system.src.multi_tool_agent.tools import quota as quota_module
+from agent_system.src.multi_tool_agent.tools.quota import (
+    EXHAUSTED,
+    GEMINI,
+    OK,
+    SHED,
+    TAVILY,
+    VISUAL_CROSSING,
+    Budget,
+    QuotaBudgeter,
+    budgets_from_env,
+    record_model_usage,
+)
+from agent_system.src.multi_tool_agent.tools.visual_crossing import (
+    fetch_timeline,
+    timeline_cache,
+)
+from api import chat_service
+from api.models import ChatRequest
+from tests.test_visual_crossing import fake_get
+
+DAY = 24 * 60 * 60
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def budgeter(clock, limit=100.0):
+    return QuotaBudgeter(
+        {
+            GEMINI: Budget("tokens", DAY, limit),
+            VISUAL_CROSSING: Budget("records", DAY, limit),
+            TAVILY: Budget("credits", 30 * DAY, limit),
+        },
+        clock=clock,
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    timeline_cache.clear()
+    yield
+    timeline_cache.clear()
+
+
+class TestQuotaBudgeter:
+    def test_modes_follow_usage(self):
+        quota = budgeter(Clock())
+        assert quota.mode(GEMINI) == OK
+        quota.record(GEMINI, 89)
+        assert quota.allows(GEMINI)
+        quota.record(GEMINI, 1)
+        assert quota.mode(GEMINI) == SHED
+        assert not quota.allows(GEMINI)
+        quota.record(GEMINI, 10)
+        assert quota.mode(GEMINI) == EXHAUSTED
+        assert quota.stats()[GEMINI]["shed"] == 1
+
+    def test_usage_rolls_out_of_the_window(self):
+        clock = Clock()
+        quota = budgeter(clock)
+        quota.record(VISUAL_CROSSING, 95)
+        clock.now += DAY / 2
+        quota.record(VISUAL_CROSSING, 3)
+        assert quota.mode(VISUAL_CROSSING) == SHED
+        clock.now += DAY / 2 + 1
+        assert quota.mode(VISUAL_CROSSING) == OK
+        assert quota.stats()[VISUAL_CROSSING]["used"] == 3
+
+    def test_unlimited_budget_is_never_shed(self):
+        quota = budgeter(Clock(), limit=None)
+        quota.record(TAVILY, 10**9)
+        assert quota.allows(TAVILY)
+
+    def test_burn_rate_and_projection(self):
+        clock = Clock()
+        quota = budgeter(clock, limit=1000)
+        quota.record(GEMINI, 30)
+        clock.now += 30 * 60
+        quota.record(GEMINI, 20)
+        stats = quota.stats()[GEMINI]
+        assert stats["calls"] == 2
+        assert stats["burn_per_hour"] == 50
+        assert stats["projected_window_cost"] == 1200
+        assert stats["hours_to_exhaustion"] == 19
+
+        # An hour later the burn rate only counts the recent call.
+        clock.now += 45 * 60
+        assert quota.stats()[GEMINI]["burn_per_hour"] == 20
+
+    def test_budgets_from_env(self, monkeypatch):
+        monkeypatch.setenv("QUOTA_TAVILY_CREDITS_PER_MONTH", "1000")
+        monkeypatch.delenv("QUOTA_GEMINI_TOKENS_PER_DAY", raising=False)
+        budgets = budgets_from_env()
+        assert budgets[TAVILY].limit == 1000
+        assert budgets[TAVILY].window_seconds == 30 * DAY
+        assert budgets[GEMINI].limit is None
+
+    def test_non_numeric_budget_is_unlimited(self, monkeypatch, caplog):
+        monkeypatch.setenv("QUOTA_GEMINI_TOKENS_PER_DAY", "1M")
+        assert budgets_from_env()[GEMINI].limit is None
+        assert "QUOTA_GEMINI_TOKENS_PER_DAY" in caplog.text
+
+    def test_model_usage_skips_partial_chunks(self, monkeypatch):
+        quota = budgeter(Clock())
+        monkeypatch.setattr(quota_module, "quota", quota)
+        usage = SimpleNamespace(total_token_count=42)
+        record_model_usage(None, SimpleNamespace(partial=True, usage_metadata=usage))
+        record_model_usage(None, SimpleNamespace(partial=False, usage_metadata=usage))
+        assert quota.stats()[GEMINI]["used"] == 42
+
+
+class TestLoadShedding:
+    @pytest.fixture
+    def quota(self, monkeypatch):
+        quota = budgeter(Clock())
+        for module in (visual_crossing, search_hotels, chat_service):
+            monkeypatch.setattr(module, "quota", quota)
+        monkeypatch.setenv("VISUAL_CROSSING_API_KEY", "test-key")
+        return quota
+
+    @pytest.mark.asyncio
+    async def test_weather_records_returned_days(self, quota, monkeypatch):
+        body = {"days": [{"datetime": "2026-10-18"}, {"datetime": "2026-10-19"}]}
+        monkeypatch.setattr(http_client, "get", fake_get(json_body=body))
+        await fetch_timeline("Oslo", "forecast")
+        assert quota.stats()[VISUAL_CROSSING]["used"] == 2
+
+    @pytest.mark.asyncio
+    async def test_weather_served_from_stale_cache_when_shedding(
+        self, quota, monkeypatch
+    ):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "get", fake_get(json_body={"days": []}, calls=calls)
+        )
+        timeline_cache.set(("forecast", "oslo", "", ""), {"days": []}, ttl=0)
+        quota.record(VISUAL_CROSSING, 95)
+
+        assert await fetch_timeline("Oslo", "forecast") == {"days": []}
+        assert "error" in await fetch_timeline("Bergen", "forecast")
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_hotel_search_disabled_when_shedding(self, quota, monkeypatch):
+        monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+        quota.record(GEMINI, 90)
+        result = await search_hotels.search_hotels("Oslo")
+        assert "temporarily unavailable" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_chat_refused_when_gemini_exhausted(self, quota, monkeypatch):
+        monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+        quota.record(GEMINI, 100)
+        response = await chat_service.process_chat_request(
+            ChatRequest(message="Weather in Oslo?")
+        )
+        assert response.success is False
+        assert "usage limit" in response.error
@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+
+from api import main
+from api.rate_limit import (
+    InMemoryRateStore,
+    RateLimit,
+    RateLimitExceeded,
+    RespRateStore,
+    SlidingWindowLimiter,
+    create_rate_store,
+)
+from tests.resp_server import RespServer
+
+PER_MINUTE_3 = RateLimit(3, 60)
+
+
+class Clock:
+    def __init__(self, now: float = 6000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest_asyncio.fixture
+async def resp_server():
+    server = await RespServer().start()
+    yield server
+    await server.stop()
+
+
+class TestRateLimitParse:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [("10/minute", RateLimit(10, 60)), ("100 per hour", RateLimit(100, 3600))],
+    )
+    def test_parse(self, text, expected):
+        assert RateLimit.parse(text) == expected
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            RateLimit.parse("ten a minute")
+
+    def test_str_matches_slowapi_wording(self):
+        assert str(RateLimit(10, 60)) == "10 per 1 minute"
+
+
+class TestSlidingWindow:
+    @pytest.mark.asyncio
+    async def test_rejects_over_limit_and_reports_retry_after(self):
+        clock = Clock()
+        limiter = SlidingWindowLimiter(InMemoryRateStore(clock=clock), clock=clock)
+        for _ in range(3):
+            await limiter.check("ip", "1.2.3.4", PER_MINUTE_3)
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.check("ip", "1.2.3.4", PER_MINUTE_3)
+        assert exc.value.retry_after == 60
+        assert limiter.rejected == 1
+        # Other keys are independent.
+        await limiter.check("ip", "5.6.7.8", PER_MINUTE_3)
+
+    @pytest.mark.asyncio
+    async def test_previous_window_decays(self):
+        clock = Clock()
+        limiter = SlidingWindowLimiter(InMemoryRateStore(clock=clock), clock=clock)
+        for _ in range(3):
+            await limiter.check("ip", "a", PER_MINUTE_3)
+
+        # A third into the next window, 2/3 of the old count still weighs in:
+        # 3 * 2/3 + 1 fits, 3 * 2/3 + 2 does not.
+        clock.now += 80
+        await limiter.check("ip", "a", PER_MINUTE_3)
+        with pytest.raises(RateLimitExceeded) as exc:
+            await limiter.check("ip", "a", PER_MINUTE_3)
+        assert exc.value.retry_after == 20
+
+        clock.now += 20
+        await limiter.check("ip", "a", PER_MINUTE_3)
+
+    @pytest.mark.asyncio
+    async def test_rejected_requests_are_not_counted(self):
+        clock = Clock()
+        limiter = SlidingWindowLimiter(InMemoryRateStore(clock=clock), clock=clock)
+        for _ in range(3):
+            await limiter.check("ip", "a", PER_MINUTE_3)
+        for _ in range(5):
+            with pytest.raises(RateLimitExceeded):
+                await limiter.check("ip", "a", PER_MINUTE_3)
+        clock.now += 120
+        for _ in range(3):
+            await limiter.check("ip", "a", PER_MINUTE_3)
+
+
+class TestRespRateStore:
+    @pytest.mark.asyncio
+    async def test_limit_is_shared_between_workers(self, resp_server):
+        clock = Clock()
+        workers = [
+            SlidingWindowLimiter(RespRateStore(resp_server.url), clock=clock)
+            for _ in range(2)
+        ]
+        await workers[0].check("ip", "a", PER_MINUTE_3)
+        await workers[1].check("ip", "a", PER_MINUTE_3)
+        await workers[0].check("ip", "a", PER_MINUTE_3)
+        with pytest.raises(RateLimitExceeded):
+            await workers[1].check("ip", "a", PER_MINUTE_3)
+        # One pipelined round trip per check: INCR, PEXPIRE, GET.
+        assert [c[0] for c in resp_server.commands[:3]] == ["INCR", "PEXPIRE", "GET"]
+        for worker in workers:
+            await worker.store.close()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_store_fails_open(self, resp_server):
+        url = resp_server.url
+        await resp_server.stop()
+        limiter = SlidingWindowLimiter(RespRateStore(url))
+        for _ in range(5):
+            await limiter.check("ip", "a", PER_MINUTE_3)
+
+    def test_store_from_env(self, monkeypatch):
+        monkeypatch.setenv("RATE_LIMIT_BACKEND", "redis")
+        monkeypatch.setenv("RATE_LIMIT_REDIS_URL", "redis://cache:6380/1")
+        store = create_rate_store()
+        assert isinstance(store, RespRateStore)
+        assert (store.client.host, store.client.port) == ("cache", 6380)
+
+
+class TestChatEndpointLimits:
+    @pytest.fixture
+    def limiter(self, monkeypatch):
+        limiter = SlidingWindowLimiter(InMemoryRateStore())
+        monkeypatch.setattr(main, "chat_limiter", limiter)
+        monkeypatch.setattr(main, "CHAT_LIMIT_PER_IP", RateLimit(2, 60))
+        monkeypatch.setattr(main, "CHAT_LIMIT_PER_SESSION", RateLimit(1, 60))
+        monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+        return limiter
+
+    def test_per_ip_limit_returns_429(self, limiter):
+        client = TestClient(main.app)
+        headers = {"X-Forwarded-For": "203.0.113.9"}
+        for _ in range(2):
+            assert client.post("/api/chat", json={"message": "hi"}, headers=headers)
+        response = client.post("/api/chat", json={"message": "hi"}, headers=headers)
+        assert response.status_code == 429
+        assert response.json() == {"error": "Rate limit exceeded: 2 per 1 minute"}
+        assert int(response.headers["Retry-After"]) >= 1
+
+    def test_per_session_limit(self, limiter):
+        client = TestClient(main.app)
+        session = asyncio.run(main.session_manager.ensure_session())
+        body = {"message": "hi", "session_id": session["session_id"]}
+        assert client.post("/api/chat", json=body).status_code == 200
+        assert client.post("/api/chat/stream", json=body).status_code == 429
+
+    def test_session_rejection_leaves_the_ip_budget_alone(self, limiter):
+        client = TestClient(main.app)
+        session = asyncio.run(main.session_manager.ensure_session())
+        body = {"message": "hi", "session_id": session["session_id"]}
+        assert client.post("/api/chat", json=body).status_code == 200
+        assert client.post("/api/chat", json=body).status_code == 429
+        # The IP window (2/minute) counted only the first request.
+        assert client.post("/api/chat", json={"message": "hi"}).status_code == 200
+        assert client.post("/api/chat", json={"message": "hi"}).status_code == 429
+
+    def test_unissued_session_ids_are_not_session_limited(self, limiter):
+        client = TestClient(main.app)
+        for _ in range(2):
+            body = {"message": "hi", "session_id": "abc"}
+            assert client.post("/api/chat", json=body).status_code == 200
+        assert limiter.rejected == 0
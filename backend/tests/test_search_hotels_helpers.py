@@ -1,12 +1,33 @@
+from types import SimpleNamespace
 from urllib.parse import parse_qsl, urlsplit
 
+import httpx
 import pytest
 
+from agent_system.src.multi_tool_agent.tools import http_client, search_hotels
+from agent_system.src.multi_tool_agent.tools.hotel_index import HotelIndex
+from agent_system.src.multi_tool_agent.tools.quota import TAVILY
 from agent_system.src.multi_tool_agent.tools.search_hotels import (
     _force_currency,
     _is_direct_hotel_url,
+    hotel_cache,
 )
 
+RESULTS = [
+    {"url": "https://www.booking.com/city/pl/krakow.html", "title": "Hotels"},
+    {"url": "https://www.booking.com/hotel/pl/wawel.html", "title": "Wawel Inn"},
+]
+
+
+def fake_post(status_code=200, json_body=None, calls=None):
+    async def _post(url, **kwargs):
+        if calls is not None:
+            calls.append((url, kwargs))
+        request = httpx.Request("POST", url)
+        return httpx.Response(status_code, json=json_body, request=request)
+
+    return _post
+
 
 class TestForceCurrency:
     def test_booking_url_gains_currency_and_lang(self):
@@ -55,3 +76,71 @@ class TestIsDirectHotelUrl:
     )
     def test_hotel_outside_path_does_not_count(self, url):
         assert _is_direct_hotel_url(url) is False
+
+
+class TestSearchHotels:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+        monkeypatch.delenv("TAVILY_API_URL", raising=False)
+        index = HotelIndex(":memory:")
+        monkeypatch.setattr(search_hotels, "get_hotel_index", lambda: index)
+        hotel_cache.clear()
+        yield
+        hotel_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_search_goes_through_the_shared_client(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "post", fake_post(json_body={"results": RESULTS}, calls=calls)
+        )
+        result = await search_hotels.search_hotels("Kraków", language="pl")
+        url, kwargs = calls[0]
+        assert url == "https://api.tavily.com/search"
+        assert kwargs["headers"] == {"Authorization": "Bearer tvly-test"}
+        assert kwargs["json"]["search_depth"] == "advanced"
+        assert result["target_currency"] == "PLN"
+        assert [r["title"] for r in result["results"]] == ["Wawel Inn", "Hotels"]
+        assert "selected_currency=PLN" in result["results"][0]["url"]
+
+    @pytest.mark.asyncio
+    async def test_repeat_searches_are_served_from_the_cache(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "post", fake_post(json_body={"results": RESULTS}, calls=calls)
+        )
+        first = await search_hotels.search_hotels("Kraków", "2026-11-01")
+        again = await search_hotels.search_hotels("KRAKOW ", "2026-11-01")
+        other_dates = await search_hotels.search_hotels("Kraków", "2026-11-02")
+        assert again == first
+        assert other_dates["check_in"] == "2026-11-02"
+        # Other dates miss the cache but are answered from the hotel index.
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(http_client, "post", fake_post(503, {}, calls=calls))
+        assert (await search_hotels.search_hotels("Oslo")) == {
+            "error": "Hotel search failed (503)."
+        }
+        await search_hotels.search_hotels("Oslo")
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_near_the_tavily_budget_only_the_cache_answers(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "post", fake_post(json_body={"results": RESULTS}, calls=calls)
+        )
+        cached = await search_hotels.search_hotels("Oslo")
+        monkeypatch.setattr(
+            search_hotels, "quota", SimpleNamespace(allows=lambda name: name != TAVILY)
+        )
+        assert await search_hotels.search_hotels("Oslo") == cached
+        assert (
+            "temporarily unavailable"
+            in (await search_hotels.search_hotels("Bergen"))["error"]
+        )
+        assert len(calls) == 1
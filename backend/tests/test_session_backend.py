@@ -0,0 +1,406 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+from google.genai import types
+
+from api.main import app
+from api.resp import RespClient, RespError, parse_redis_url
+from api.session_backend import (
+    InMemoryBackend,
+    RedisBackend,
+    SessionBackend,
+    SQLiteBackend,
+    create_session_backend,
+)
+from api.session_manager import APP_NAME, REGISTRY_PREFIX, SessionManager
+from tests.resp_server import RespServer
+
+
+@pytest_asyncio.fixture
+async def resp_server():
+    server = await RespServer().start()
+    yield server
+    await server.stop()
+
+
+@pytest_asyncio.fixture(params=["memory", "sqlite", "redis"])
+async def backend(request, tmp_path, resp_server):
+    if request.param == "memory":
+        backend = InMemoryBackend()
+    elif request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "sessions.sqlite3"))
+    else:
+        backend = RedisBackend(resp_server.url)
+    yield backend
+    await backend.close()
+
+
+def user_event(text: str, **kwargs) -> Event:
+    return Event(
+        author="user",
+        invocation_id="inv-1",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+        **kwargs,
+    )
+
+
+class TestBackends:
+    @pytest.mark.asyncio
+    async def test_set_get_delete(self, backend):
+        await backend.set("k:1", "one", 60)
+        await backend.set("k:2", "two", 60)
+        await backend.set("other", "x", 60)
+        assert await backend.get("k:1") == "one"
+        assert sorted(await backend.scan_keys("k:")) == ["k:1", "k:2"]
+        await backend.delete("k:1", "missing")
+        assert await backend.get("k:1") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_keys_are_invisible(self, backend):
+        await backend.set("gone", "x", 0.001)
+        await backend.set("kept", "y", 60)
+        await asyncio.sleep(0.01)
+        assert await backend.get("gone") is None
+        assert await backend.scan_keys("") == ["kept"]
+
+    @pytest.mark.asyncio
+    async def test_purge_drops_expired_rows(self):
+        now = [1000.0]
+        backend = SQLiteBackend(":memory:", clock=lambda: now[0])
+        await backend.set("a", "x", 10)
+        now[0] += 11
+        assert await backend.purge_expired() == 1
+
+
+class TestInMemoryBackend:
+    @pytest.mark.asyncio
+    async def test_purge_pops_only_due_entries(self):
+        now = [1000.0]
+        backend = InMemoryBackend(clock=lambda: now[0])
+        await backend.set("short", "x", 10)
+        await backend.set("renewed", "x", 10)
+        await backend.set("renewed", "y", 60)
+        await backend.set("long", "z", 60)
+        now[0] += 11
+        assert await backend.purge_expired() == 1
+        assert await backend.get("renewed") == "y"
+        # Only the entries still pending remain in the heap.
+        assert sorted(key for _, key in backend._expiry_heap) == ["long", "renewed"]
+
+    @pytest.mark.asyncio
+    async def test_heap_is_rebuilt_when_stale_entries_dominate(self):
+        backend = InMemoryBackend()
+        for _ in range(200):
+            await backend.set("k", "v", 60)
+        assert len(backend._expiry_heap) <= 2 + 64
+
+
+class TestSessionBackendInterface:
+    def test_incomplete_backend_fails_at_construction(self):
+        class NoUpdate(SessionBackend):
+            async def get(self, key):
+                return None
+
+            async def set(self, key, value, ttl_seconds):
+                pass
+
+            async def delete(self, *keys):
+                pass
+
+            async def scan_keys(self, prefix):
+                return []
+
+        with pytest.raises(TypeError, match="update"):
+            NoUpdate()
+
+
+class TestCreateSessionBackend:
+    def test_default_is_memory(self, monkeypatch):
+        monkeypatch.delenv("SESSION_BACKEND", raising=False)
+        assert isinstance(create_session_backend(), InMemoryBackend)
+
+    def test_sqlite_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SESSION_BACKEND", "sqlite")
+        monkeypatch.setenv("SESSION_SQLITE_PATH", str(tmp_path / "s.sqlite3"))
+        assert isinstance(create_session_backend(), SQLiteBackend)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="SESSION_BACKEND"):
+            create_session_backend("memcached")
+
+
+class TestSessionManager:
+    @pytest.mark.asyncio
+    async def test_session_visible_to_another_worker(self, backend):
+        first, second = SessionManager(backend), SessionManager(backend)
+        created = await first.ensure_session()
+        resumed = await second.ensure_session(created["session_id"])
+        assert resumed["adk_session_id"] == created["adk_session_id"]
+        assert isinstance(resumed["created_at"], datetime)
+
+    @pytest.mark.asyncio
+    async def test_unknown_id_is_not_adopted(self, backend):
+        session = await SessionManager(backend).ensure_session("guessed-id")
+        assert session["session_id"] != "guessed-id"
+
+    @pytest.mark.asyncio
+    async def test_history_shared_across_workers(self, backend):
+        first, second = SessionManager(backend), SessionManager(backend)
+        data = await first.ensure_session()
+        service = first.session_service
+        adk = await service.get_session(
+            app_name=APP_NAME,
+            user_id=data["user_id"],
+            session_id=data["adk_session_id"],
+        )
+        await service.append_event(adk, user_event("hello"))
+        await service.append_event(adk, user_event("partial", partial=True))
+        await service.append_event(
+            adk,
+            user_event(
+                "state",
+                actions=EventActions(state_delta={"kept": 1, "temp:scratch": 2}),
+            ),
+        )
+
+        loaded = await second.session_service.get_session(
+            app_name=APP_NAME,
+            user_id=data["user_id"],
+            session_id=data["adk_session_id"],
+        )
+        assert [e.content.parts[0].text for e in loaded.events] == ["hello", "state"]
+        assert loaded.state == {"kept": 1}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_appends_are_all_kept(self, backend, tmp_path):
+        first, second = SessionManager(backend), SessionManager(backend)
+        data = await first.ensure_session()
+        key = dict(
+            app_name=APP_NAME,
+            user_id=data["user_id"],
+            session_id=data["adk_session_id"],
+        )
+        managers = [first, second] * 5
+
+        async def append(i, manager):
+            adk = await manager.session_service.get_session(**key)
+            # Agent events, so history compaction (by user turn) keeps all.
+            event = user_event(f"e{i}").model_copy(update={"author": "agent"})
+            await manager.session_service.append_event(adk, event)
+
+        await asyncio.gather(*(append(i, m) for i, m in enumerate(managers)))
+
+        loaded = await first.session_service.get_session(**key)
+        assert sorted(e.content.parts[0].text for e in loaded.events) == [
+            f"e{i}" for i in range(10)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_appends_to_the_live_session(self, monkeypatch):
+        manager = SessionManager(InMemoryBackend())
+        data = await manager.ensure_session()
+        service = manager.session_service
+        key = dict(
+            app_name=APP_NAME,
+            user_id=data["user_id"],
+            session_id=data["adk_session_id"],
+        )
+        adk = await service.get_session(**key)
+
+        def no_parsing(*args, **kwargs):
+            raise AssertionError("stored session parsed on append")
+
+        monkeypatch.setattr(Session, "model_validate_json", no_parsing)
+        for i in range(3):
+            await service.append_event(adk, user_event(f"e{i}"))
+
+        loaded = await service.get_session(**key)
+        assert [e.content.parts[0].text for e in loaded.events] == ["e0", "e1", "e2"]
+        # The running size stays close to the real document's.
+        actual = len(loaded.model_dump_json().encode())
+        assert abs(service.stored_bytes[adk.id] - actual) < 64
+
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_registry_and_history(self, backend):
+        manager = SessionManager(backend)
+        stale = await manager.ensure_session()
+        fresh = await manager.ensure_session()
+        stale["last_activity"] = datetime.now() - timedelta(hours=25)
+        await manager._save(stale)
+
+        assert await manager.reap_expired_sessions() == 1
+
+        assert await manager.get_session(stale["session_id"]) is None
+        assert await manager.get_session(fresh["session_id"]) is not None
+        assert (
+            await manager.session_service.get_session(
+                app_name=APP_NAME,
+                user_id=stale["user_id"],
+                session_id=stale["adk_session_id"],
+            )
+            is None
+        )
+        assert await backend.scan_keys(REGISTRY_PREFIX) == [
+            REGISTRY_PREFIX + fresh["session_id"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reaper_skips_sessions_kept_alive(self, backend):
+        first, second = SessionManager(backend), SessionManager(backend)
+        data = await first.ensure_session()
+        data["last_activity"] = datetime.now() - timedelta(hours=23)
+        await first._save(data)
+        # Another worker serves the next turn; this worker's deadline is stale.
+        await second.ensure_session(data["session_id"])
+
+        now = datetime.now() + timedelta(hours=2)
+        assert first._tracked[data["session_id"]]["deadline"] < now
+        assert await first.reap_expired_sessions(now=now) == 0
+        assert await first.get_session(data["session_id"]) is not None
+        assert first._tracked[data["session_id"]]["deadline"] > now
+        assert first._expiry_heap[0][0] > now
+
+    @pytest.mark.asyncio
+    async def test_idle_sessions_are_not_resumed(self, backend):
+        first, second = SessionManager(backend), SessionManager(backend)
+        idle = await first.ensure_session()
+        idle["last_activity"] = datetime.now() - timedelta(hours=24, minutes=30)
+        await first._save(idle)
+        # Still inside the TTL grace, and never tracked by the second worker.
+        assert await second.get_session(idle["session_id"]) is not None
+
+        data = await second.ensure_session(idle["session_id"])
+        assert data["session_id"] != idle["session_id"]
+        assert await second.get_session(idle["session_id"]) is None
+        assert (
+            await second.session_service.get_session(
+                app_name=APP_NAME,
+                user_id=idle["user_id"],
+                session_id=idle["adk_session_id"],
+            )
+            is None
+        )
+
+    @pytest.mark.asyncio
+    async def test_reaper_only_pops_due_entries(self):
+        manager = SessionManager(InMemoryBackend())
+        sessions = [await manager.ensure_session() for _ in range(3)]
+        for _ in range(100):
+            await manager.ensure_session(sessions[0]["session_id"])
+        assert len(manager._expiry_heap) <= 2 * 3 + 64
+        assert await manager.reap_expired_sessions() == 0
+        assert len(manager._tracked) == 3
+
+    @pytest.mark.asyncio
+    async def test_run_reaper_drains_in_background(self):
+        manager = SessionManager(InMemoryBackend())
+        stale = await manager.ensure_session()
+        stale["last_activity"] = datetime.now() - timedelta(hours=25)
+        await manager._save(stale)
+
+        task = asyncio.create_task(manager.run_reaper(interval_seconds=0.01))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        assert await manager.get_session(stale["session_id"]) is None
+
+
+class TestSessionCapacity:
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_active(self):
+        manager = SessionManager(InMemoryBackend(), max_sessions=2)
+        a = await manager.ensure_session()
+        b = await manager.ensure_session()
+        await manager.ensure_session(a["session_id"])  # a is now most recent
+        c = await manager.ensure_session()
+
+        assert await manager.get_session(b["session_id"]) is None
+        assert (
+            await manager.session_service.get_session(
+                app_name=APP_NAME,
+                user_id=b["user_id"],
+                session_id=b["adk_session_id"],
+            )
+            is None
+        )
+        for kept in (a, c):
+            assert await manager.get_session(kept["session_id"]) is not None
+        assert manager.stats()["live"] == 2
+        assert manager.stats()["evicted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sessions_served_by_another_worker_are_not_evicted(self):
+        backend = InMemoryBackend()
+        first = SessionManager(backend, max_sessions=2)
+        second = SessionManager(backend)
+        a = await first.ensure_session()
+        a["last_activity"] -= timedelta(hours=1)
+        await first._save(a)
+        b = await first.ensure_session()
+        await second.ensure_session(a["session_id"])  # a is live elsewhere
+        await first.ensure_session()
+
+        assert await first.get_session(a["session_id"]) is not None
+        assert await first.get_session(b["session_id"]) is None
+        assert first.stats()["evicted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_byte_budget(self):
+        manager = SessionManager(InMemoryBackend(), max_total_bytes=1500)
+        for _ in range(5):
+            await manager.ensure_session()
+        stats = manager.stats()
+        assert stats["estimated_bytes"] <= 1500
+        assert stats["live"] + stats["evicted"] == 5
+        assert stats["evicted"] > 0
+
+    @pytest.mark.asyncio
+    async def test_accounting_returns_to_zero(self):
+        manager = SessionManager(InMemoryBackend())
+        stale = await manager.ensure_session()
+        assert manager.estimated_bytes() > 0
+        stale["last_activity"] = datetime.now() - timedelta(hours=25)
+        await manager._save(stale)
+        await manager.reap_expired_sessions()
+        assert manager.estimated_bytes() == 0
+        assert manager.stats()["reaped"] == 1
+
+    def test_limits_from_env(self, monkeypatch):
+        monkeypatch.setenv("SESSION_MAX_COUNT", "7")
+        monkeypatch.setenv("SESSION_MAX_TOTAL_MB", "not-a-number")
+        manager = SessionManager(InMemoryBackend())
+        assert manager.max_sessions == 7
+        assert manager.max_total_bytes == 512 * 1024 * 1024
+
+
+class TestMetricsEndpoint:
+    def test_reports_sessions_and_caches(self):
+        body = TestClient(app).get("/api/metrics").json()
+        assert set(body["sessions"]) >= {"live", "evicted", "estimated_bytes"}
+        assert "hits" in body["timeline_cache"]
+        assert "coalesced" in body["single_flight"]
+
+
+class TestRespClient:
+    def test_parse_url(self):
+        assert parse_redis_url("redis://:s%40cret@cache:6380/2") == (
+            "cache",
+            6380,
+            "s@cret",
+            2,
+        )
+        with pytest.raises(ValueError):
+            parse_redis_url("http://cache")
+
+    @pytest.mark.asyncio
+    async def test_error_reply_keeps_connection_usable(self, resp_server):
+        client = RespClient(resp_server.url, pool_size=1)
+        with pytest.raises(RespError, match="unknown command"):
+            await client.execute("NOPE")
+        assert await client.execute("PING") == "PONG"
+        assert await client.execute("MGET", "a", "b") == [None, None]
+        await client.close()
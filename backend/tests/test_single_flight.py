@@ -0,0 +1,97 @@
+import asyncio
+import inspect
+
+import pytest
+
+from agent_system.src.multi_tool_agent.tools.single_flight import (
+    SingleFlight,
+    coalesce,
+    single_flight,
+)
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_share_one_run(self):
+        flight = SingleFlight()
+        runs = 0
+        release = asyncio.Event()
+
+        async def fetch():
+            nonlocal runs
+            runs += 1
+            await release.wait()
+            return {"temp": 20}
+
+        callers = [
+            asyncio.create_task(flight.do("f", "warsaw", fetch)) for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers)
+
+        assert runs == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats()["calls"] == 5
+        assert flight.stats()["coalesced"] == 4
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            return 1
+
+        await flight.do("f", "k", fetch)
+        await flight.do("f", "k", fetch)
+        assert flight.stats()["by_function"] == {"f": {"calls": 2, "coalesced": 0}}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_run(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("f", "k", fetch))
+        second = asyncio.create_task(flight.do("f", "k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == "done"
+
+
+class TestCoalesceDecorator:
+    @pytest.mark.asyncio
+    async def test_positional_keyword_and_city_spelling_share_a_key(self):
+        runs = []
+        release = asyncio.Event()
+
+        @coalesce
+        async def lookup(city: str, language: str = "en"):
+            runs.append(city)
+            await release.wait()
+            return city
+
+        calls = [
+            asyncio.create_task(lookup("Kraków")),
+            asyncio.create_task(lookup(city="krakow ", language="en")),
+            asyncio.create_task(lookup("Kraków", "pl")),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*calls)
+        assert runs == ["Kraków", "Kraków"]
+        assert single_flight.stats()["by_function"]["lookup"]["coalesced"] == 1
+
+    def test_wrapper_keeps_signature_and_docstring(self):
+        @coalesce
+        async def lookup(city: str) -> dict:
+            """Docs."""
+            return {}
+
+        assert lookup.__doc__ == "Docs."
+        assert list(inspect.signature(lookup).parameters) == ["city"]
@@ -0,0 +1,87 @@
+import json
+
+from agent_system.src.multi_tool_agent.tools.utils import (
+    CURRENT_FIELDS,
+    DAY_FIELDS,
+    project_timeline,
+)
+from api.weather_payload import CurrentWeather, DayWeather
+
+
+def raw_day(iso: str) -> dict:
+    return {
+        "datetime": iso,
+        "datetimeEpoch": 1786000000,
+        "temp": 21.5,
+        "tempmax": 25.0,
+        "tempmin": 15.0,
+        "feelslike": 21.0,
+        "windspeed": 10.0,
+        "winddir": 180.0,
+        "pressure": 1013.0,
+        "humidity": 60.0,
+        "sunrise": "05:30:12",
+        "sunset": "20:15:59",
+        "conditions": "Clear",
+        "description": "Clear conditions throughout the day.",
+        "hours": [{"datetime": f"{h:02d}:00:00", "temp": 20.0} for h in range(24)],
+        "stations": ["EPWA"],
+    }
+
+
+RAW = {
+    "queryCost": 15,
+    "latitude": 52.2,
+    "longitude": 21.0,
+    "resolvedAddress": "Warszawa, Polska",
+    "timezone": "Europe/Warsaw",
+    "days": [raw_day(f"2026-08-{d:02d}") for d in range(1, 16)],
+    "stations": {"EPWA": {"name": "Warsaw"}},
+    "currentConditions": {
+        "datetime": "14:00:00",
+        "temp": 22.0,
+        "windspeed": 12.0,
+        "winddir": 170.0,
+        "pressure": 1012.0,
+        "humidity": 55.0,
+        "sunrise": "05:30:12",
+        "sunset": "20:15:59",
+        "conditions": "Partially cloudy",
+        "uvindex": 6,
+    },
+}
+
+
+class TestProjectTimeline:
+    def test_days_keep_only_schema_fields(self):
+        projected = project_timeline(RAW, "forecast")
+        assert set(projected["days"][0]) == set(DAY_FIELDS)
+        assert projected["days"][0]["sunrise"] == "05:30"
+        DayWeather.model_validate(projected["days"][0])
+
+    def test_location_fields_survive_and_metadata_is_dropped(self):
+        projected = project_timeline(RAW, "forecast")
+        assert projected["resolvedAddress"] == "Warszawa, Polska"
+        assert "stations" not in projected
+        assert "queryCost" not in projected
+
+    def test_max_days_truncates(self):
+        assert len(project_timeline(RAW, "forecast", max_days=3)["days"]) == 3
+
+    def test_current_gets_todays_extremes(self):
+        current = project_timeline(RAW, "current", max_days=1)["currentConditions"]
+        assert set(current) == set(CURRENT_FIELDS) | {"tempmax", "tempmin"}
+        assert (current["tempmax"], current["tempmin"]) == (25.0, 15.0)
+        CurrentWeather.model_validate(current)
+
+    def test_current_conditions_dropped_for_other_kinds(self):
+        assert "currentConditions" not in project_timeline(RAW, "history")
+
+    def test_input_is_not_mutated(self):
+        project_timeline(RAW, "current")
+        assert RAW["days"][0]["sunrise"] == "05:30:12"
+        assert "tempmax" not in RAW["currentConditions"]
+
+    def test_projection_shrinks_payload(self):
+        raw_size = len(json.dumps(RAW))
+        assert len(json.dumps(project_timeline(RAW, "forecast"))) < raw_size / 3
@@ -0,0 +1,139 @@
+import io
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from agent_system.src.multi_tool_agent.tools import http_client
+from agent_system.src.multi_tool_agent.tools.visual_crossing import (
+    fetch_timeline,
+    timeline_cache,
+)
+from api import chat_service
+from api.main import app
+from api.tracing import (
+    LOG_FORMAT,
+    JsonLinesSpanExporter,
+    RequestIdLogFilter,
+    configure_tracing,
+    request_id_var,
+)
+from tests.test_chat_stream import FakeRunner
+from tests.test_visual_crossing import fake_get
+
+
+@pytest.fixture(scope="module")
+def tracing():
+    memory = InMemorySpanExporter()
+    provider = configure_tracing(memory)
+    yield memory, provider
+    memory.shutdown()
+
+
+@pytest.fixture
+def finished_spans(tracing, monkeypatch):
+    memory, provider = tracing
+    memory.clear()
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(chat_service, "Runner", FakeRunner)
+    chat_service.get_runner.cache_clear()
+    timeline_cache.clear()
+
+    def finished():
+        provider.force_flush()
+        return {span.name: span for span in memory.get_finished_spans()}
+
+    yield finished
+    chat_service.get_runner.cache_clear()
+    timeline_cache.clear()
+
+
+class TestChatTurnSpans:
+    @pytest.mark.asyncio
+    async def test_stages_nest_under_the_turn(self, finished_spans):
+        token = request_id_var.set("req-1")
+        try:
+            response = await chat_service.process_chat_request(
+                chat_service.ChatRequest(message="weather")
+            )
+        finally:
+            request_id_var.reset(token)
+        assert response.success is True
+
+        spans = finished_spans()
+        turn = spans["chat.turn"]
+        for stage in (
+            "chat.session",
+            "chat.agent_run",
+            "chat.extract_json",
+            "chat.validate",
+            "chat.normalize",
+        ):
+            assert spans[stage].parent.span_id == turn.context.span_id
+            assert spans[stage].context.trace_id == turn.context.trace_id
+        assert turn.attributes["chat.request_id"] == "req-1"
+        assert turn.attributes["chat.success"] is True
+
+    def test_request_id_header_is_echoed_and_traced(self, finished_spans):
+        client = TestClient(app)
+        response = client.post(
+            "/api/chat", json={"message": "weather"}, headers={"X-Request-ID": "abc-1"}
+        )
+        assert response.headers["X-Request-ID"] == "abc-1"
+        assert finished_spans()["chat.turn"].attributes["chat.request_id"] == "abc-1"
+
+    def test_unusable_request_id_is_replaced(self, finished_spans):
+        client = TestClient(app)
+        response = client.get("/health", headers={"X-Request-ID": "bad id\x7f"})
+        request_id = response.headers["X-Request-ID"]
+        assert len(request_id) == 32 and request_id != "bad id\x7f"
+
+
+class TestToolSpans:
+    @pytest.mark.asyncio
+    async def test_fetch_timeline_records_cache_hits(self, finished_spans, monkeypatch):
+        monkeypatch.setenv("VISUAL_CROSSING_API_KEY", "test-key")
+        monkeypatch.setattr(http_client, "get", fake_get(json_body={"days": []}))
+        tracer = trace.get_tracer(__name__)
+        with tracer.start_as_current_span("parent") as parent:
+            await fetch_timeline("Oslo", "forecast")
+
+        span = finished_spans()["visual_crossing.fetch_timeline"]
+        assert span.parent.span_id == parent.get_span_context().span_id
+        assert span.attributes["cache.hit"] is False
+        assert span.attributes["weather.kind"] == "forecast"
+
+
+class TestExportAndLogs:
+    def test_json_lines_exporter(self, tmp_path, finished_spans):
+        path = tmp_path / "traces" / "spans.jsonl"
+        exporter = JsonLinesSpanExporter(str(path))
+        with trace.get_tracer(__name__).start_as_current_span("one"):
+            pass
+        exporter.export([finished_spans()["one"]])
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1
+        span = json.loads(lines[0])
+        assert span["name"] == "one"
+        assert span["context"]["trace_id"].startswith("0x")
+
+    def test_log_lines_carry_request_id(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handler.addFilter(RequestIdLogFilter())
+        test_logger = logging.getLogger("tests.tracing")
+        test_logger.addHandler(handler)
+        token = request_id_var.set("req-42")
+        try:
+            test_logger.warning("slow upstream")
+        finally:
+            request_id_var.reset(token)
+            test_logger.removeHandler(handler)
+        assert "[req-42] tests.tracing: slow upstream" in stream.getvalue()
@@ -0,0 +1,200 @@
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+from google.adk.events import Event
+from google.genai import types
+
+from api import chat_service
+from api.intent import WeatherIntent, parse_weather_intent
+from api.session_manager import APP_NAME, session_manager
+from api.turn_cache import TurnCache, turn_cache
+from tests.test_chat_stream import WEATHER_REPLY
+
+TODAY = date(2026, 10, 18)
+
+
+def weather_reply(city: str, day: str, language: str = "en") -> str:
+    body = json.loads(WEATHER_REPLY.split("```weather-json\n")[1].split("\n```")[0])
+    body["meta"].update(city=city, date=day, language=language)
+    return f"It is sunny.\n\n```weather-json\n{json.dumps(body)}\n```"
+
+
+class TestParseWeatherIntent:
+    @pytest.mark.parametrize(
+        "message, intent",
+        [
+            (
+                "weather in Warsaw today",
+                WeatherIntent("warsaw", "current", "2026-10-18", "en"),
+            ),
+            (
+                "What's the weather like in New York?",
+                WeatherIntent("new york", "current", "2026-10-18", "en"),
+            ),
+            (
+                "pogoda w Krakowie jutro",
+                WeatherIntent("krakowie", "forecast", "2026-10-19..2026-10-19", "pl"),
+            ),
+            (
+                "pogoda wczoraj w Gdańsku",
+                WeatherIntent("gdansku", "history", "2026-10-17..2026-10-17", "pl"),
+            ),
+            (
+                "forecast for Łódź",
+                WeatherIntent("lodz", "forecast", "2026-10-18..2026-11-01", "en"),
+            ),
+        ],
+    )
+    def test_plain_weather_questions(self, message, intent):
+        assert parse_weather_intent(message, TODAY) == intent
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "hotels in Warsaw",
+            "weather in Warsaw and hotels",
+            "temperature in Paris tomorrow",
+            "weather in Paris tomorrow and yesterday",
+            "weather today in Warsaw next to Berlin please",
+            "weather",
+            "pogoda in Warsaw",
+        ],
+    )
+    def test_anything_else_is_left_to_the_agents(self, message):
+        assert parse_weather_intent(message, TODAY) is None
+
+
+class TestTurnCache:
+    def test_reply_must_match_the_intent(self):
+        cache = TurnCache()
+        intent = WeatherIntent("warsaw", "current", "2026-10-18", "en")
+        mismatched = {
+            "meta": {"city": "Warsaw", "kind": "current", "date": "2026-10-17"}
+            | {"language": "en"}
+        }
+        assert cache.put(intent, mismatched, "reply") is False
+        assert cache.get(intent) is None
+
+    def test_spellings_learn_the_canonical_city(self):
+        cache = TurnCache()
+        payload = {
+            "meta": {
+                "city": "Kraków",
+                "kind": "forecast",
+                "date_range": "2026-10-19..2026-10-19",
+                "language": "pl",
+            }
+        }
+        nominative = WeatherIntent("krakow", "forecast", "2026-10-19..2026-10-19", "pl")
+        locative = WeatherIntent("krakowie", "forecast", "2026-10-19..2026-10-19", "pl")
+        assert cache.get(locative) is None
+        assert cache.put(nominative, payload, "jutro") is True
+        assert cache.get(locative) is None  # spelling not learned yet
+        cache.put(locative, payload, "jutro")
+        assert cache.get(locative) == "jutro"
+
+    def test_entries_expire_with_the_weather_kind(self):
+        now = [0.0]
+        cache = TurnCache(clock=lambda: now[0])
+        intent = WeatherIntent("oslo", "current", "2026-10-18", "en")
+        payload = {
+            "meta": {
+                "city": "Oslo",
+                "kind": "current",
+                "date": "2026-10-18",
+                "language": "en",
+            }
+        }
+        cache.put(intent, payload, "reply")
+        now[0] = 9 * 60
+        assert cache.get(intent) == "reply"
+        now[0] = 11 * 60
+        assert cache.get(intent) is None
+
+    def test_zero_entries_disables_the_cache(self):
+        cache = TurnCache(max_entries=0)
+        intent = WeatherIntent("oslo", "current", "2026-10-18", "en")
+        payload = {"meta": {"city": "Oslo", "kind": "current"}}
+        assert cache.put(intent, payload, "reply") is False
+        assert cache.get(intent) is None
+
+
+class CountingRunner:
+    calls = 0
+    reply = ""
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def run_async(self, **kwargs):
+        CountingRunner.calls += 1
+        yield Event(
+            author="get_weather_agent",
+            invocation_id="inv",
+            content=types.Content(
+                role="model", parts=[types.Part(text=CountingRunner.reply)]
+            ),
+        )
+
+
+@pytest.fixture
+def counting_runner(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(chat_service, "Runner", CountingRunner)
+    chat_service.get_runner.cache_clear()
+    today = datetime.now(timezone.utc).date().isoformat()
+    CountingRunner.calls = 0
+    CountingRunner.reply = weather_reply("Warsaw", today)
+    turn_cache.clear()
+    yield CountingRunner
+    chat_service.get_runner.cache_clear()
+    turn_cache.clear()
+
+
+def ask(message, session_id=None):
+    return chat_service.process_chat_request(
+        chat_service.ChatRequest(message=message, session_id=session_id)
+    )
+
+
+class TestChatTurnCache:
+    @pytest.mark.asyncio
+    async def test_repeated_first_question_skips_the_agents(self, counting_runner):
+        first = await ask("weather in Warsaw today")
+        second = await ask("What's the weather in warsaw now?")
+        assert first.success and second.success
+        assert counting_runner.calls == 1
+        assert second.data == first.data
+        assert second.session_id != first.session_id
+
+    @pytest.mark.asyncio
+    async def test_cached_turn_is_seeded_into_the_session(self, counting_runner):
+        await ask("weather in Warsaw today")
+        served = await ask("weather in Warsaw today")
+
+        record = await session_manager.get_session(served.session_id)
+        session = await session_manager.session_service.get_session(
+            app_name=APP_NAME,
+            user_id=record["user_id"],
+            session_id=record["adk_session_id"],
+        )
+        user, reply = session.events
+        assert user.author == "user"
+        assert user.content.parts[0].text.endswith("] weather in Warsaw today")
+        assert reply.author == "get_weather_agent"
+        assert reply.content.parts[0].text == served.data["message"]
+        assert session.state["get_weather_agent_prompt"] == served.data["message"]
+
+    @pytest.mark.asyncio
+    async def test_follow_ups_always_reach_the_agents(self, counting_runner):
+        first = await ask("weather in Warsaw today")
+        await ask("weather in Warsaw today", session_id=first.session_id)
+        assert counting_runner.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_reply_for_another_day_is_not_cached(self, counting_runner):
+        counting_runner.reply = weather_reply("Warsaw", "2001-01-01")
+        await ask("weather in Warsaw today")
+        await ask("weather in Warsaw today")
+        assert counting_runner.calls == 2
@@ -0,0 +1,178 @@
+from datetime import date
+
+import httpx
+import pytest
+
+from agent_system.src.multi_tool_agent.tools import http_client
+from agent_system.src.multi_tool_agent.tools.visual_crossing import (
+    CACHE_TTL_SECONDS,
+    cache_ttl,
+    fetch_timeline,
+    is_settled,
+    timeline_cache,
+    timeline_url,
+)
+
+
+def fake_get(status_code=200, json_body=None, exc=None, calls=None):
+    async def _get(url, **kwargs):
+        if calls is not None:
+            calls.append((url, kwargs))
+        if exc is not None:
+            raise exc
+        request = httpx.Request("GET", url, params=kwargs.get("params"))
+        return httpx.Response(status_code, json=json_body, request=request)
+
+    return _get
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("VISUAL_CROSSING_API_KEY", "test-key")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    timeline_cache.clear()
+    yield
+    timeline_cache.clear()
+
+
+class TestTimelineUrl:
+    def test_city_only(self):
+        assert timeline_url("Warsaw").endswith("/timeline/Warsaw")
+
+    def test_city_is_percent_encoded(self):
+        assert timeline_url(" New York/NY ").endswith("/timeline/New%20York%2FNY")
+
+    def test_date_range_is_appended(self):
+        url = timeline_url("Warsaw", "2026-08-01", "2026-08-03")
+        assert url.endswith("/timeline/Warsaw/2026-08-01/2026-08-03")
+
+    def test_base_url_can_be_overridden(self, monkeypatch):
+        monkeypatch.setenv("VISUAL_CROSSING_API_URL", "http://127.0.0.1:9/timeline/")
+        assert timeline_url("Oslo") == "http://127.0.0.1:9/timeline/Oslo"
+
+
+class TestFetchTimeline:
+    @pytest.mark.asyncio
+    async def test_missing_api_key(self, monkeypatch):
+        monkeypatch.delenv("VISUAL_CROSSING_API_KEY")
+        assert await fetch_timeline("Warsaw", "current") == {
+            "error": "Weather service API key is not configured."
+        }
+
+    @pytest.mark.asyncio
+    async def test_success_is_normalized(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            http_client,
+            "get",
+            fake_get(json_body={"days": [{"sunrise": "05:30:12"}]}, calls=calls),
+        )
+        result = await fetch_timeline("Warsaw", "forecast")
+        assert result["days"][0]["sunrise"] == "05:30"
+        params = calls[0][1]["params"]
+        assert params["key"] == "test-key"
+        assert params["include"] == "days"
+        assert "hours" not in params["elements"]
+
+    @pytest.mark.asyncio
+    async def test_current_asks_for_current_conditions(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "get", fake_get(json_body={"days": []}, calls=calls)
+        )
+        await fetch_timeline("Warsaw", "current", "today")
+        assert calls[0][0].endswith("/Warsaw/today")
+        assert calls[0][1]["params"]["include"] == "days,current"
+
+    @pytest.mark.asyncio
+    async def test_bad_request_uses_not_found_message(self, monkeypatch):
+        monkeypatch.setattr(http_client, "get", fake_get(400))
+        result = await fetch_timeline("Nowhere", "current", not_found_error="custom")
+        assert result == {"error": "custom"}
+
+    @pytest.mark.asyncio
+    async def test_server_error(self, monkeypatch):
+        monkeypatch.setattr(http_client, "get", fake_get(503))
+        assert await fetch_timeline("Warsaw", "current") == {
+            "error": "Weather service error (503)."
+        }
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, monkeypatch):
+        monkeypatch.setattr(http_client, "get", fake_get(exc=httpx.ReadTimeout("slow")))
+        assert await fetch_timeline("Warsaw", "current") == {
+            "error": "Weather service request timed out."
+        }
+
+    @pytest.mark.asyncio
+    async def test_invalid_json(self, monkeypatch):
+        async def _get(url, **kwargs):
+            return httpx.Response(
+                200, content=b"<html>", request=httpx.Request("GET", url)
+            )
+
+        monkeypatch.setattr(http_client, "get", _get)
+        assert await fetch_timeline("Warsaw", "current") == {
+            "error": "Weather service returned invalid data."
+        }
+
+
+class TestTimelineCache:
+    @pytest.mark.asyncio
+    async def test_normalized_city_hits_cache(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "get", fake_get(json_body={"days": []}, calls=calls)
+        )
+        first = await fetch_timeline("Kraków", "forecast")
+        second = await fetch_timeline("  KRAKOW ", "forecast")
+        assert first is second
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_kind_and_range_are_part_of_the_key(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            http_client, "get", fake_get(json_body={"days": []}, calls=calls)
+        )
+        await fetch_timeline("Warsaw", "current")
+        await fetch_timeline("Warsaw", "forecast")
+        await fetch_timeline("Warsaw", "history", "2026-01-01", "2026-01-02")
+        await fetch_timeline("Warsaw", "history", "2026-01-01", "2026-01-03")
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(http_client, "get", fake_get(503, calls=calls))
+        await fetch_timeline("Warsaw", "current")
+        await fetch_timeline("Warsaw", "current")
+        assert len(calls) == 2
+
+
+class TestCacheTtl:
+    def test_settled_history_uses_long_ttl(self):
+        assert cache_ttl("history", "2000-01-01") == CACHE_TTL_SECONDS["history"]
+
+    def test_recent_history_ages_like_forecast(self):
+        today = date.today().isoformat()
+        assert cache_ttl("history", today) == CACHE_TTL_SECONDS["forecast"]
+
+    def test_yesterday_is_not_settled(self):
+        assert not is_settled("2026-08-08", today=date(2026, 8, 9))
+        assert is_settled("2026-08-07", today=date(2026, 8, 9))
+
+    def test_current_ttl(self):
+        assert cache_ttl("current") == CACHE_TTL_SECONDS["current"]
+
+
+class TestSharedClient:
+    @pytest.mark.asyncio
+    async def test_client_is_reused_within_a_loop(self):
+        try:
+            assert http_client.get_http_client() is http_client.get_http_client()
+        finally:
+            await http_client.aclose_http_client()
@@ -0,0 +1,177 @@
+import json
+from types import SimpleNamespace
+
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agent_system.src.multi_tool_agent.sub_agents.get_weather.agent import (
+    PAYLOAD_STATE_KEY,
+    _after_model_callback,
+    _after_tool_callback,
+)
+from agent_system.src.multi_tool_agent.tools.weather_json import (
+    build_weather_payload,
+    render_fence,
+    template_summary,
+)
+from api.chat_service import _detect_error_in_response
+from api.weather_payload import validate_weather_payload
+
+DAY = {
+    "datetime": "2026-08-08",
+    "temp": 21.5,
+    "tempmax": 25.0,
+    "tempmin": 15.0,
+    "windspeed": 10.0,
+    "winddir": 180.0,
+    "pressure": 1013.0,
+    "humidity": 60.0,
+    "sunrise": "05:30",
+    "sunset": "20:15",
+    "conditions": "Clear",
+}
+CURRENT = {k: v for k, v in DAY.items() if k != "datetime"}
+
+
+class TestBuildWeatherPayload:
+    def test_current_payload_is_valid(self):
+        payload = build_weather_payload(
+            {"days": [DAY], "currentConditions": CURRENT}, "current", "Kraków", "pl"
+        )
+        validate_weather_payload(payload)
+        assert payload["meta"] == {
+            "city": "Kraków",
+            "kind": "current",
+            "date": "2026-08-08",
+            "date_range": None,
+            "language": "pl",
+        }
+
+    def test_forecast_payload_is_valid(self):
+        days = [DAY, DAY | {"datetime": "2026-08-09"}]
+        payload = build_weather_payload({"days": days}, "forecast", "Warsaw")
+        validate_weather_payload(payload)
+        assert payload["meta"]["date_range"] == "2026-08-08..2026-08-09"
+
+    def test_incomplete_days_are_dropped(self):
+        broken = {k: v for k, v in DAY.items() if k != "pressure"}
+        payload = build_weather_payload(
+            {"days": [broken, DAY | {"datetime": "2026-08-09"}]}, "history", "Warsaw"
+        )
+        validate_weather_payload(payload)
+        assert [d["datetime"] for d in payload["days"]] == ["2026-08-09"]
+
+    def test_incomplete_current_gives_none(self):
+        current = {k: v for k, v in CURRENT.items() if k != "tempmax"}
+        assert (
+            build_weather_payload(
+                {"days": [DAY], "currentConditions": current}, "current", "Warsaw"
+            )
+            is None
+        )
+
+    def test_error_response_gives_none(self):
+        assert build_weather_payload({"error": "x"}, "forecast", "Warsaw") is None
+
+    def test_rendered_fence_round_trips_through_the_parser(self):
+        payload = build_weather_payload({"days": [DAY]}, "forecast", "Łódź")
+        is_error, _, reply = _detect_error_in_response(
+            "Sunny.\n\n" + render_fence(payload)
+        )
+        assert (is_error, reply.fence_type, reply.payload) == (
+            False,
+            "weather-json",
+            payload,
+        )
+
+    def test_template_summary_follows_language(self):
+        payload = build_weather_payload({"days": [DAY]}, "forecast", "Kraków", "pl")
+        assert template_summary(payload).startswith("Prognoza pogody")
+
+
+def tool(name):
+    return SimpleNamespace(name=name)
+
+
+def context(invocation_id="inv-1", state=None):
+    return SimpleNamespace(invocation_id=invocation_id, state=state or {})
+
+
+def text_response(text):
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)])
+    )
+
+
+class TestGetWeatherCallbacks:
+    def test_success_stashes_payload_for_this_invocation(self):
+        ctx = context()
+        result = _after_tool_callback(
+            tool("get_forecast"),
+            {"city": "Warsaw", "language": "en"},
+            ctx,
+            {"days": [DAY]},
+        )
+        assert result is None
+        stash = ctx.state[PAYLOAD_STATE_KEY]
+        assert stash["invocation_id"] == "inv-1"
+        assert stash["payload"]["meta"]["kind"] == "forecast"
+
+    def test_error_clears_stash_and_is_normalized(self):
+        ctx = context(state={PAYLOAD_STATE_KEY: {"invocation_id": "inv-1"}})
+        result = _after_tool_callback(
+            tool("get_forecast"), {"city": "X"}, ctx, {"error": ""}
+        )
+        assert result == {"error": "Tool returned an unknown error."}
+        assert ctx.state[PAYLOAD_STATE_KEY] is None
+
+    def test_model_text_gets_built_fence_appended(self):
+        ctx = context()
+        _after_tool_callback(
+            tool("get_forecast"), {"city": "Warsaw"}, ctx, {"days": [DAY]}
+        )
+        response = _after_model_callback(ctx, text_response("Sunny days ahead."))
+        text = response.content.parts[0].text
+        assert text.startswith("Sunny days ahead.\n\n```weather-json\n")
+        body = text.split("```weather-json\n", 1)[1].rsplit("\n```", 1)[0]
+        validate_weather_payload(json.loads(body))
+        assert ctx.state[PAYLOAD_STATE_KEY] is None
+
+    def test_model_written_fence_is_replaced(self):
+        ctx = context()
+        _after_tool_callback(
+            tool("get_forecast"), {"city": "Warsaw"}, ctx, {"days": [DAY]}
+        )
+        response = _after_model_callback(
+            ctx, text_response('Sunny.\n\n```weather-json\n{"meta": {}}\n```')
+        )
+        assert response.content.parts[0].text.count("```weather-json") == 1
+
+    def test_empty_model_text_uses_template(self):
+        ctx = context()
+        _after_tool_callback(
+            tool("get_forecast"), {"city": "Warsaw"}, ctx, {"days": [DAY]}
+        )
+        response = _after_model_callback(ctx, text_response(""))
+        assert response.content.parts[0].text.startswith("Here is the forecast")
+
+    def test_stale_payload_from_other_invocation_is_ignored(self):
+        ctx = context()
+        _after_tool_callback(
+            tool("get_forecast"), {"city": "Warsaw"}, ctx, {"days": [DAY]}
+        )
+        later = context("inv-2", ctx.state)
+        assert _after_model_callback(later, text_response("Which city?")) is None
+
+    def test_function_call_turn_is_left_alone(self):
+        ctx = context()
+        _after_tool_callback(
+            tool("get_forecast"), {"city": "Warsaw"}, ctx, {"days": [DAY]}
+        )
+        call = LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(function_call=types.FunctionCall(name="x"))],
+            )
+        )
+        assert _after_model_callback(ctx, call) is None
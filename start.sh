@@ -1,8 +1,11 @@
 #!/bin/bash
 
-# Start FastAPI backend in the background
+# Start FastAPI backend in the background. More than one worker needs a
+# shared SESSION_BACKEND (sqlite or redis); with the default in-memory
+# backend each worker would only know its own sessions.
 cd /app/backend
-uv run python -m uvicorn api.main:app --host 0.0.0.0 --port 8000 &
+uv run python -m uvicorn api.main:app --host 0.0.0.0 --port 8000 \
+  --workers "${UVICORN_WORKERS:-1}" &
 
 # Wait for the backend to accept requests before letting nginx serve traffic.
 # Without this, nginx starts immediately and can proxy /api/* to a backend